@@ -0,0 +1,402 @@
+# ===================================================================
+# CAMPUSSPHERE - ANALYTICS ROLLUP TABLES
+# ===================================================================
+# /api/admin/analytics reads small precomputed tables instead of
+# aggregating users / events / event_registrations on every call.
+#
+# Registrations are folded in incrementally: a watermark remembers the
+# highest event_registrations.id already counted and each refresh only
+# aggregates rows above it into hourly, daily and monthly buckets. The small
+# per-role and per-category tables are recomputed in full on each pass
+# and department stats are rebuilt from independent aggregates, which
+# avoids the multiplicative users x events x registrations join.
+#
+# Registrations only disappear when a user is removed (their own, and
+# through the cascade those for events they organized). The remover
+# calls release_user_registrations() in its transaction, which
+# subtracts the already-folded ones from the buckets, so the buckets
+# keep matching the live rows without a full rebuild.
+#
+# Only one process refreshes at a time (MySQL GET_LOCK), so every
+# server worker can run a RollupRefresher safely.
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from storage import DB_ERRORS
+
+ROLLUP_LOCK_NAME = 'campussphere_analytics_rollup'
+
+# Hourly buckets are only kept for recent history; longer ranges are
+# served from the daily buckets
+HOURLY_RETENTION_DAYS = 31
+
+# Registrations younger than this are left for the next pass so that
+# transactions still in flight with lower ids are not skipped
+SETTLE_SECONDS = 10
+
+
+def _get_meta(cursor):
+    cursor.execute("""
+        SELECT registration_watermark, refreshed_at
+        FROM analytics_rollup_meta
+        WHERE name = 'rollups'
+        FOR UPDATE
+    """)
+    row = cursor.fetchone()
+    if row is None:
+        cursor.execute("""
+            INSERT INTO analytics_rollup_meta (name, registration_watermark, refreshed_at)
+            VALUES ('rollups', 0, NULL)
+        """)
+        return 0
+    return row[0]
+
+
+def _fold_new_registrations(cursor, watermark):
+    """Aggregate registrations with id above the watermark; returns the new watermark"""
+    # ORDER BY ... LIMIT 1 walks the primary key backwards and stops at
+    # the first settled row; MAX(id) with this filter scans the table
+    cursor.execute("""
+        SELECT id
+        FROM event_registrations
+        WHERE registered_at < NOW() - INTERVAL %s SECOND
+        ORDER BY id DESC
+        LIMIT 1
+    """, (SETTLE_SECONDS,))
+    row = cursor.fetchone()
+    high = row[0] if row else 0
+    if high <= watermark:
+        return watermark
+
+    cursor.execute("""
+        INSERT INTO analytics_registration_daily (day, department_id, category, role, registrations)
+        SELECT DATE(er.registered_at), COALESCE(u.department_id, 0),
+               COALESCE(e.category, ''), u.role, COUNT(*)
+        FROM event_registrations er
+        JOIN users u ON er.user_id = u.id
+        JOIN events e ON er.event_id = e.id
+        WHERE er.id > %s AND er.id <= %s
+        GROUP BY DATE(er.registered_at), COALESCE(u.department_id, 0), COALESCE(e.category, ''), u.role
+        ON DUPLICATE KEY UPDATE registrations = registrations + VALUES(registrations)
+    """, (watermark, high))
+
+    cursor.execute("""
+        INSERT INTO analytics_registration_hourly (hour, department_id, category, role, registrations)
+        SELECT DATE_FORMAT(er.registered_at, '%Y-%m-%d %H:00:00'), COALESCE(u.department_id, 0),
+               COALESCE(e.category, ''), u.role, COUNT(*)
+        FROM event_registrations er
+        JOIN users u ON er.user_id = u.id
+        JOIN events e ON er.event_id = e.id
+        WHERE er.id > %s AND er.id <= %s
+          AND er.registered_at >= NOW() - INTERVAL %s DAY
+        GROUP BY DATE_FORMAT(er.registered_at, '%Y-%m-%d %H:00:00'), COALESCE(u.department_id, 0),
+                 COALESCE(e.category, ''), u.role
+        ON DUPLICATE KEY UPDATE registrations = registrations + VALUES(registrations)
+    """, (watermark, high, HOURLY_RETENTION_DAYS))
+    cursor.execute("DELETE FROM analytics_registration_hourly WHERE hour < NOW() - INTERVAL %s DAY",
+                   (HOURLY_RETENTION_DAYS,))
+
+    cursor.execute("""
+        INSERT INTO analytics_monthly_registrations (month, registrations)
+        SELECT DATE_FORMAT(er.registered_at, '%Y-%m'), COUNT(*)
+        FROM event_registrations er
+        WHERE er.id > %s AND er.id <= %s
+        GROUP BY DATE_FORMAT(er.registered_at, '%Y-%m')
+        ON DUPLICATE KEY UPDATE registrations = registrations + VALUES(registrations)
+    """, (watermark, high))
+    return high
+
+
+def _subtract_buckets(cursor, table, key_columns, rows):
+    """Subtract (key..., count) rows from a bucket table, never below zero"""
+    if not rows:
+        return
+    where = ' AND '.join(f"{column} = %s" for column in key_columns)
+    cursor.executemany(f"""
+        UPDATE {table}
+        SET registrations = CASE WHEN registrations > %s THEN registrations - %s ELSE 0 END
+        WHERE {where}
+    """, [(row[-1], row[-1], *row[:-1]) for row in rows])
+
+
+def release_user_registrations(conn, user_ids):
+    """
+    Take the registrations that go away with `user_ids` (their own and
+    those for events they organized) off the registration buckets.
+    Call in the deleting transaction, before the DELETE. Buckets are
+    keyed by the user's department and role at the time they were
+    folded; a user moved since is subtracted from their current ones.
+    """
+    cursor = conn.cursor()
+    try:
+        # Waits for a refresh in progress, and keeps the next one from
+        # folding rows this transaction is about to delete
+        watermark = _get_meta(cursor)
+        if not watermark:
+            return
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        removed = f"""
+            FROM event_registrations er
+            JOIN users u ON er.user_id = u.id
+            JOIN events e ON er.event_id = e.id
+            WHERE er.id <= %s AND (er.user_id IN ({placeholders}) OR e.organizer_id IN ({placeholders}))
+        """
+        params = [watermark, *user_ids, *user_ids]
+
+        cursor.execute(f"""
+            SELECT DATE(er.registered_at), COALESCE(u.department_id, 0), COALESCE(e.category, ''), u.role,
+                   COUNT(*)
+            {removed}
+            GROUP BY DATE(er.registered_at), COALESCE(u.department_id, 0), COALESCE(e.category, ''), u.role
+        """, params)
+        _subtract_buckets(cursor, 'analytics_registration_daily',
+                          ('day', 'department_id', 'category', 'role'), cursor.fetchall())
+
+        cursor.execute(f"""
+            SELECT DATE_FORMAT(er.registered_at, '%Y-%m-%d %H:00:00'), COALESCE(u.department_id, 0),
+                   COALESCE(e.category, ''), u.role, COUNT(*)
+            {removed}
+              AND er.registered_at >= NOW() - INTERVAL %s DAY
+            GROUP BY DATE_FORMAT(er.registered_at, '%Y-%m-%d %H:00:00'), COALESCE(u.department_id, 0),
+                     COALESCE(e.category, ''), u.role
+        """, params + [HOURLY_RETENTION_DAYS])
+        _subtract_buckets(cursor, 'analytics_registration_hourly',
+                          ('hour', 'department_id', 'category', 'role'), cursor.fetchall())
+
+        cursor.execute(f"""
+            SELECT DATE_FORMAT(er.registered_at, '%Y-%m'), COUNT(*)
+            {removed}
+            GROUP BY DATE_FORMAT(er.registered_at, '%Y-%m')
+        """, params)
+        _subtract_buckets(cursor, 'analytics_monthly_registrations', ('month',), cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def _rebuild_small_rollups(cursor):
+    """Recompute the per-role, per-category and per-department tables"""
+    cursor.execute("DELETE FROM analytics_user_stats")
+    cursor.execute("""
+        INSERT INTO analytics_user_stats (role, status, count)
+        SELECT role, status, COUNT(*) FROM users GROUP BY role, status
+    """)
+
+    cursor.execute("DELETE FROM analytics_event_stats")
+    cursor.execute("""
+        INSERT INTO analytics_event_stats (category, status, count)
+        SELECT COALESCE(category, ''), status, COUNT(*)
+        FROM events
+        GROUP BY COALESCE(category, ''), status
+    """)
+
+    # Each measure is aggregated on its own and joined per department,
+    # so the cost is linear in each table rather than their product
+    cursor.execute("DELETE FROM analytics_department_stats")
+    cursor.execute("""
+        INSERT INTO analytics_department_stats
+            (department_id, total_users, events_organized, total_registrations)
+        SELECT d.id,
+               COALESCE(uc.n, 0),
+               COALESCE(ec.n, 0),
+               COALESCE(rc.n, 0)
+        FROM departments d
+        LEFT JOIN (
+            SELECT department_id, COUNT(*) as n
+            FROM users
+            GROUP BY department_id
+        ) uc ON uc.department_id = d.id
+        LEFT JOIN (
+            SELECT u.department_id, COUNT(*) as n
+            FROM events e
+            JOIN users u ON e.organizer_id = u.id
+            GROUP BY u.department_id
+        ) ec ON ec.department_id = d.id
+        LEFT JOIN (
+            SELECT department_id, SUM(registrations) as n
+            FROM analytics_registration_daily
+            GROUP BY department_id
+        ) rc ON rc.department_id = d.id
+    """)
+
+
+def refresh_rollups(conn, full=False):
+    """
+    Bring every rollup table up to date in one transaction
+    With full=True the registration buckets are rebuilt from scratch
+    Returns False if another process holds the refresh lock
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, 0)", (ROLLUP_LOCK_NAME,))
+        if cursor.fetchone()[0] != 1:
+            return False
+        try:
+            watermark = _get_meta(cursor)
+            if full:
+                cursor.execute("DELETE FROM analytics_registration_daily")
+                cursor.execute("DELETE FROM analytics_registration_hourly")
+                cursor.execute("DELETE FROM analytics_monthly_registrations")
+                watermark = 0
+
+            watermark = _fold_new_registrations(cursor, watermark)
+            _rebuild_small_rollups(cursor)
+
+            cursor.execute("""
+                UPDATE analytics_rollup_meta
+                SET registration_watermark = %s, refreshed_at = NOW()
+                WHERE name = 'rollups'
+            """, (watermark,))
+            conn.commit()
+            return True
+        except DB_ERRORS:
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (ROLLUP_LOCK_NAME,))
+            cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+# ===================================================================
+# TIME-BUCKETED QUERIES
+# ===================================================================
+BUCKET_SIZES = ('hour', 'day', 'week', 'month')
+DIMENSIONS = ('department', 'category', 'role')
+
+
+def bucket_start(moment, bucket):
+    """Truncate a date/datetime to the start of its bucket"""
+    if bucket == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if isinstance(moment, datetime):
+        moment = moment.date()
+    if bucket == 'week':
+        return moment - timedelta(days=moment.weekday())  # ISO weeks start Monday
+    if bucket == 'month':
+        return moment.replace(day=1)
+    return moment
+
+
+def _next_bucket(moment, bucket):
+    if bucket == 'hour':
+        return moment + timedelta(hours=1)
+    if bucket == 'day':
+        return moment + timedelta(days=1)
+    if bucket == 'week':
+        return moment + timedelta(days=7)
+    if moment.month == 12:
+        return moment.replace(year=moment.year + 1, month=1)
+    return moment.replace(month=moment.month + 1)
+
+
+def bucket_range(start, end, bucket):
+    """Every bucket start between start and end (inclusive)"""
+    if bucket == 'hour':
+        current = datetime.combine(start, datetime.min.time())
+        last = datetime.combine(end, datetime.min.time()).replace(hour=23)
+    else:
+        current = bucket_start(start, bucket)
+        last = bucket_start(end, bucket)
+    buckets = []
+    while current <= last:
+        buckets.append(current)
+        current = _next_bucket(current, bucket)
+    return buckets
+
+
+def rollup_series(rows, start, end, bucket):
+    """
+    Roll pre-aggregated (moment, key, registrations) rows up to `bucket`
+    Returns a list of series, one per key, with zero-filled points
+    """
+    buckets = bucket_range(start, end, bucket)
+    index = {b: i for i, b in enumerate(buckets)}
+    series = {}
+    for moment, key, registrations in rows:
+        points = series.get(key)
+        if points is None:
+            points = series[key] = [0] * len(buckets)
+        i = index.get(bucket_start(moment, bucket))
+        if i is not None:
+            points[i] += int(registrations)
+
+    return [{
+        "key": key,
+        "total": sum(points),
+        "points": [{"bucket": b.isoformat(), "registrations": n} for b, n in zip(buckets, points)]
+    } for key, points in sorted(series.items(), key=lambda item: -sum(item[1]))]
+
+
+def query_registration_buckets(cursor, start, end, bucket, dimension=None):
+    """
+    Read registration counts between start and end (dates, inclusive) from
+    the hourly or daily bucket table, grouped by `dimension` when given
+    Returns rows of (moment, key, registrations)
+    """
+    if bucket == 'hour':
+        table, time_col = 'analytics_registration_hourly', 'r.hour'
+        upper = datetime.combine(end, datetime.min.time()) + timedelta(days=1)
+        time_filter, params = f"{time_col} >= %s AND {time_col} < %s", [start, upper]
+    else:
+        table, time_col = 'analytics_registration_daily', 'r.day'
+        time_filter, params = f"{time_col} BETWEEN %s AND %s", [start, end]
+
+    if dimension == 'department':
+        key_sql, join_sql = "COALESCE(d.name, 'Unassigned')", "LEFT JOIN departments d ON d.id = r.department_id"
+    elif dimension == 'category':
+        key_sql, join_sql = "r.category", ""
+    elif dimension == 'role':
+        key_sql, join_sql = "r.role", ""
+    else:
+        key_sql, join_sql = "'all'", ""
+
+    cursor.execute(f"""
+        SELECT {time_col} as moment, {key_sql} as dim_key, SUM(r.registrations) as registrations
+        FROM {table} r
+        {join_sql}
+        WHERE {time_filter}
+        GROUP BY moment, dim_key
+    """, params)
+    return cursor.fetchall()
+
+
+class RollupRefresher:
+    """
+    Daemon thread calling refresh_rollups() every `interval` seconds
+
+    Args:
+        connection_factory: callable returning a DB connection (or None)
+        interval: seconds between refresh passes
+    """
+
+    def __init__(self, connection_factory, interval=60.0):
+        self._connection_factory = connection_factory
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='analytics-rollups', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            conn = self._connection_factory()
+            if conn:
+                try:
+                    refresh_rollups(conn)
+                except DB_ERRORS as err:
+                    print(f"Analytics rollup refresh error: {err}")
+                finally:
+                    conn.close()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
@@ -4,52 +4,199 @@
 # This is the main backend server for the CampusSphere platform
 # It provides APIs for student, faculty, and admin dashboards
 
-from flask import Flask, jsonify, request, session
+from flask import (Flask, jsonify, request, session, g, has_request_context, make_response, Response,
+                   stream_with_context)
 from flask_cors import CORS
-from flask_bcrypt import Bcrypt
-import mysql.connector
 import os
 from dotenv import load_dotenv
 import json
-from datetime import datetime, timedelta
+import re
+from datetime import datetime, timedelta, timezone
 from functools import wraps
 import secrets
 import uuid
+import base64
+import hashlib
+import threading
+import time
+import click
+import csv
+import io
+from storage import (storage_from_env, DB_ERRORS, DB_INTEGRITY_ERRORS, StorageUnavailableError,
+                     is_duplicate_key)
+from password_hashing import hasher_from_env, HashQueueFullError
+from settings_cache import SettingsSnapshot
+from json_encoding import FastJSONProvider, decode_json_columns, dumps_bytes
+from recommendations import SkillRecommender
+from mentor_matching import assign_mentors
+from schema_migrations import migrate as run_migrations, migration_status, baseline as baseline_migrations
+from query_plans import check_query_plans
+from metrics import RequestMetrics, process_memory
+from query_diagnostics import QueryDiagnostics
+from event_stream import BroadcastHub, parse_last_event_id
+from stream_relay import StreamRelay
+from analytics_rollups import (RollupRefresher, refresh_rollups, release_user_registrations,
+                               query_registration_buckets, rollup_series, BUCKET_SIZES, DIMENSIONS,
+                               HOURLY_RETENTION_DAYS)
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Initialize Flask application
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # Native datetime/decimal encoding, orjson when available
 CORS(app, supports_credentials=True)  # Enable CORS with credentials for sessions
-bcrypt = Bcrypt(app)  # Password hashing
+hasher = hasher_from_env()  # Password hashing on a bounded process pool
 app.secret_key = os.getenv("SECRET_KEY", secrets.token_hex(32))  # Secure secret key
 
 # ===================================================================
 # DATABASE CONNECTION UTILITY
 # ===================================================================
+_storage = None
+_storage_lock = threading.Lock()
+
+def _forget_parent_storage():
+    # After fork the child shares the parent's pooled sockets; leave them
+    # to the parent and let get_storage() open this process's own pool
+    global _storage, _storage_lock
+    _storage = None
+    _storage_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_forget_parent_storage)
+
+# Opt-in slow-query log and N+1 detector (QUERY_DIAGNOSTICS=true)
+query_diagnostics = QueryDiagnostics(
+    slow_threshold=float(os.getenv("QUERY_SLOW_MS", "100")) / 1000,
+    repeat_threshold=int(os.getenv("QUERY_REPEAT_THRESHOLD", "5")),
+    log=app.logger.warning
+) if os.getenv("QUERY_DIAGNOSTICS", "false").lower() == "true" else None
+
+# Opt-in request/query instrumentation served on /metrics (METRICS_ENABLED=true);
+# outside debug the endpoint also needs METRICS_TOKEN
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+request_metrics = RequestMetrics(diagnostics=query_diagnostics) \
+    if METRICS_ENABLED or query_diagnostics is not None else None
+
+def mysql_connect_args():
+    """Connection settings for the MySQL primary, from DB_* variables"""
+    return {
+        "host": os.getenv("DB_HOST", "localhost"),
+        "user": os.getenv("DB_USER", "root"),
+        "password": os.getenv("DB_PASSWORD", ""),
+        "database": os.getenv("DB_NAME", "campussphere_db"),
+        "charset": 'utf8mb4',
+        "autocommit": False  # Manual transaction control
+    }
+
+def get_storage():
+    """
+    Return the process-wide storage backend, creating it on first use
+    DB_BACKEND selects mysql (pooled, sized by DB_POOL_*) or sqlite (SQLITE_*)
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = storage_from_env(mysql_connect_args(), observer=request_metrics)
+    return _storage
+
 def get_db_connection():
     """
-    Create and return a database connection
+    Check out a database connection from the storage backend
+    Inside a @read_replica GET handler this may be a read replica
+    Calling conn.close() returns it for reuse
     Returns None if connection fails
     """
     try:
-        conn = mysql.connector.connect(
-            host=os.getenv("DB_HOST", "localhost"),
-            user=os.getenv("DB_USER", "root"),
-            password=os.getenv("DB_PASSWORD", ""),
-            database=os.getenv("DB_NAME", "campussphere_db"),
-            charset='utf8mb4',
-            autocommit=False  # Manual transaction control
-        )
-        return conn
-    except mysql.connector.Error as err:
+        return get_storage().get_connection(read_only=reads_from_replica())
+    except DB_ERRORS + (StorageUnavailableError,) as err:
         print(f"Database connection error: {err}")
         return None
 
+# In-memory copy of platform_settings; read with platform_settings.get(key, default)
+platform_settings = SettingsSnapshot(
+    get_db_connection,
+    check_interval=float(os.getenv("SETTINGS_CHECK_INTERVAL", "5"))
+)
+
+# Background refresher for the /api/admin/analytics rollup tables
+analytics_refresher = RollupRefresher(
+    get_db_connection,
+    interval=float(os.getenv("ANALYTICS_REFRESH_INTERVAL", "60"))
+)
+
+# Skill-matching index over active collaboration posts (needs numpy)
+skill_recommender = SkillRecommender(
+    get_db_connection,
+    min_refresh_interval=float(os.getenv("RECOMMENDER_REFRESH_INTERVAL", "30"))
+)
+
+# ===================================================================
+# REQUEST METRICS
+# ===================================================================
+# Routes are labelled by their URL rule (/api/student/events/<int:event_id>/register)
+# so label cardinality stays bounded. Streaming responses are timed up to
+# the point the response is returned, not until the last chunk is sent.
+
+if request_metrics is not None:
+    @app.before_request
+    def start_request_metrics():
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        request_metrics.start_request(request.method, route)
+
+    @app.after_request
+    def finish_request_metrics(response):
+        request_metrics.finish_request(response.status_code)
+        return response
+
+    def _pool_gauges():
+        stats = get_storage().stats()
+        return {(state,): stats[state] for state in ('open', 'idle', 'in_use', 'waiters')}
+
+    def _pool_counters():
+        stats = get_storage().stats()
+        return {(event,): stats[event] for event in ('checkouts', 'timeouts', 'recycled', 'validation_failures')}
+
+    request_metrics.registry.gauge_callback(
+        'campussphere_db_pool_connections', 'Pool connections by state', _pool_gauges, ('state',))
+    request_metrics.registry.counter_callback(
+        'campussphere_db_pool_events_total', 'Pool checkout, timeout and recycle events', _pool_counters, ('event',))
+    request_metrics.registry.gauge_callback(
+        'campussphere_process_memory_bytes', 'Resident (rss) and proportional (pss) memory of this process',
+        lambda: {(kind,): value for kind, value in process_memory().items()}, ('kind',))
+
+    if os.getenv("DB_REPLICA_HOSTS", "").strip():
+        def _replica_lag():
+            replicas = get_storage().stats().get('read_replicas', {}).get('replicas', {})
+            return {(name,): r['lag_s'] for name, r in replicas.items() if r['lag_s'] is not None}
+
+        def _replica_rotation():
+            replicas = get_storage().stats().get('read_replicas', {}).get('replicas', {})
+            return {(name,): int(r['in_rotation']) for name, r in replicas.items()}
+
+        request_metrics.registry.gauge_callback(
+            'campussphere_db_replica_lag_seconds', 'Replication lag at the last check', _replica_lag, ('replica',))
+        request_metrics.registry.gauge_callback(
+            'campussphere_db_replica_in_rotation', '1 if the replica is serving reads', _replica_rotation, ('replica',))
+
 # ===================================================================
 # AUTHENTICATION MIDDLEWARE
 # ===================================================================
+def session_denied(user_session, allowed_roles=None):
+    """
+    Check a session against an endpoint's access rule
+    Returns (error message, status) when access is denied, else None
+    """
+    # Check if user is logged in
+    if 'user_id' not in user_session:
+        return "Authentication required", 401
+    
+    # Check role permissions if specified
+    if allowed_roles and user_session.get('role') not in allowed_roles:
+        return "Insufficient permissions", 403
+    
+    return None
+
 def login_required(allowed_roles=None):
     """
     Decorator to protect routes that require authentication
@@ -59,15 +206,224 @@ def login_required(allowed_roles=None):
     def decorator(f):
         @wraps(f)
         def wrapper(*args, **kwargs):
-            # Check if user is logged in
-            if 'user_id' not in session:
-                return jsonify({"error": "Authentication required"}), 401
-            
-            # Check role permissions if specified
-            if allowed_roles and session.get('role') not in allowed_roles:
-                return jsonify({"error": "Insufficient permissions"}), 403
+            denied = session_denied(session, allowed_roles)
+            if denied:
+                return jsonify({"error": denied[0]}), denied[1]
             
             return f(*args, **kwargs)
+        # Read by the ASGI entry point (asgi.py) to apply the same rule
+        wrapper.login_required = True
+        wrapper.allowed_roles = allowed_roles
+        return wrapper
+    return decorator
+
+# ===================================================================
+# READ REPLICA ROUTING
+# ===================================================================
+# With DB_REPLICA_HOSTS set, GET requests to handlers marked @read_replica
+# read from a replica; everything else uses the primary. After a
+# successful write the user's session is pinned to the primary for
+# DB_PRIMARY_PIN_SECONDS so they read their own writes (e.g. the
+# "registered" flag right after registering for an event). Keep the pin
+# at least DB_REPLICA_MAX_LAG + DB_REPLICA_CHECK_INTERVAL.
+
+READ_REPLICAS_ENABLED = bool(os.getenv("DB_REPLICA_HOSTS", "").strip())
+PRIMARY_PIN_SECONDS = float(os.getenv("DB_PRIMARY_PIN_SECONDS", "10"))
+
+def read_replica(f):
+    """Decorator letting a handler's GET requests read from a replica"""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if request.method == 'GET':
+            g.read_replica = True
+        return f(*args, **kwargs)
+    return wrapper
+
+def reads_from_replica():
+    """True if connections checked out now may come from a replica"""
+    if not READ_REPLICAS_ENABLED or not has_request_context() or not g.get('read_replica'):
+        return False
+    return session.get('primary_until', 0) <= time.time()
+
+if READ_REPLICAS_ENABLED:
+    @app.after_request
+    def pin_session_to_primary(response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400 \
+                and 'user_id' in session:
+            session['primary_until'] = time.time() + PRIMARY_PIN_SECONDS
+        return response
+
+# ===================================================================
+# PAGINATION HELPERS
+# ===================================================================
+# List endpoints use keyset (cursor) pagination: the cursor encodes the
+# sort column value and id of the last row served, so every page is an
+# index range scan no matter how deep the client goes.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(sort_value, row_id):
+    """Encode the (sort value, id) of the last row as an opaque token"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(token):
+    """
+    Decode a cursor token back into (sort value, id)
+    Raises ValueError on malformed tokens
+    """
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+def get_page_params(args=None):
+    """
+    Read ?limit= and ?cursor= from the query string (or `args`)
+    Returns (limit, cursor) where cursor is None for the first page
+    Raises ValueError on bad input
+    """
+    args = request.args if args is None else args
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    token = args.get('cursor')
+    cursor = decode_cursor(token) if token else None
+    return limit, cursor
+
+def keyset_condition(sort_column, id_column, cursor, descending=True):
+    """
+    Build the WHERE fragment that resumes after `cursor`
+    Returns (sql, params); sql is empty for the first page
+    """
+    if cursor is None:
+        return "", []
+    op = '<' if descending else '>'
+    sql = f" AND ({sort_column} {op} %s OR ({sort_column} = %s AND {id_column} {op} %s))"
+    sort_value, row_id = cursor
+    return sql, [sort_value, sort_value, row_id]
+
+def build_page(rows, limit, sort_field):
+    """
+    Trim the look-ahead row fetched with LIMIT n+1 and compute next_cursor
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more and rows:
+        next_cursor = encode_cursor(rows[-1][sort_field], rows[-1]['id'])
+    return rows, next_cursor
+
+# ===================================================================
+# HTTP CACHING HELPERS
+# ===================================================================
+# Feed endpoints answer conditional GETs from the table_versions table:
+# every write path bumps the version of the tables it touches (as the
+# last statement before commit), so a single primary-key lookup tells
+# us whether a client's cached copy is still current.
+
+def bump_table_version(cursor, *tables):
+    """Increment the change version of `tables` inside the caller's transaction"""
+    for table in tables:
+        cursor.execute("""
+            INSERT INTO table_versions (table_name, version) VALUES (%s, 1)
+            ON DUPLICATE KEY UPDATE version = version + 1, updated_at = NOW()
+        """, (table,))
+
+def table_versions_query(tables):
+    placeholders = ', '.join(['%s'] * len(tables))
+    return f"""
+        SELECT table_name, version, updated_at
+        FROM table_versions
+        WHERE table_name IN ({placeholders})
+    """, tuple(tables)
+
+def table_versions_from_rows(tables, rows):
+    """Returns ({table: version}, last_modified) from table_versions rows"""
+    versions = {table: 0 for table in tables}
+    last_modified = None
+    for row in rows:
+        versions[row['table_name']] = row['version']
+        if row['updated_at'] and (last_modified is None or row['updated_at'] > last_modified):
+            last_modified = row['updated_at']
+    return versions, last_modified
+
+def cache_validators(full_path, tables, versions, last_modified, user_id=None, per_user=False):
+    """ETag and (UTC, whole-second) Last-Modified for a conditional GET"""
+    parts = [full_path] + [f"{t}:{versions[t]}" for t in tables]
+    if per_user:
+        parts.append(f"user:{user_id}")
+    etag = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+    if last_modified:
+        last_modified = last_modified.replace(microsecond=0, tzinfo=timezone.utc)
+    return etag, last_modified
+
+def get_table_versions(tables):
+    """
+    Read current versions for `tables`
+    Returns ({table: version}, last_modified) or (None, None) on failure
+    """
+    conn = get_db_connection()
+    if not conn:
+        return None, None
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute(*table_versions_query(tables))
+        return table_versions_from_rows(tables, cursor.fetchall())
+    except DB_ERRORS:
+        return None, None
+    finally:
+        cursor.close()
+        conn.close()
+
+def conditional_get(*tables, per_user=False):
+    """
+    Decorator adding ETag / Last-Modified validators to a GET endpoint
+    Answers If-None-Match / If-Modified-Since with 304 before the handler runs
+    Args:
+        tables: tables whose contents the response depends on
+        per_user: include the session user in the ETag (per-user fields)
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return f(*args, **kwargs)
+
+            versions, last_modified = get_table_versions(tables)
+            if versions is None:
+                # Can't validate; fall through to a normal response
+                return f(*args, **kwargs)
+
+            etag, last_modified = cache_validators(
+                request.full_path, tables, versions, last_modified, session.get('user_id'), per_user)
+
+            not_modified = False
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            elif request.if_modified_since and last_modified:
+                not_modified = last_modified <= request.if_modified_since
+
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = 'private, no-cache' if per_user else 'no-cache'
+            return response
+        wrapper.conditional_get = (tables, per_user)
         return wrapper
     return decorator
 
@@ -84,7 +440,11 @@ def test_connection():
         "status": "healthy"
     }), 200
 
+DEPARTMENTS_QUERY = "SELECT id, name, code FROM departments ORDER BY name"
+
 @app.route('/api/departments', methods=['GET'])
+@read_replica
+@conditional_get('departments')
 def get_departments():
     """Get all departments for form dropdowns"""
     conn = get_db_connection()
@@ -93,11 +453,199 @@ def get_departments():
     
     cursor = conn.cursor(dictionary=True)
     try:
-        cursor.execute("SELECT id, name, code FROM departments ORDER BY name")
+        cursor.execute(DEPARTMENTS_QUERY)
         departments = cursor.fetchall()
         return jsonify(departments), 200
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
+        return jsonify({"error": f"Database error: {err}"}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+@app.route('/api/admin/pool-stats', methods=['GET'])
+@login_required(['admin'])
+def get_pool_stats():
+    """Get database connection pool (or SQLite storage) statistics"""
+    return jsonify(get_storage().stats()), 200
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Prometheus scrape endpoint (METRICS_ENABLED=true)
+    Requires `Authorization: Bearer <METRICS_TOKEN>`; only the debug
+    server may serve it without a token
+    """
+    if not METRICS_ENABLED:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    token = os.getenv("METRICS_TOKEN")
+    if not token and not app.debug:
+        return jsonify({"error": "Set METRICS_TOKEN to expose metrics"}), 403
+    if token and not secrets.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+        return jsonify({"error": "Authentication required"}), 401
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/admin/query-diagnostics', methods=['GET', 'DELETE'])
+@login_required(['admin'])
+def get_query_diagnostics():
+    """
+    Per-route query summary from the N+1 detector (needs QUERY_DIAGNOSTICS=true)
+    DELETE clears the accumulated summary
+    """
+    if query_diagnostics is None:
+        return jsonify({"error": "Query diagnostics are disabled; set QUERY_DIAGNOSTICS=true"}), 404
+    if request.method == 'DELETE':
+        query_diagnostics.reset()
+        return jsonify({"message": "Query diagnostics reset"}), 200
+    try:
+        top = max(1, min(int(request.args.get('top', 5)), 50))
+    except ValueError:
+        return jsonify({"error": "top must be an integer"}), 400
+    return jsonify(query_diagnostics.report(top)), 200
+
+@app.route('/api/admin/hash-stats', methods=['GET'])
+@login_required(['admin'])
+def get_hash_stats():
+    """Get password hashing queue depth and latency statistics"""
+    return jsonify(hasher.stats()), 200
+
+SEARCH_TYPES = ('event', 'collaboration', 'announcement')
+SEARCH_MAX_OFFSET = 1000
+
+def search_match(dialect, table, alias, columns, q):
+    """
+    Full-text match on `table` for the active backend
+    MySQL uses the FULLTEXT indexes from migration 006, SQLite the FTS5
+    tables from sqlite_schema.sql
+    Returns (from_sql, score_sql, match_sql, params) with params in
+    SELECT-then-WHERE order
+    """
+    if dialect == 'sqlite':
+        fts = f"{table}_fts"
+        # Natural-language mode ~ any of the words, ranked by relevance
+        terms = ' OR '.join(f'"{term}"' for term in re.findall(r'\w+', q))
+        if not terms:
+            return f"{table} {alias}", "0", "1 = 0", []
+        return f"{fts} JOIN {table} {alias} ON {alias}.id = {fts}.rowid", f"-bm25({fts})", f"{fts} MATCH %s", [terms]
+    match = f"MATCH({', '.join(f'{alias}.{c}' for c in columns)}) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+    return f"{table} {alias}", match, match, [q, q]
+
+def build_search_query(dialect, args, role):
+    """
+    Validate /api/search parameters and build the ranked UNION query
+    Returns (sql, params, limit, offset), or None when no type can match
+    Raises ValueError with the client-facing message on bad input
+    """
+    q = args.get('q', '').strip()
+    if len(q) < 3:
+        raise ValueError("Search query must be at least 3 characters")
+
+    types = [t.strip() for t in args.get('type', ','.join(SEARCH_TYPES)).split(',') if t.strip()]
+    if not types or any(t not in SEARCH_TYPES for t in types):
+        raise ValueError(f"type must be one of {', '.join(SEARCH_TYPES)}")
+    category = args.get('category')
+
+    try:
+        limit = max(1, min(int(args.get('limit', 20)), 100))
+        offset = int(args.get('cursor') or 0)
+    except ValueError:
+        raise ValueError("limit and cursor must be integers")
+    if offset < 0 or offset > SEARCH_MAX_OFFSET:
+        raise ValueError("cursor out of range")
+
+    # Each branch filters through its full-text index; results are merged by score
+    branches = []
+    params = []
+    if 'event' in types:
+        from_sql, score_sql, match_sql, branch_params = search_match(
+            dialect, 'events', 'e', ('title', 'description'), q)
+        sql = f"""
+            SELECT 'event' as type, e.id, e.title, LEFT(e.description, 300) as snippet,
+                   e.category, e.start_datetime as date, {score_sql} as score
+            FROM {from_sql}
+            WHERE e.status = 'approved' AND {match_sql}
+        """
+        if category:
+            sql += " AND e.category = %s"
+            branch_params.append(category)
+        branches.append(sql)
+        params.extend(branch_params)
+
+    if 'collaboration' in types:
+        from_sql, score_sql, match_sql, branch_params = search_match(
+            dialect, 'collaboration_posts', 'cp', ('title', 'description', 'skills_search'), q)
+        sql = f"""
+            SELECT 'collaboration' as type, cp.id, cp.title, LEFT(cp.description, 300) as snippet,
+                   cp.project_category as category, cp.created_at as date, {score_sql} as score
+            FROM {from_sql}
+            WHERE cp.status = 'active' AND {match_sql}
+        """
+        if category:
+            sql += " AND cp.project_category = %s"
+            branch_params.append(category)
+        branches.append(sql)
+        params.extend(branch_params)
+
+    # Announcements have no category, so a category filter excludes them
+    if 'announcement' in types and not category:
+        from_sql, score_sql, match_sql, branch_params = search_match(
+            dialect, 'announcements', 'a', ('title', 'message'), q)
+        sql = f"""
+            SELECT 'announcement' as type, a.id, a.title, LEFT(a.message, 300) as snippet,
+                   NULL as category, a.created_at as date, {score_sql} as score
+            FROM {from_sql}
+            WHERE {match_sql}
+              AND (a.expires_at IS NULL OR a.expires_at > NOW())
+        """
+        if role != 'admin':
+            sql += " AND a.target_audience IN ('all', %s, %s)"
+            branch_params.extend([role, role + 's'])
+        branches.append(sql)
+        params.extend(branch_params)
+
+    if not branches:
+        return None
+
+    sql = " UNION ALL ".join(branches) + " ORDER BY score DESC, date DESC LIMIT %s OFFSET %s"
+    return sql, params + [limit + 1, offset], limit, offset
+
+def search_page(results, limit, offset):
+    """Trim the look-ahead row; returns the /api/search response body"""
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        if offset + limit <= SEARCH_MAX_OFFSET:
+            next_cursor = str(offset + limit)
+    return {"items": results, "next_cursor": next_cursor}
+
+@app.route('/api/search', methods=['GET'])
+@login_required()
+@read_replica
+def search():
+    """
+    Ranked full-text search across events, collaboration posts and announcements
+    Query params: q, type (comma-separated), category, limit, cursor
+    """
+    try:
+        query = build_search_query(get_storage().dialect, request.args, session['role'])
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+    if query is None:
+        return jsonify({"items": [], "next_cursor": None}), 200
+    sql, params, limit, offset = query
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        cursor.execute(sql, params)
+        return jsonify(search_page(cursor.fetchall(), limit, offset)), 200
+
+    except DB_ERRORS as err:
         return jsonify({"error": f"Database error: {err}"}), 500
+
     finally:
         cursor.close()
         conn.close()
@@ -135,7 +683,9 @@ def register_user():
 
     # Hash password securely
     try:
-        pw_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        pw_hash = hasher.hash_password(password)
+    except HashQueueFullError:
+        return jsonify({"error": "Server busy, please try again"}), 503
     except Exception as e:
         return jsonify({"error": "Password hashing failed"}), 500
 
@@ -182,7 +732,7 @@ def register_user():
             "requires_approval": role == 'faculty'
         }), 201
     
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         conn.rollback()
         return jsonify({"error": f"Registration failed: {err}"}), 500
     
@@ -222,7 +772,12 @@ def login_user():
         user = cursor.fetchone()
 
         # Verify user exists and password is correct
-        if not user or not bcrypt.check_password_hash(user['password_hash'], password):
+        try:
+            password_ok = bool(user) and hasher.check_password(user['password_hash'], password)
+        except HashQueueFullError:
+            return jsonify({"error": "Server busy, please try again"}), 503
+        
+        if not password_ok:
             return jsonify({"error": "Invalid email or password"}), 401
 
         # Check account status
@@ -241,8 +796,21 @@ def login_user():
         session['email'] = user['email']
         session['full_name'] = user['full_name']
 
-        # Update last login time
-        cursor.execute("UPDATE users SET updated_at = NOW() WHERE id = %s", (user['id'],))
+        # Transparently upgrade hashes made with an outdated work factor
+        new_hash = None
+        if hasher.needs_rehash(user['password_hash']):
+            try:
+                new_hash = hasher.hash_password(password)
+            except HashQueueFullError:
+                pass  # Try again on the next login
+
+        # Update last login time (and the password hash if it was upgraded)
+        if new_hash:
+            cursor.execute("UPDATE users SET password_hash = %s, updated_at = NOW() WHERE id = %s",
+                          (new_hash, user['id']))
+            hasher.record_rehash()
+        else:
+            cursor.execute("UPDATE users SET updated_at = NOW() WHERE id = %s", (user['id'],))
         conn.commit()
 
         # Return user data (excluding sensitive info)
@@ -260,7 +828,7 @@ def login_user():
             "user": user_data
         }), 200
 
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         return jsonify({"error": f"Login failed: {err}"}), 500
     
     finally:
@@ -274,8 +842,23 @@ def logout_user():
     session.clear()
     return jsonify({"message": "Logged out successfully"}), 200
 
+def profile_query(user_id):
+    return """
+        SELECT u.*, d.name as department_name
+        FROM users u 
+        LEFT JOIN departments d ON u.department_id = d.id 
+        WHERE u.id = %s
+    """, (user_id,)
+
+def public_profile(user):
+    """Decode JSON columns and remove sensitive data from a users row"""
+    decode_json_columns(user, 'skills')
+    user.pop('password_hash', None)
+    return user
+
 @app.route('/api/profile', methods=['GET'])
 @login_required()
+@read_replica
 def get_current_user():
     """Get current logged in user's profile"""
     conn = get_db_connection()
@@ -285,32 +868,15 @@ def get_current_user():
     cursor = conn.cursor(dictionary=True)
     
     try:
-        cursor.execute("""
-            SELECT u.*, d.name as department_name
-            FROM users u 
-            LEFT JOIN departments d ON u.department_id = d.id 
-            WHERE u.id = %s
-        """, (session['user_id'],))
+        cursor.execute(*profile_query(session['user_id']))
         
         user = cursor.fetchone()
         if not user:
             return jsonify({"error": "User not found"}), 404
-
-        # Parse JSON fields
-        if user.get('skills'):
-            try:
-                user['skills'] = json.loads(user['skills'])
-            except:
-                user['skills'] = []
-        else:
-            user['skills'] = []
-
-        # Remove sensitive data
-        user.pop('password_hash', None)
         
-        return jsonify(user), 200
+        return jsonify(public_profile(user)), 200
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         return jsonify({"error": f"Database error: {err}"}), 500
     
     finally:
@@ -323,6 +889,7 @@ def get_current_user():
 
 @app.route('/api/student/profile', methods=['GET', 'PUT'])
 @login_required(['student'])
+@read_replica
 def student_profile():
     """Get or update student profile information"""
     conn = get_db_connection()
@@ -345,14 +912,7 @@ def student_profile():
             if not profile:
                 return jsonify({"error": "Student profile not found"}), 404
 
-            # Parse skills JSON safely
-            if profile.get('skills'):
-                try:
-                    profile['skills'] = json.loads(profile['skills'])
-                except (json.JSONDecodeError, TypeError):
-                    profile['skills'] = []
-            else:
-                profile['skills'] = []
+            decode_json_columns(profile, 'skills')
 
             # Remove sensitive data
             profile.pop('password_hash', None)
@@ -405,13 +965,14 @@ def student_profile():
                 values.append(session['user_id'])
                 sql = f"UPDATE users SET {', '.join(update_fields)}, updated_at = NOW() WHERE id = %s"
                 cursor.execute(sql, values)
+                bump_table_version(cursor, 'users')
                 conn.commit()
                 
                 return jsonify({"message": "Profile updated successfully"}), 200
             
             return jsonify({"error": "No valid fields to update"}), 400
 
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         conn.rollback()
         return jsonify({"error": f"Database error: {err}"}), 500
     
@@ -419,10 +980,36 @@ def student_profile():
         cursor.close()
         conn.close()
 
+def student_events_query(user_id, page_cursor, limit):
+    """Approved events with the student's registration status, one keyset page"""
+    keyset_sql, keyset_params = keyset_condition(
+        'e.start_datetime', 'e.id', page_cursor, descending=False)
+    return f"""
+        SELECT e.*, 
+               u.full_name as organizer_name,
+               d.name as organizer_department,
+               er.status as registration_status,
+               er.registered_at
+        FROM events e
+        JOIN users u ON e.organizer_id = u.id
+        LEFT JOIN departments d ON u.department_id = d.id
+        LEFT JOIN event_registrations er ON e.id = er.event_id AND er.user_id = %s
+        WHERE e.status = 'approved'{keyset_sql}
+        ORDER BY e.start_datetime ASC, e.id ASC
+        LIMIT %s
+    """, [user_id, *keyset_params, limit + 1]
+
 @app.route('/api/student/events', methods=['GET'])
 @login_required(['student'])
+@read_replica
+@conditional_get('events', 'users', per_user=True)
 def get_student_events():
-    """Get events for student dashboard (all approved events)"""
+    """Get events for student dashboard (approved events, paginated by start time)"""
+    try:
+        limit, page_cursor = get_page_params()
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -430,38 +1017,13 @@ def get_student_events():
     cursor = conn.cursor(dictionary=True)
     
     try:
-        # Get all approved events with registration status for current student
-        cursor.execute("""
-            SELECT e.*, 
-                   u.full_name as organizer_name,
-                   d.name as organizer_department,
-                   er.status as registration_status,
-                   er.registered_at,
-                   COUNT(DISTINCT er2.user_id) as participant_count
-            FROM events e
-            JOIN users u ON e.organizer_id = u.id
-            LEFT JOIN departments d ON u.department_id = d.id
-            LEFT JOIN event_registrations er ON e.id = er.event_id AND er.user_id = %s
-            LEFT JOIN event_registrations er2 ON e.id = er2.event_id
-            WHERE e.status = 'approved'
-            GROUP BY e.id
-            ORDER BY e.start_datetime ASC
-        """, (session['user_id'],))
-        
-        events = cursor.fetchall()
+        cursor.execute(*student_events_query(session['user_id'], page_cursor, limit))
         
-        # Convert datetime objects to strings for JSON serialization
-        for event in events:
-            if event['start_datetime']:
-                event['start_datetime'] = event['start_datetime'].isoformat()
-            if event['end_datetime']:
-                event['end_datetime'] = event['end_datetime'].isoformat()
-            if event['registered_at']:
-                event['registered_at'] = event['registered_at'].isoformat()
+        events, next_cursor = build_page(cursor.fetchall(), limit, 'start_datetime')
         
-        return jsonify(events), 200
+        return jsonify({"items": events, "next_cursor": next_cursor}), 200
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         return jsonify({"error": f"Database error: {err}"}), 500
     
     finally:
@@ -479,39 +1041,60 @@ def register_for_event(event_id):
     cursor = conn.cursor(dictionary=True)
     
     try:
-        # Check if event exists and is approved
-        cursor.execute("SELECT * FROM events WHERE id = %s AND status = 'approved'", (event_id,))
-        event = cursor.fetchone()
-        
-        if not event:
-            return jsonify({"error": "Event not found or not available for registration"}), 404
-        
-        # Check if already registered
-        cursor.execute("SELECT * FROM event_registrations WHERE user_id = %s AND event_id = %s", 
-                      (session['user_id'], event_id))
-        
-        if cursor.fetchone():
-            return jsonify({"error": "Already registered for this event"}), 409
-        
-        # Check capacity if set
-        if event['max_participants']:
-            cursor.execute("SELECT COUNT(*) as count FROM event_registrations WHERE event_id = %s", (event_id,))
-            current_count = cursor.fetchone()['count']
-            
-            if current_count >= event['max_participants']:
-                return jsonify({"error": "Event is full"}), 409
-        
-        # Register the student
+        # Claim a seat first: the conditional UPDATE takes the event row lock,
+        # so concurrent registrations serialize here and can never oversell
         cursor.execute("""
-            INSERT INTO event_registrations (user_id, event_id, status) 
-            VALUES (%s, %s, 'registered')
-        """, (session['user_id'], event_id))
+            UPDATE events 
+            SET participant_count = participant_count + 1
+            WHERE id = %s AND status = 'approved'
+            AND (max_participants IS NULL OR max_participants = 0
+                 OR participant_count < max_participants)
+        """, (event_id,))
+        
+        if cursor.rowcount == 0:
+            conn.rollback()
+            # Slow path only: work out why the seat could not be claimed
+            cursor.execute("""
+                SELECT e.id,
+                       EXISTS(SELECT 1 FROM event_registrations er 
+                              WHERE er.event_id = e.id AND er.user_id = %s) as already_registered
+                FROM events e
+                WHERE e.id = %s AND e.status = 'approved'
+            """, (session['user_id'], event_id))
+            event = cursor.fetchone()
+            
+            if not event:
+                return jsonify({"error": "Event not found or not available for registration"}), 404
+            if event['already_registered']:
+                return jsonify({"error": "Already registered for this event"}), 409
+            return jsonify({"error": "Event is full"}), 409
         
+        # Register the student; a duplicate hits the (event_id, user_id) unique key
+        try:
+            cursor.execute("""
+                INSERT INTO event_registrations (user_id, event_id, status) 
+                VALUES (%s, %s, 'registered')
+            """, (session['user_id'], event_id))
+        except DB_INTEGRITY_ERRORS as err:
+            conn.rollback()
+            if is_duplicate_key(err):
+                return jsonify({"error": "Already registered for this event"}), 409
+            raise
+        
+        bump_table_version(cursor, 'events')
+        participant_count = None
+        if stream_hub.has_subscribers:
+            cursor.execute("SELECT participant_count FROM events WHERE id = %s", (event_id,))
+            participant_count = cursor.fetchone()['participant_count']
         conn.commit()
         
+        if participant_count is not None:
+            stream_hub.publish_coalesced('registration_count', event_id,
+                                         {"event_id": event_id, "participant_count": participant_count})
+        
         return jsonify({"message": "Successfully registered for event!"}), 201
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         conn.rollback()
         return jsonify({"error": f"Database error: {err}"}), 500
     
@@ -521,8 +1104,16 @@ def register_for_event(event_id):
 
 @app.route('/api/student/collaborate', methods=['GET', 'POST'])
 @login_required(['student'])
+@read_replica
+@conditional_get('collaboration_posts', 'users', per_user=True)
 def student_collaborate():
-    """Get collaboration posts or create new one"""
+    """Get collaboration posts (paginated, newest first) or create new one"""
+    if request.method == 'GET':
+        try:
+            limit, page_cursor = get_page_params()
+        except ValueError as err:
+            return jsonify({"error": str(err)}), 400
+
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -531,39 +1122,26 @@ def student_collaborate():
     
     try:
         if request.method == 'GET':
-            # Get all active collaboration posts with interest counts
-            cursor.execute("""
+            keyset_sql, keyset_params = keyset_condition('cp.created_at', 'cp.id', page_cursor)
+
+            # Get active collaboration posts (interest_count is a stored counter)
+            cursor.execute(f"""
                 SELECT cp.*, 
                        u.full_name as author_name,
-                       COUNT(DISTINCT ci.user_id) as interest_count,
-                       MAX(CASE WHEN ci.user_id = %s THEN 1 ELSE 0 END) as user_interested
+                       (ci.user_id IS NOT NULL) as user_interested
                 FROM collaboration_posts cp
                 JOIN users u ON cp.author_id = u.id
-                LEFT JOIN collaboration_interests ci ON cp.id = ci.post_id
-                WHERE cp.status = 'active'
-                GROUP BY cp.id
-                ORDER BY cp.created_at DESC
-            """, (session['user_id'],))
+                LEFT JOIN collaboration_interests ci ON cp.id = ci.post_id AND ci.user_id = %s
+                WHERE cp.status = 'active'{keyset_sql}
+                ORDER BY cp.created_at DESC, cp.id DESC
+                LIMIT %s
+            """, [session['user_id'], *keyset_params, limit + 1])
             
-            posts = cursor.fetchall()
+            posts, next_cursor = build_page(cursor.fetchall(), limit, 'created_at')
             
-            # Parse skills_required JSON
-            for post in posts:
-                if post.get('skills_required'):
-                    try:
-                        post['skills_required'] = json.loads(post['skills_required'])
-                    except:
-                        post['skills_required'] = []
-                else:
-                    post['skills_required'] = []
-                    
-                # Convert datetime to string
-                if post['created_at']:
-                    post['created_at'] = post['created_at'].isoformat()
-                if post['updated_at']:
-                    post['updated_at'] = post['updated_at'].isoformat()
+            decode_json_columns(posts, 'skills_required')
             
-            return jsonify(posts), 200
+            return jsonify({"items": posts, "next_cursor": next_cursor}), 200
             
         else:  # POST - Create new collaboration post
             data = request.get_json()
@@ -592,11 +1170,12 @@ def student_collaborate():
                 data.get('project_category')
             ))
             
+            bump_table_version(cursor, 'collaboration_posts')
             conn.commit()
             
             return jsonify({"message": "Collaboration post created successfully!"}), 201
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         if request.method == 'POST':
             conn.rollback()
         return jsonify({"error": f"Database error: {err}"}), 500
@@ -605,6 +1184,73 @@ def student_collaborate():
         cursor.close()
         conn.close()
 
+@app.route('/api/student/recommendations', methods=['GET'])
+@login_required(['student'])
+@read_replica
+def get_collaboration_recommendations():
+    """Active collaboration posts ranked by skill similarity to the current student"""
+    if not skill_recommender.available:
+        return jsonify({"error": "Recommendations are not available on this server"}), 503
+
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), 50))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    skill_recommender.refresh()
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    cursor = conn.cursor(dictionary=True)
+
+    try:
+        cursor.execute("SELECT skills FROM users WHERE id = %s", (session['user_id'],))
+        user = cursor.fetchone()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+
+        # Skip the student's own posts and ones they already expressed interest in
+        cursor.execute("""
+            SELECT id as post_id FROM collaboration_posts WHERE author_id = %s
+            UNION
+            SELECT post_id FROM collaboration_interests WHERE user_id = %s
+        """, (session['user_id'], session['user_id']))
+        exclude_ids = {row['post_id'] for row in cursor.fetchall()}
+
+        ranked = skill_recommender.recommend(user['skills'], exclude_ids, top_k=limit)
+        if not ranked:
+            return jsonify({"items": []}), 200
+
+        post_ids = [post_id for post_id, _, _ in ranked]
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        cursor.execute(f"""
+            SELECT cp.*, u.full_name as author_name
+            FROM collaboration_posts cp
+            JOIN users u ON cp.author_id = u.id
+            WHERE cp.id IN ({placeholders}) AND cp.status = 'active'
+        """, post_ids)
+        posts = {post['id']: post for post in cursor.fetchall()}
+        decode_json_columns(list(posts.values()), 'skills_required')
+
+        items = []
+        for post_id, score, matched in ranked:
+            post = posts.get(post_id)
+            if post:
+                post['match_score'] = score
+                post['matched_skills'] = matched
+                items.append(post)
+
+        return jsonify({"items": items}), 200
+
+    except DB_ERRORS as err:
+        return jsonify({"error": f"Database error: {err}"}), 500
+
+    finally:
+        cursor.close()
+        conn.close()
+
 @app.route('/api/student/collaborate/<int:post_id>/interest', methods=['POST'])
 @login_required(['student'])
 def express_collaboration_interest(post_id):
@@ -642,12 +1288,15 @@ def express_collaboration_interest(post_id):
             INSERT INTO collaboration_interests (post_id, user_id, message) 
             VALUES (%s, %s, %s)
         """, (post_id, session['user_id'], message))
+        cursor.execute("UPDATE collaboration_posts SET interest_count = interest_count + 1 WHERE id = %s",
+                      (post_id,))
         
+        bump_table_version(cursor, 'collaboration_posts')
         conn.commit()
         
         return jsonify({"message": "Interest expressed successfully!"}), 201
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         conn.rollback()
         return jsonify({"error": f"Database error: {err}"}), 500
     
@@ -695,12 +1344,23 @@ def organize_event():
             data.get('registration_form_url'),
             session['user_id']
         ))
+        proposal_id = cursor.lastrowid
         
+        bump_table_version(cursor, 'events')
         conn.commit()
         
+        stream_hub.publish('proposal_new', {
+            "id": proposal_id,
+            "title": data['title'],
+            "category": data['category'],
+            "start_datetime": start_datetime,
+            "organizer_id": session['user_id'],
+            "organizer_name": session.get('full_name')
+        }, roles=('faculty',))
+        
         return jsonify({"message": "Event proposal submitted successfully!"}), 201
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         conn.rollback()
         return jsonify({"error": f"Database error: {err}"}), 500
     
@@ -710,6 +1370,7 @@ def organize_event():
 
 @app.route('/api/student/organized-events', methods=['GET'])
 @login_required(['student'])
+@read_replica
 def get_organized_events():
     """Get events organized by current student"""
     conn = get_db_connection()
@@ -722,29 +1383,18 @@ def get_organized_events():
         cursor.execute("""
             SELECT e.*, 
                    u.full_name as reviewed_by_name,
-                   COUNT(DISTINCT er.user_id) as registration_count
+                   e.participant_count as registration_count
             FROM events e
             LEFT JOIN users u ON e.reviewed_by = u.id
-            LEFT JOIN event_registrations er ON e.id = er.event_id
             WHERE e.organizer_id = %s
-            GROUP BY e.id
             ORDER BY e.created_at DESC
         """, (session['user_id'],))
         
         events = cursor.fetchall()
         
-        # Convert datetime objects to strings
-        for event in events:
-            if event['start_datetime']:
-                event['start_datetime'] = event['start_datetime'].isoformat()
-            if event['end_datetime']:
-                event['end_datetime'] = event['end_datetime'].isoformat()
-            if event['reviewed_at']:
-                event['reviewed_at'] = event['reviewed_at'].isoformat()
-        
         return jsonify(events), 200
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         return jsonify({"error": f"Database error: {err}"}), 500
     
     finally:
@@ -757,6 +1407,7 @@ def get_organized_events():
 
 @app.route('/api/faculty/profile', methods=['GET', 'PUT'])
 @login_required(['faculty'])
+@read_replica
 def faculty_profile():
     """Get or update faculty profile information"""
     conn = get_db_connection()
@@ -782,22 +1433,7 @@ def faculty_profile():
             if not profile:
                 return jsonify({"error": "Faculty profile not found"}), 404
 
-            # Parse JSON fields safely
-            if profile.get('skills'):
-                try:
-                    profile['skills'] = json.loads(profile['skills'])
-                except:
-                    profile['skills'] = []
-            else:
-                profile['skills'] = []
-                
-            if profile.get('areas_of_expertise'):
-                try:
-                    profile['areas_of_expertise'] = json.loads(profile['areas_of_expertise'])
-                except:
-                    profile['areas_of_expertise'] = []
-            else:
-                profile['areas_of_expertise'] = []
+            decode_json_columns(profile, 'skills', 'areas_of_expertise')
 
             # Remove sensitive data
             profile.pop('password_hash', None)
@@ -864,12 +1500,13 @@ def faculty_profile():
                 sql = f"UPDATE faculty_profiles SET {', '.join(faculty_fields)}, updated_at = NOW() WHERE user_id = %s"
                 cursor.execute(sql, faculty_values)
 
+            bump_table_version(cursor, 'users')
             conn.commit()
             return jsonify({"message": "Profile updated successfully"}), 200
 
     # Continuation from faculty profile update section
 
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         conn.rollback()
         return jsonify({"error": f"Database error: {err}"}), 500
 
@@ -883,8 +1520,14 @@ def faculty_profile():
 
 @app.route('/api/faculty/events', methods=['GET'])
 @login_required(['faculty'])
+@read_replica
 def get_faculty_events():
-    """Get events organized by current faculty member"""
+    """Get events organized by current faculty member (paginated, newest first)"""
+    try:
+        limit, page_cursor = get_page_params()
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -892,33 +1535,32 @@ def get_faculty_events():
     cursor = conn.cursor(dictionary=True)
     
     try:
-        # Get both official faculty events and supervised student events
-        cursor.execute("""
+        keyset_sql, keyset_params = keyset_condition('created_at', 'id', page_cursor)
+
+        # Get both official faculty events and supervised student events.
+        # Each branch reads one page from its own (owner, created_at, id)
+        # index; an OR across the two columns would scan and sort instead
+        cursor.execute(f"""
             SELECT e.*, 
-                   u.full_name as organizer_name,
-                   COUNT(DISTINCT er.user_id) as participant_count
-            FROM events e
+                   u.full_name as organizer_name
+            FROM (
+                SELECT * FROM (SELECT * FROM events WHERE organizer_id = %s{keyset_sql}
+                               ORDER BY created_at DESC, id DESC LIMIT %s) organized
+                UNION
+                SELECT * FROM (SELECT * FROM events WHERE reviewed_by = %s{keyset_sql}
+                               ORDER BY created_at DESC, id DESC LIMIT %s) reviewed
+            ) e
             LEFT JOIN users u ON e.organizer_id = u.id
-            LEFT JOIN event_registrations er ON e.id = er.event_id
-            WHERE (e.organizer_id = %s OR e.reviewed_by = %s)
-            GROUP BY e.id
-            ORDER BY e.created_at DESC
-        """, (session['user_id'], session['user_id']))
+            ORDER BY e.created_at DESC, e.id DESC
+            LIMIT %s
+        """, [session['user_id'], *keyset_params, limit + 1,
+              session['user_id'], *keyset_params, limit + 1, limit + 1])
         
-        events = cursor.fetchall()
+        events, next_cursor = build_page(cursor.fetchall(), limit, 'created_at')
         
-        # Convert datetime objects to strings for JSON serialization
-        for event in events:
-            if event['start_datetime']:
-                event['start_datetime'] = event['start_datetime'].isoformat()
-            if event['end_datetime']:
-                event['end_datetime'] = event['end_datetime'].isoformat()
-            if event['reviewed_at']:
-                event['reviewed_at'] = event['reviewed_at'].isoformat()
+        return jsonify({"items": events, "next_cursor": next_cursor}), 200
         
-        return jsonify(events), 200
-        
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         return jsonify({"error": f"Database error: {err}"}), 500
     
     finally:
@@ -927,6 +1569,8 @@ def get_faculty_events():
 
 @app.route('/api/faculty/proposals', methods=['GET'])
 @login_required(['faculty'])
+@read_replica
+@conditional_get('events', 'users')
 def get_pending_proposals():
     """Get student event proposals pending faculty approval"""
     conn = get_db_connection()
@@ -952,18 +1596,9 @@ def get_pending_proposals():
         
         proposals = cursor.fetchall()
         
-        # Convert datetime objects to strings
-        for proposal in proposals:
-            if proposal['start_datetime']:
-                proposal['start_datetime'] = proposal['start_datetime'].isoformat()
-            if proposal['end_datetime']:
-                proposal['end_datetime'] = proposal['end_datetime'].isoformat()
-            if proposal['created_at']:
-                proposal['created_at'] = proposal['created_at'].isoformat()
-        
         return jsonify(proposals), 200
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         return jsonify({"error": f"Database error: {err}"}), 500
     
     finally:
@@ -974,11 +1609,6 @@ def get_pending_proposals():
 @login_required(['faculty'])
 def handle_proposal_action(proposal_id):
     """Approve, deny, or request changes for a student proposal"""
-    conn = get_db_connection()
-    if not conn:
-        return jsonify({"error": "Database connection failed"}), 500
-
-    cursor = conn.cursor(dictionary=True)
     data = request.get_json()
     
     if not data or 'action' not in data:
@@ -988,6 +1618,12 @@ def handle_proposal_action(proposal_id):
     notes = data.get('notes', '')
     meeting_location = data.get('meeting_location', '')
     
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    cursor = conn.cursor(dictionary=True)
+    
     try:
         # Verify the proposal exists and is pending
         cursor.execute("SELECT * FROM events WHERE id = %s AND status = 'pending_approval'", (proposal_id,))
@@ -1004,6 +1640,7 @@ def handle_proposal_action(proposal_id):
                 WHERE id = %s
             """, (session['user_id'], notes, proposal_id))
             
+            status = 'approved'
             message = "Proposal approved successfully"
             
         elif action == 'deny':
@@ -1013,6 +1650,7 @@ def handle_proposal_action(proposal_id):
                 WHERE id = %s
             """, (session['user_id'], notes, proposal_id))
             
+            status = 'denied'
             message = "Proposal denied"
             
         elif action == 'changes':
@@ -1022,15 +1660,27 @@ def handle_proposal_action(proposal_id):
                 WHERE id = %s
             """, (session['user_id'], notes + (f" Meeting location: {meeting_location}" if meeting_location else ""), proposal_id))
             
+            status = 'revision_requested'
             message = "Changes requested - student has been notified"
         
         else:
             return jsonify({"error": "Invalid action"}), 400
         
+        bump_table_version(cursor, 'events')
         conn.commit()
+        
+        # The organizer sees the outcome; other faculty drop it from their pending list
+        stream_hub.publish('proposal_status', {
+            "id": proposal_id,
+            "title": proposal['title'],
+            "status": status,
+            "notes": notes,
+            "reviewed_by": session.get('full_name')
+        }, roles=('faculty',), user_ids=(proposal['organizer_id'],))
+        
         return jsonify({"message": message}), 200
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         conn.rollback()
         return jsonify({"error": f"Database error: {err}"}), 500
     
@@ -1042,16 +1692,17 @@ def handle_proposal_action(proposal_id):
 @login_required(['faculty'])
 def create_faculty_event():
     """Create a new official faculty event"""
+    data = request.get_json()
+    
+    required_fields = ['title', 'description', 'start_datetime', 'category']
+    if not data or not all(field in data for field in required_fields):
+        return jsonify({"error": "Missing required fields"}), 400
+    
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
 
     cursor = conn.cursor()
-    data = request.get_json()
-    
-    required_fields = ['title', 'description', 'start_datetime', 'category']
-    if not all(field in data for field in required_fields):
-        return jsonify({"error": "Missing required fields"}), 400
     
     try:
         # Parse datetime
@@ -1082,10 +1733,11 @@ def create_faculty_event():
             session['user_id']  # Faculty member reviews their own event
         ))
         
+        bump_table_version(cursor, 'events')
         conn.commit()
         return jsonify({"message": "Event created successfully!"}), 201
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         conn.rollback()
         return jsonify({"error": f"Database error: {err}"}), 500
     
@@ -1095,6 +1747,7 @@ def create_faculty_event():
 
 @app.route('/api/faculty/mentorship', methods=['GET'])
 @login_required(['faculty'])
+@read_replica
 def get_mentorship_info():
     """Get faculty mentorship information and active mentees"""
     conn = get_db_connection()
@@ -1133,31 +1786,14 @@ def get_mentorship_info():
         
         collaboration_feed = cursor.fetchall()
         
-        # Convert datetime objects
-        for mentee in active_mentees:
-            if mentee['created_at']:
-                mentee['created_at'] = mentee['created_at'].isoformat()
-            if mentee['updated_at']:
-                mentee['updated_at'] = mentee['updated_at'].isoformat()
-        
-        for post in collaboration_feed:
-            if post['created_at']:
-                post['created_at'] = post['created_at'].isoformat()
-            if post['updated_at']:
-                post['updated_at'] = post['updated_at'].isoformat()
-            # Parse skills JSON
-            if post.get('skills_required'):
-                try:
-                    post['skills_required'] = json.loads(post['skills_required'])
-                except:
-                    post['skills_required'] = []
+        decode_json_columns(collaboration_feed, 'skills_required')
         
         return jsonify({
             "active_mentees": active_mentees,
             "collaboration_feed": collaboration_feed
         }), 200
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         return jsonify({"error": f"Database error: {err}"}), 500
     
     finally:
@@ -1170,6 +1806,7 @@ def get_mentorship_info():
 
 @app.route('/api/admin/analytics', methods=['GET'])
 @login_required(['admin'])
+@read_replica
 def get_admin_analytics():
     """Get comprehensive analytics for admin dashboard"""
     conn = get_db_connection()
@@ -1181,47 +1818,105 @@ def get_admin_analytics():
     try:
         analytics = {}
         
-        # Get user statistics
-        cursor.execute("SELECT role, status, COUNT(*) as count FROM users GROUP BY role, status")
-        user_stats = cursor.fetchall()
-        analytics['user_stats'] = user_stats
+        # All figures come from rollup tables kept current by analytics_refresher
+        cursor.execute("SELECT role, status, count FROM analytics_user_stats")
+        analytics['user_stats'] = cursor.fetchall()
         
-        # Get event statistics
-        cursor.execute("SELECT category, status, COUNT(*) as count FROM events GROUP BY category, status")
-        event_stats = cursor.fetchall()
-        analytics['event_stats'] = event_stats
+        cursor.execute("SELECT category, status, count FROM analytics_event_stats")
+        analytics['event_stats'] = cursor.fetchall()
         
-        # Get monthly participation data
+        # Monthly participation for the last 12 months
         cursor.execute("""
-            SELECT DATE_FORMAT(er.registered_at, '%Y-%m') as month,
-                   COUNT(*) as registrations
-            FROM event_registrations er
-            WHERE er.registered_at >= DATE_SUB(NOW(), INTERVAL 12 MONTH)
-            GROUP BY month
+            SELECT month, registrations
+            FROM analytics_monthly_registrations
+            WHERE month >= DATE_FORMAT(DATE_SUB(NOW(), INTERVAL 12 MONTH), '%Y-%m')
             ORDER BY month
         """)
-        monthly_participation = cursor.fetchall()
-        analytics['monthly_participation'] = monthly_participation
+        analytics['monthly_participation'] = cursor.fetchall()
         
-        # Get department-wise engagement
+        # Department-wise engagement
         cursor.execute("""
             SELECT d.name as department,
-                   COUNT(DISTINCT u.id) as total_users,
-                   COUNT(DISTINCT e.id) as events_organized,
-                   COUNT(DISTINCT er.id) as total_registrations
-            FROM departments d
-            LEFT JOIN users u ON d.id = u.department_id
-            LEFT JOIN events e ON u.id = e.organizer_id
-            LEFT JOIN event_registrations er ON u.id = er.user_id
-            GROUP BY d.id, d.name
-            ORDER BY total_registrations DESC
+                   ds.total_users,
+                   ds.events_organized,
+                   ds.total_registrations
+            FROM analytics_department_stats ds
+            JOIN departments d ON ds.department_id = d.id
+            ORDER BY ds.total_registrations DESC
         """)
-        department_stats = cursor.fetchall()
-        analytics['department_stats'] = department_stats
+        analytics['department_stats'] = cursor.fetchall()
+        
+        # Freshness of the rollups
+        cursor.execute("SELECT refreshed_at FROM analytics_rollup_meta WHERE name = 'rollups'")
+        meta = cursor.fetchone()
+        analytics['refreshed_at'] = meta['refreshed_at'] if meta else None
         
         return jsonify(analytics), 200
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
+        return jsonify({"error": f"Database error: {err}"}), 500
+    
+    finally:
+        cursor.close()
+        conn.close()
+
+@app.route('/api/admin/analytics/registrations', methods=['GET'])
+@login_required(['admin'])
+@read_replica
+def get_registration_trends():
+    """
+    Registration counts over a date range, bucketed and optionally split by a dimension
+    Query params: start, end (YYYY-MM-DD), bucket (hour/day/week/month),
+                  dimension (department/category/role, optional)
+    """
+    bucket = request.args.get('bucket', 'day')
+    dimension = request.args.get('dimension') or None
+    
+    if bucket not in BUCKET_SIZES:
+        return jsonify({"error": f"bucket must be one of {', '.join(BUCKET_SIZES)}"}), 400
+    if dimension and dimension not in DIMENSIONS:
+        return jsonify({"error": f"dimension must be one of {', '.join(DIMENSIONS)}"}), 400
+    
+    try:
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if request.args.get('end') \
+            else datetime.now().date()
+        start = datetime.strptime(request.args['start'], '%Y-%m-%d').date() if request.args.get('start') \
+            else end - timedelta(days=29)
+    except ValueError:
+        return jsonify({"error": "Invalid date format, expected YYYY-MM-DD"}), 400
+    
+    if start > end:
+        return jsonify({"error": "start must not be after end"}), 400
+    if bucket == 'hour' and (end - start).days >= HOURLY_RETENTION_DAYS:
+        return jsonify({"error": f"Hourly buckets are limited to {HOURLY_RETENTION_DAYS} days"}), 400
+    if (end - start).days > 366 * 5:
+        return jsonify({"error": "Date range is limited to 5 years"}), 400
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+    
+    cursor = conn.cursor()
+    
+    try:
+        # Read pre-aggregated buckets and roll them up in memory
+        rows = query_registration_buckets(cursor, start, end, bucket, dimension)
+        series = rollup_series(rows, start, end, bucket)
+        
+        cursor.execute("SELECT refreshed_at FROM analytics_rollup_meta WHERE name = 'rollups'")
+        meta = cursor.fetchone()
+        
+        return jsonify({
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "bucket": bucket,
+            "dimension": dimension,
+            "total": sum(s['total'] for s in series),
+            "series": series,
+            "refreshed_at": meta[0] if meta else None
+        }), 200
+        
+    except DB_ERRORS as err:
         return jsonify({"error": f"Database error: {err}"}), 500
     
     finally:
@@ -1230,8 +1925,14 @@ def get_admin_analytics():
 
 @app.route('/api/admin/users', methods=['GET'])
 @login_required(['admin'])
+@read_replica
 def get_all_users():
-    """Get all users with filtering options"""
+    """Get users with filtering options (paginated, newest first)"""
+    try:
+        limit, page_cursor = get_page_params()
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -1260,60 +1961,117 @@ def get_all_users():
             query += " AND u.status = %s"
             params.append(status_filter)
         
-        query += " ORDER BY u.created_at DESC"
+        keyset_sql, keyset_params = keyset_condition('u.created_at', 'u.id', page_cursor)
+        query += keyset_sql
+        params.extend(keyset_params)
+        
+        query += " ORDER BY u.created_at DESC, u.id DESC LIMIT %s"
+        params.append(limit + 1)
         
         cursor.execute(query, params)
-        users = cursor.fetchall()
+        users, next_cursor = build_page(cursor.fetchall(), limit, 'created_at')
         
         # Remove sensitive data
         for user in users:
             user.pop('password_hash', None)
-            if user['created_at']:
-                user['created_at'] = user['created_at'].isoformat()
-            if user['updated_at']:
-                user['updated_at'] = user['updated_at'].isoformat()
         
-        return jsonify(users), 200
+        return jsonify({"items": users, "next_cursor": next_cursor}), 200
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         return jsonify({"error": f"Database error: {err}"}), 500
     
     finally:
         cursor.close()
         conn.close()
 
+def release_user_counters(conn, cursor, user_ids):
+    """
+    Take the users' event registrations and collaboration interests off
+    events.participant_count and collaboration_posts.interest_count,
+    and every registration the deletion removes off the analytics
+    rollups. Call in the same transaction, before deleting the users
+    (the cascade removes those rows without touching either).
+    """
+    release_user_registrations(conn, user_ids)
+    placeholders = ', '.join(['%s'] * len(user_ids))
+    if conn.dialect == 'sqlite':
+        # No multi-table UPDATE ... JOIN
+        cursor.execute(f"""
+            UPDATE events
+            SET participant_count = MAX(participant_count - (
+                SELECT COUNT(*) FROM event_registrations r
+                WHERE r.event_id = events.id AND r.user_id IN ({placeholders})), 0)
+            WHERE id IN (SELECT event_id FROM event_registrations WHERE user_id IN ({placeholders}))
+        """, list(user_ids) * 2)
+        cursor.execute(f"""
+            UPDATE collaboration_posts
+            SET interest_count = MAX(interest_count - (
+                SELECT COUNT(*) FROM collaboration_interests i
+                WHERE i.post_id = collaboration_posts.id AND i.user_id IN ({placeholders})), 0)
+            WHERE id IN (SELECT post_id FROM collaboration_interests WHERE user_id IN ({placeholders}))
+        """, list(user_ids) * 2)
+        return
+
+    cursor.execute(f"""
+        UPDATE events e
+        JOIN (
+            SELECT event_id, COUNT(*) as n
+            FROM event_registrations
+            WHERE user_id IN ({placeholders})
+            GROUP BY event_id
+        ) r ON r.event_id = e.id
+        SET e.participant_count = GREATEST(CAST(e.participant_count AS SIGNED) - r.n, 0)
+    """, list(user_ids))
+    cursor.execute(f"""
+        UPDATE collaboration_posts cp
+        JOIN (
+            SELECT post_id, COUNT(*) as n
+            FROM collaboration_interests
+            WHERE user_id IN ({placeholders})
+            GROUP BY post_id
+        ) i ON i.post_id = cp.id
+        SET cp.interest_count = GREATEST(CAST(cp.interest_count AS SIGNED) - i.n, 0)
+    """, list(user_ids))
+
 @app.route('/api/admin/users/<int:user_id>/action', methods=['POST'])
 @login_required(['admin'])
 def handle_user_action(user_id):
-    """Approve, deny, or remove users"""
-    conn = get_db_connection()
-    if not conn:
-        return jsonify({"error": "Database connection failed"}), 500
-
-    cursor = conn.cursor(dictionary=True)
+    """Approve, suspend, deny, or remove users"""
     data = request.get_json()
     
     if not data or 'action' not in data:
         return jsonify({"error": "Action is required"}), 400
 
-    action = data['action']  # 'approve', 'deny', 'remove'
+    action = data['action']  # 'approve', 'suspend', 'deny', 'remove'
+    
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    cursor = conn.cursor(dictionary=True)
     
     try:
         if action == 'approve':
             cursor.execute("UPDATE users SET status = 'active' WHERE id = %s", (user_id,))
             message = "User approved successfully"
             
+        elif action == 'suspend':
+            cursor.execute("UPDATE users SET status = 'suspended' WHERE id = %s", (user_id,))
+            message = "User suspended"
+            
         elif action == 'deny' or action == 'remove':
+            release_user_counters(conn, cursor, [user_id])
             cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
             message = "User removed from system"
             
         else:
             return jsonify({"error": "Invalid action"}), 400
         
+        bump_table_version(cursor, 'users', 'events', 'collaboration_posts', 'announcements')
         conn.commit()
         return jsonify({"message": message}), 200
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         conn.rollback()
         return jsonify({"error": f"Database error: {err}"}), 500
     
@@ -1321,10 +2079,280 @@ def handle_user_action(user_id):
         cursor.close()
         conn.close()
 
+BATCH_ACTION_MAX_IDS = 5000
+
+@app.route('/api/admin/users/batch-action', methods=['POST'])
+@login_required(['admin'])
+def handle_batch_user_action():
+    """
+    Apply one action to many users in a single transaction
+    Expected JSON: {user_ids: [...], action: 'approve' | 'suspend' | 'deny' | 'remove'}
+    Returns a per-ID outcome
+    """
+    data = request.get_json()
+    if not data or 'action' not in data or not isinstance(data.get('user_ids'), list):
+        return jsonify({"error": "action and user_ids are required"}), 400
+
+    action = data['action']
+    if action not in ('approve', 'suspend', 'deny', 'remove'):
+        return jsonify({"error": "Invalid action"}), 400
+
+    try:
+        # Keep request order, drop duplicates
+        user_ids = list(dict.fromkeys(int(uid) for uid in data['user_ids']))
+    except (TypeError, ValueError):
+        return jsonify({"error": "user_ids must be integers"}), 400
+    if not user_ids:
+        return jsonify({"error": "user_ids must not be empty"}), 400
+    if len(user_ids) > BATCH_ACTION_MAX_IDS:
+        return jsonify({"error": f"At most {BATCH_ACTION_MAX_IDS} users per batch"}), 400
+
+    outcomes = {}
+    # Admins can't suspend or remove their own account in bulk
+    if action != 'approve' and session['user_id'] in user_ids:
+        outcomes[session['user_id']] = "skipped: own account"
+    target_ids = [uid for uid in user_ids if uid not in outcomes]
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    cursor = conn.cursor()
+
+    try:
+        found = set()
+        if target_ids:
+            placeholders = ', '.join(['%s'] * len(target_ids))
+            cursor.execute(f"SELECT id FROM users WHERE id IN ({placeholders}) FOR UPDATE", target_ids)
+            found = {row[0] for row in cursor.fetchall()}
+
+        if found:
+            placeholders = ', '.join(['%s'] * len(found))
+            ids = list(found)
+            if action == 'approve':
+                cursor.execute(f"UPDATE users SET status = 'active' WHERE id IN ({placeholders})", ids)
+            elif action == 'suspend':
+                cursor.execute(f"UPDATE users SET status = 'suspended' WHERE id IN ({placeholders})", ids)
+            else:
+                release_user_counters(conn, cursor, ids)
+                cursor.execute(f"DELETE FROM users WHERE id IN ({placeholders})", ids)
+
+            bump_table_version(cursor, 'users', 'events', 'collaboration_posts', 'announcements')
+        conn.commit()
+
+        for uid in target_ids:
+            outcomes[uid] = "ok" if uid in found else "not_found"
+
+        return jsonify({
+            "action": action,
+            "applied": len(found),
+            "results": [{"user_id": uid, "outcome": outcomes[uid]} for uid in user_ids]
+        }), 200
+
+    except DB_ERRORS as err:
+        conn.rollback()
+        return jsonify({"error": f"Database error: {err}"}), 500
+
+    finally:
+        cursor.close()
+        conn.close()
+
+IMPORT_MAX_ROWS = 10000
+IMPORT_CHUNK_SIZE = 500
+
+def _read_import_rows():
+    """
+    Read user rows from an uploaded CSV/JSON file or a JSON request body
+    Returns a list of dicts or raises ValueError
+    """
+    upload = request.files.get('file')
+    if upload:
+        text = upload.read().decode('utf-8-sig')
+        if upload.filename.lower().endswith('.json'):
+            rows = json.loads(text)
+        else:
+            rows = list(csv.DictReader(io.StringIO(text)))
+    else:
+        rows = request.get_json(silent=True)
+
+    if isinstance(rows, dict):
+        rows = rows.get('users')
+    if not isinstance(rows, list):
+        raise ValueError("Expected a CSV/JSON file upload or a JSON list of users")
+    if len(rows) > IMPORT_MAX_ROWS:
+        raise ValueError(f"At most {IMPORT_MAX_ROWS} users can be imported at once")
+    return rows
+
+@app.route('/api/admin/users/import', methods=['POST'])
+@login_required(['admin'])
+def import_users():
+    """
+    Bulk-create users from a CSV/JSON upload
+    Columns: fullName (or full_name), email, password, role
+    Returns a per-row report
+    Hashing dominates: expect about rows / BCRYPT_WORKERS x 0.25-0.4 s
+    at the default 12 rounds, while logins keep being served
+    """
+    try:
+        rows = _read_import_rows()
+    except (ValueError, UnicodeDecodeError) as err:
+        return jsonify({"error": str(err)}), 400
+
+    allowed_roles = ['student', 'faculty', 'admin']
+    results = [None] * len(rows)
+    candidates = []  # (row index, full_name, email, password, role)
+    seen_emails = set()
+
+    # Validate rows with the same rules as /api/register
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            results[i] = {"row": i + 1, "status": "error", "error": "Invalid row"}
+            continue
+        full_name = str(row.get('fullName') or row.get('full_name') or '').strip()
+        email = str(row.get('email') or '').strip().lower()
+        password = str(row.get('password') or '')
+        role = str(row.get('role') or '').strip().lower()
+
+        error = None
+        if not full_name or not email or not password or not role:
+            error = "Missing required fields"
+        elif role not in allowed_roles:
+            error = "Invalid role. Must be student, faculty, or admin"
+        elif '@' not in email or '.' not in email:
+            error = "Invalid email format"
+        elif email in seen_emails:
+            error = "Duplicate email in upload"
+
+        if error:
+            results[i] = {"row": i + 1, "email": email or None, "status": "error", "error": error}
+        else:
+            seen_emails.add(email)
+            candidates.append((i, full_name, email, password, role))
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    cursor = conn.cursor()
+
+    try:
+        # One set-based lookup per chunk instead of a SELECT per user
+        existing = set()
+        emails = [c[2] for c in candidates]
+        for start in range(0, len(emails), IMPORT_CHUNK_SIZE):
+            chunk = emails[start:start + IMPORT_CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f"SELECT email FROM users WHERE email IN ({placeholders})", chunk)
+            existing.update(row[0] for row in cursor.fetchall())
+        conn.commit()
+
+        pending = []
+        for candidate in candidates:
+            if candidate[2] in existing:
+                results[candidate[0]] = {"row": candidate[0] + 1, "email": candidate[2],
+                                         "status": "error", "error": "Email already registered"}
+            else:
+                pending.append(candidate)
+
+        # Hash every password in parallel across the hashing workers
+        try:
+            hashes = hasher.hash_passwords(c[3] for c in pending)
+        except HashQueueFullError:
+            return jsonify({"error": "Server busy, please try again"}), 503
+
+        # Insert in chunked transactions so one bad chunk doesn't sink the import
+        for start in range(0, len(pending), IMPORT_CHUNK_SIZE):
+            chunk = pending[start:start + IMPORT_CHUNK_SIZE]
+            chunk_hashes = hashes[start:start + IMPORT_CHUNK_SIZE]
+            try:
+                cursor.executemany("""
+                    INSERT INTO users (full_name, email, password_hash, role, status) 
+                    VALUES (%s, %s, %s, %s, 'active')
+                """, [(c[1], c[2], h, c[4]) for c, h in zip(chunk, chunk_hashes)])
+
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f"SELECT id, email FROM users WHERE email IN ({placeholders})",
+                               [c[2] for c in chunk])
+                ids = {email: user_id for user_id, email in cursor.fetchall()}
+
+                faculty_ids = [(ids[c[2]],) for c in chunk if c[4] == 'faculty']
+                if faculty_ids:
+                    cursor.executemany("""
+                        INSERT INTO faculty_profiles (user_id, mentorship_capacity, is_accepting_requests) 
+                        VALUES (%s, 5, 1)
+                    """, faculty_ids)
+
+                bump_table_version(cursor, 'users')
+                conn.commit()
+
+                for c in chunk:
+                    results[c[0]] = {"row": c[0] + 1, "email": c[2], "status": "created",
+                                     "user_id": ids.get(c[2]), "role": c[4]}
+            except DB_ERRORS as err:
+                conn.rollback()
+                for c in chunk:
+                    results[c[0]] = {"row": c[0] + 1, "email": c[2], "status": "error",
+                                     "error": f"Database error: {err}"}
+
+        created = sum(1 for r in results if r and r['status'] == 'created')
+        return jsonify({
+            "total": len(rows),
+            "created": created,
+            "failed": len(rows) - created,
+            "results": results
+        }), 200
+
+    except DB_ERRORS as err:
+        conn.rollback()
+        return jsonify({"error": f"Import failed: {err}"}), 500
+
+    finally:
+        cursor.close()
+        conn.close()
+
+@app.route('/api/admin/mentorship/assign', methods=['POST'])
+@login_required(['admin'])
+def assign_mentors_batch():
+    """
+    Pair unmentored students with accepting faculty in one batch
+    Expected JSON: {dry_run: bool (default true), department_id?: int, max_candidates?: int}
+    A dry run returns the planned pairings without writing anything
+    """
+    data = request.get_json(silent=True) or {}
+    dry_run = data.get('dry_run', True) is not False  # anything but an explicit false previews
+    try:
+        department_id = int(data['department_id']) if data.get('department_id') is not None else None
+        max_candidates = min(max(int(data.get('max_candidates', 10)), 1), 50)
+    except (TypeError, ValueError):
+        return jsonify({"error": "department_id and max_candidates must be integers"}), 400
+
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    try:
+        result = assign_mentors(conn, dry_run=dry_run, department_id=department_id,
+                                max_candidates=max_candidates)
+        if result is None:
+            return jsonify({"error": "Another mentor assignment is already running"}), 409
+        return jsonify(result), 200
+
+    except DB_ERRORS as err:
+        return jsonify({"error": f"Database error: {err}"}), 500
+
+    finally:
+        conn.close()
+
 @app.route('/api/admin/events', methods=['GET'])
 @login_required(['admin'])
+@read_replica
 def get_all_events():
-    """Get all events for admin management"""
+    """Get events for admin management (paginated, newest first)"""
+    try:
+        limit, page_cursor = get_page_params()
+    except ValueError as err:
+        return jsonify({"error": str(err)}), 400
+
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -1332,36 +2360,26 @@ def get_all_events():
     cursor = conn.cursor(dictionary=True)
     
     try:
-        cursor.execute("""
+        keyset_sql, keyset_params = keyset_condition('e.created_at', 'e.id', page_cursor)
+
+        cursor.execute(f"""
             SELECT e.*, 
                    u.full_name as organizer_name,
                    u.role as organizer_role,
-                   d.name as organizer_department,
-                   COUNT(DISTINCT er.user_id) as participant_count
+                   d.name as organizer_department
             FROM events e
             JOIN users u ON e.organizer_id = u.id
             LEFT JOIN departments d ON u.department_id = d.id
-            LEFT JOIN event_registrations er ON e.id = er.event_id
-            GROUP BY e.id
-            ORDER BY e.created_at DESC
-        """)
-        
-        events = cursor.fetchall()
+            WHERE 1=1{keyset_sql}
+            ORDER BY e.created_at DESC, e.id DESC
+            LIMIT %s
+        """, [*keyset_params, limit + 1])
         
-        # Convert datetime objects
-        for event in events:
-            if event['start_datetime']:
-                event['start_datetime'] = event['start_datetime'].isoformat()
-            if event['end_datetime']:
-                event['end_datetime'] = event['end_datetime'].isoformat()
-            if event['created_at']:
-                event['created_at'] = event['created_at'].isoformat()
-            if event['reviewed_at']:
-                event['reviewed_at'] = event['reviewed_at'].isoformat()
+        events, next_cursor = build_page(cursor.fetchall(), limit, 'created_at')
         
-        return jsonify(events), 200
+        return jsonify({"items": events, "next_cursor": next_cursor}), 200
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         return jsonify({"error": f"Database error: {err}"}), 500
     
     finally:
@@ -1372,26 +2390,28 @@ def get_all_events():
 @login_required(['admin'])
 def toggle_event_feature(event_id):
     """Toggle event featured status on homepage"""
-    conn = get_db_connection()
-    if not conn:
-        return jsonify({"error": "Database connection failed"}), 500
-
-    cursor = conn.cursor()
     data = request.get_json()
     
-    if 'featured' not in data:
+    if not data or 'featured' not in data:
         return jsonify({"error": "Featured status is required"}), 400
     
     featured = bool(data['featured'])
     
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    cursor = conn.cursor()
+    
     try:
         cursor.execute("UPDATE events SET is_featured = %s WHERE id = %s", (featured, event_id))
+        bump_table_version(cursor, 'events')
         conn.commit()
         
         action = "featured" if featured else "unfeatured"
         return jsonify({"message": f"Event {action} successfully"}), 200
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         conn.rollback()
         return jsonify({"error": f"Database error: {err}"}), 500
     
@@ -1401,8 +2421,16 @@ def toggle_event_feature(event_id):
 
 @app.route('/api/admin/announcements', methods=['GET', 'POST'])
 @login_required(['admin'])
+@read_replica
+@conditional_get('announcements', 'users')
 def handle_announcements():
-    """Get all announcements or create new one"""
+    """Get announcements (paginated, newest first) or create new one"""
+    if request.method == 'GET':
+        try:
+            limit, page_cursor = get_page_params()
+        except ValueError as err:
+            return jsonify({"error": str(err)}), 400
+
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -1411,22 +2439,20 @@ def handle_announcements():
     
     try:
         if request.method == 'GET':
-            cursor.execute("""
+            keyset_sql, keyset_params = keyset_condition('a.created_at', 'a.id', page_cursor)
+
+            cursor.execute(f"""
                 SELECT a.*, u.full_name as created_by_name
                 FROM announcements a
                 JOIN users u ON a.created_by = u.id
-                ORDER BY a.created_at DESC
-            """)
+                WHERE 1=1{keyset_sql}
+                ORDER BY a.created_at DESC, a.id DESC
+                LIMIT %s
+            """, [*keyset_params, limit + 1])
             
-            announcements = cursor.fetchall()
+            announcements, next_cursor = build_page(cursor.fetchall(), limit, 'created_at')
             
-            for announcement in announcements:
-                if announcement['created_at']:
-                    announcement['created_at'] = announcement['created_at'].isoformat()
-                if announcement['expires_at']:
-                    announcement['expires_at'] = announcement['expires_at'].isoformat()
-            
-            return jsonify(announcements), 200
+            return jsonify({"items": announcements, "next_cursor": next_cursor}), 200
             
         else:  # POST - Create announcement
             data = request.get_json()
@@ -1448,11 +2474,24 @@ def handle_announcements():
                 session['user_id'],
                 data.get('expires_at')
             ))
+            announcement_id = cursor.lastrowid
             
+            bump_table_version(cursor, 'announcements')
             conn.commit()
+            
+            stream_hub.publish('announcement', {
+                "id": announcement_id,
+                "title": data['title'],
+                "message": data['message'],
+                "target_audience": data['target_audience'],
+                "priority": data.get('priority', 'normal'),
+                "is_banner": bool(data.get('is_banner', False)),
+                "expires_at": data.get('expires_at')
+            }, roles=announcement_roles(data['target_audience']))
+            
             return jsonify({"message": "Announcement created successfully!"}), 201
         
-    except mysql.connector.Error as err:
+    except DB_ERRORS as err:
         if request.method == 'POST':
             conn.rollback()
         return jsonify({"error": f"Database error: {err}"}), 500
@@ -1465,6 +2504,14 @@ def handle_announcements():
 @login_required(['admin'])
 def handle_platform_settings():
     """Get or update platform settings"""
+    if request.method == 'GET':
+        # Served from the snapshot; a PUT in this process reloads it first
+        return jsonify(platform_settings.as_dict()), 200
+
+    data = request.get_json()
+    if not data:
+        return jsonify({"error": "No settings data provided"}), 400
+
     conn = get_db_connection()
     if not conn:
         return jsonify({"error": "Database connection failed"}), 500
@@ -1472,41 +2519,473 @@ def handle_platform_settings():
     cursor = conn.cursor(dictionary=True)
     
     try:
-        if request.method == 'GET':
-            cursor.execute("SELECT * FROM platform_settings")
-            settings = cursor.fetchall()
-            
-            # Convert to key-value dict
-            settings_dict = {setting['setting_key']: setting['setting_value'] for setting in settings}
-            return jsonify(settings_dict), 200
-            
-        else:  # PUT - Update settings
-            data = request.get_json()
-            if not data:
-                return jsonify({"error": "No settings data provided"}), 400
-            
-            for key, value in data.items():
-                cursor.execute("""
-                    INSERT INTO platform_settings (setting_key, setting_value, updated_by)
-                    VALUES (%s, %s, %s)
-                    ON DUPLICATE KEY UPDATE 
-                    setting_value = VALUES(setting_value), 
-                    updated_by = VALUES(updated_by),
-                    updated_at = NOW()
-                """, (key, str(value), session['user_id']))
-            
-            conn.commit()
-            return jsonify({"message": "Settings updated successfully!"}), 200
+        for key, value in data.items():
+            cursor.execute("""
+                INSERT INTO platform_settings (setting_key, setting_value, updated_by)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE 
+                setting_value = VALUES(setting_value), 
+                updated_by = VALUES(updated_by),
+                updated_at = NOW()
+            """, (key, str(value), session['user_id']))
         
-    except mysql.connector.Error as err:
-        if request.method == 'PUT':
-            conn.rollback()
+        conn.commit()
+        
+        # Other worker processes pick the change up on their next version check
+        platform_settings.invalidate()
+        return jsonify({"message": "Settings updated successfully!"}), 200
+    
+    except DB_ERRORS as err:
+        conn.rollback()
         return jsonify({"error": f"Database error: {err}"}), 500
     
     finally:
         cursor.close()
         conn.close()
 
+# ===================================================================
+# LIVE UPDATES (SERVER-SENT EVENTS)
+# ===================================================================
+# GET /api/stream keeps one response open per dashboard and pushes:
+#
+#   announcement        new announcement for the user's audience
+#   proposal_new        a student submitted a proposal (faculty)
+#   proposal_status     a proposal was reviewed (its organizer, faculty)
+#   registration_count  participant_count changes (everyone), batched per
+#                       SSE_COALESCE_SECONDS as {"items": [...]}
+#   resync              events were dropped; refetch the lists
+#
+# Handlers publish after commit. Idle streams send a keepalive comment
+# every SSE_HEARTBEAT_SECONDS, which is also how disconnected clients
+# are noticed and unsubscribed.
+#
+# Server workers share events through the stream_events table (see
+# stream_relay.py), so a stream gets updates published by any worker,
+# up to SSE_RELAY_INTERVAL seconds late. SSE_RELAY=false delivers in
+# process only, which is enough for a single-process server.
+
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))
+
+stream_hub = BroadcastHub(
+    max_queue=int(os.getenv("SSE_QUEUE_SIZE", "100")),
+    history=int(os.getenv("SSE_HISTORY", "256")),
+    max_subscribers=int(os.getenv("SSE_MAX_SUBSCRIBERS", "5000")),
+    coalesce_window=float(os.getenv("SSE_COALESCE_SECONDS", "1")),
+    encode=dumps_bytes
+)
+
+# Started by start_worker(); until then events are delivered in process
+stream_relay = StreamRelay(
+    get_db_connection,
+    stream_hub,
+    interval=float(os.getenv("SSE_RELAY_INTERVAL", "0.5")),
+    retention=int(os.getenv("SSE_RELAY_RETENTION", "3600"))
+) if os.getenv("SSE_RELAY", "true").lower() != "false" else None
+
+def announcement_roles(target_audience):
+    """Roles an announcement is shown to (None = everyone), matching /api/search"""
+    if target_audience == 'all':
+        return None
+    return {'admin'} | {role for role in ('student', 'faculty') if target_audience in (role, role + 's')}
+
+@app.route('/api/stream', methods=['GET'])
+@login_required()
+def event_stream():
+    """Server-Sent Events stream of live updates for the current user"""
+    last_event_id = parse_last_event_id(request.headers.get('Last-Event-ID') or request.args.get('lastEventId'))
+    subscription = stream_hub.subscribe(session['user_id'], session['role'], last_event_id)
+    if subscription is None:
+        response = jsonify({"error": "Too many open streams, try again later"})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+
+    def generate():
+        try:
+            yield b"retry: %d\n\n" % SSE_RETRY_MS
+            while True:
+                frames = subscription.get(SSE_HEARTBEAT_SECONDS)
+                if frames is None:
+                    break
+                yield b''.join(frames) if frames else b": keepalive\n\n"
+        finally:
+            stream_hub.unsubscribe(subscription)
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+    return response
+
+if request_metrics is not None:
+    request_metrics.registry.gauge_callback(
+        'campussphere_stream_subscribers', 'Open /api/stream connections by role',
+        lambda: {(role,): n for role, n in stream_hub.stats()['by_role'].items()}, ('role',))
+    request_metrics.registry.counter_callback(
+        'campussphere_stream_events_total', 'Live update events published',
+        lambda: stream_hub.stats()['published'])
+
+# ===================================================================
+# ADMIN DATA EXPORTS
+# ===================================================================
+# Exports stream rows from an unbuffered server-side cursor through a
+# generator response, so memory stays flat however many rows there are.
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+EXPORT_BATCH_SIZE = 500
+
+def _csv_value(value):
+    """Render a DB value for CSV output"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def stream_export(query, params, fmt, filename):
+    """
+    Run `query` on a dedicated connection and stream the rows as NDJSON or CSV
+    The connection is held until the client has received the last row
+    """
+    conn = get_db_connection()
+    if not conn:
+        return jsonify({"error": "Database connection failed"}), 500
+
+    # Unbuffered cursor: rows are pulled from the server batch by batch
+    cursor = conn.cursor(dictionary=(fmt == 'ndjson'), buffered=False)
+    try:
+        cursor.execute(query, params)
+    except DB_ERRORS as err:
+        cursor.close()
+        conn.close()
+        return jsonify({"error": f"Database error: {err}"}), 500
+
+    state = {"finished": False, "released": False}
+
+    def release():
+        # From the generator's finally, or from the response closing if
+        # the client went away before the generator ever started
+        if state["released"]:
+            return
+        state["released"] = True
+        if state["finished"]:
+            cursor.close()
+            conn.close()
+        else:
+            # Client disconnected (or a fetch failed) with rows still unread:
+            # drop the connection rather than let the pool drain the result
+            conn.discard()
+
+    def generate():
+        try:
+            if fmt == 'csv':
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(cursor.column_names)
+            while True:
+                rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                if not rows:
+                    break
+                if fmt == 'csv':
+                    writer.writerows([_csv_value(v) for v in row] for row in rows)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate(0)
+                else:
+                    yield b''.join(dumps_bytes(row) + b'\n' for row in rows)
+            state["finished"] = True
+        finally:
+            release()
+
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    response.call_on_close(release)
+    return response
+
+def get_export_format():
+    fmt = request.args.get('format', 'ndjson').lower()
+    return fmt if fmt in EXPORT_FORMATS else None
+
+@app.route('/api/admin/export/users', methods=['GET'])
+@login_required(['admin'])
+@read_replica
+def export_users():
+    """Stream all users as NDJSON or CSV (same role/status filters as /api/admin/users)"""
+    fmt = get_export_format()
+    if not fmt:
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+
+    query = """
+        SELECT u.id, u.full_name, u.email, u.role, u.status, d.name as department_name,
+               u.branch, u.semester, u.class, u.enrollment_no, u.created_at, u.updated_at
+        FROM users u
+        LEFT JOIN departments d ON u.department_id = d.id
+        WHERE 1=1
+    """
+    params = []
+    if request.args.get('role'):
+        query += " AND u.role = %s"
+        params.append(request.args['role'])
+    if request.args.get('status'):
+        query += " AND u.status = %s"
+        params.append(request.args['status'])
+    query += " ORDER BY u.id"
+
+    return stream_export(query, params, fmt, 'users')
+
+@app.route('/api/admin/export/events', methods=['GET'])
+@login_required(['admin'])
+@read_replica
+def export_events():
+    """Stream all events as NDJSON or CSV, optionally filtered by status/category"""
+    fmt = get_export_format()
+    if not fmt:
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+
+    query = """
+        SELECT e.*, u.full_name as organizer_name, u.role as organizer_role
+        FROM events e
+        JOIN users u ON e.organizer_id = u.id
+        WHERE 1=1
+    """
+    params = []
+    if request.args.get('status'):
+        query += " AND e.status = %s"
+        params.append(request.args['status'])
+    if request.args.get('category'):
+        query += " AND e.category = %s"
+        params.append(request.args['category'])
+    query += " ORDER BY e.id"
+
+    return stream_export(query, params, fmt, 'events')
+
+@app.route('/api/admin/export/registrations', methods=['GET'])
+@login_required(['admin'])
+@read_replica
+def export_registrations():
+    """Stream event registrations as NDJSON or CSV, optionally for one event or status"""
+    fmt = get_export_format()
+    if not fmt:
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+
+    query = """
+        SELECT er.id, er.event_id, e.title as event_title, er.user_id,
+               u.full_name, u.email, u.role, er.status, er.registered_at
+        FROM event_registrations er
+        JOIN events e ON er.event_id = e.id
+        JOIN users u ON er.user_id = u.id
+        WHERE 1=1
+    """
+    params = []
+    if request.args.get('event_id'):
+        try:
+            params.append(int(request.args['event_id']))
+        except ValueError:
+            return jsonify({"error": "event_id must be an integer"}), 400
+        query += " AND er.event_id = %s"
+    if request.args.get('status'):
+        query += " AND er.status = %s"
+        params.append(request.args['status'])
+    query += " ORDER BY er.id"
+
+    return stream_export(query, params, fmt, 'registrations')
+
+# ===================================================================
+# MAINTENANCE COMMANDS
+# ===================================================================
+
+def reconcile_counters(conn):
+    """
+    Recompute events.participant_count and collaboration_posts.interest_count
+    from the source tables and repair any rows that drifted
+    Returns the number of repaired rows per table
+    """
+    cursor = conn.cursor()
+    try:
+        if conn.dialect == 'sqlite':
+            return _reconcile_counters_sqlite(conn, cursor)
+
+        cursor.execute("""
+            UPDATE events e
+            LEFT JOIN (
+                SELECT event_id, COUNT(DISTINCT user_id) as n
+                FROM event_registrations
+                GROUP BY event_id
+            ) r ON r.event_id = e.id
+            SET e.participant_count = COALESCE(r.n, 0)
+            WHERE e.participant_count <> COALESCE(r.n, 0)
+        """)
+        events_fixed = cursor.rowcount
+
+        cursor.execute("""
+            UPDATE collaboration_posts cp
+            LEFT JOIN (
+                SELECT post_id, COUNT(DISTINCT user_id) as n
+                FROM collaboration_interests
+                GROUP BY post_id
+            ) i ON i.post_id = cp.id
+            SET cp.interest_count = COALESCE(i.n, 0)
+            WHERE cp.interest_count <> COALESCE(i.n, 0)
+        """)
+        posts_fixed = cursor.rowcount
+
+        bump_table_version(cursor, 'events', 'collaboration_posts')
+        conn.commit()
+        return {"events": events_fixed, "collaboration_posts": posts_fixed}
+    except DB_ERRORS:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def _reconcile_counters_sqlite(conn, cursor):
+    """reconcile_counters() for SQLite, which has no multi-table UPDATE ... JOIN"""
+    cursor.execute("""
+        UPDATE events
+        SET participant_count = (SELECT COUNT(DISTINCT user_id) FROM event_registrations r
+                                 WHERE r.event_id = events.id)
+        WHERE participant_count <> (SELECT COUNT(DISTINCT user_id) FROM event_registrations r
+                                    WHERE r.event_id = events.id)
+    """)
+    events_fixed = cursor.rowcount
+
+    cursor.execute("""
+        UPDATE collaboration_posts
+        SET interest_count = (SELECT COUNT(DISTINCT user_id) FROM collaboration_interests i
+                              WHERE i.post_id = collaboration_posts.id)
+        WHERE interest_count <> (SELECT COUNT(DISTINCT user_id) FROM collaboration_interests i
+                                 WHERE i.post_id = collaboration_posts.id)
+    """)
+    posts_fixed = cursor.rowcount
+
+    bump_table_version(cursor, 'events', 'collaboration_posts')
+    conn.commit()
+    return {"events": events_fixed, "collaboration_posts": posts_fixed}
+
+@app.cli.command('reconcile-counters')
+def reconcile_counters_command():
+    """Repair drift in the denormalized participant/interest counters"""
+    conn = get_db_connection()
+    if not conn:
+        raise SystemExit("Database connection failed")
+    try:
+        fixed = reconcile_counters(conn)
+        print(f"Repaired {fixed['events']} event(s) and "
+              f"{fixed['collaboration_posts']} collaboration post(s)")
+    finally:
+        conn.close()
+
+@app.cli.command('refresh-analytics')
+@click.option('--full', is_flag=True, help='Rebuild registration buckets from scratch')
+def refresh_analytics_command(full):
+    """Bring the analytics rollup tables up to date"""
+    conn = get_db_connection()
+    if not conn:
+        raise SystemExit("Database connection failed")
+    try:
+        if refresh_rollups(conn, full=full):
+            print("Analytics rollups refreshed")
+        else:
+            print("Another process is refreshing the rollups; try again shortly")
+    finally:
+        conn.close()
+
+@app.cli.command('assign-mentors')
+@click.option('--apply', 'apply_changes', is_flag=True,
+              help='Write the pairings (default: only show what would be paired)')
+@click.option('--department-id', type=int, default=None, help='Only match within one department')
+@click.option('--max-candidates', type=int, default=10, help='Direct mentor edges kept per student')
+def assign_mentors_command(apply_changes, department_id, max_candidates):
+    """Pair unmentored students with faculty who have spare capacity (dry run unless --apply)"""
+    dry_run = not apply_changes
+    conn = get_db_connection()
+    if not conn:
+        raise SystemExit("Database connection failed")
+    try:
+        result = assign_mentors(conn, dry_run=dry_run, department_id=department_id,
+                                max_candidates=max_candidates)
+        if result is None:
+            print("Another mentor assignment is running; try again shortly")
+            return
+        verb = "Would pair" if dry_run else "Paired"
+        print(f"{verb} {result['students_paired']} student(s) with "
+              f"{result['mentors_available']} mentor(s) in {result['solve_ms']} ms; "
+              f"{result['students_unpaired']} left unpaired, {result['skipped']} skipped, "
+              f"{result['same_department']} within department")
+        if dry_run:
+            print("Nothing written; re-run with --apply to save these pairings")
+    finally:
+        conn.close()
+
+@app.cli.command('migrate')
+@click.option('--dry-run', is_flag=True, help='List pending migrations without applying them')
+@click.option('--target', type=int, default=None, help='Stop after this migration version')
+@click.option('--status', 'show_status', is_flag=True, help='Show applied / pending migrations and exit')
+@click.option('--baseline', type=int, default=None,
+              help='Record migrations up to this version as applied without running them')
+def migrate_command(dry_run, target, show_status, baseline):
+    """Apply pending schema and index migrations from backend/migrations"""
+    if get_storage().dialect != 'mysql':
+        raise SystemExit("Migrations are MySQL-only; the SQLite backend applies sqlite_schema.sql on startup")
+    conn = get_db_connection()
+    if not conn:
+        raise SystemExit("Database connection failed")
+    try:
+        if show_status:
+            for migration, state in migration_status(conn):
+                print(f"{migration.version:03d}_{migration.name:40s} {state}")
+            return
+        if baseline is not None:
+            marked = baseline_migrations(conn, baseline)
+            print(f"Marked {len(marked)} migration(s) as applied")
+            return
+        applied = run_migrations(conn, target=target, dry_run=dry_run)
+        if not applied:
+            print("Schema is up to date")
+    except DB_ERRORS as err:
+        raise SystemExit(f"Migration failed: {err}")
+    finally:
+        conn.close()
+
+@app.cli.command('check-query-plans')
+@click.option('--min-rows', type=int, default=1000,
+              help='Tables with fewer rows are too small to judge and are skipped')
+@click.option('--query', 'prefixes', multiple=True, help='Only check queries whose name starts with this')
+@click.option('--verbose', is_flag=True, help='Print the EXPLAIN rows of every query')
+def check_query_plans_command(min_rows, prefixes, verbose):
+    """EXPLAIN the hot queries; exit non-zero on full table scans or filesorts"""
+    if get_storage().dialect != 'mysql':
+        raise SystemExit("check-query-plans reads MySQL EXPLAIN output; run it against the MySQL backend")
+    conn = get_db_connection()
+    if not conn:
+        raise SystemExit("Database connection failed")
+    try:
+        results = check_query_plans(conn, min_rows=min_rows, names=prefixes)
+    finally:
+        conn.close()
+
+    failed = 0
+    for result in results:
+        if not result['ok']:
+            failed += 1
+            state = "FAIL"
+        elif result['skipped']:
+            state = "skip"
+        else:
+            state = "ok"
+        detail = "; ".join(result['problems'])
+        if result['skipped']:
+            detail = (detail + "; " if detail else "") + f"too few rows in {', '.join(result['skipped'])}"
+        print(f"{state:4s}  {result['name']:45s} {detail}")
+        if verbose or not result['ok']:
+            for row in result['plan']:
+                print(f"        {row.get('table')!s:28s} type={row.get('type')!s:8s} "
+                      f"key={row.get('key')!s:40s} {row.get('Extra') or ''}")
+
+    print(f"{len(results) - failed}/{len(results)} query plans OK")
+    if failed:
+        raise SystemExit(1)
+
 # ===================================================================
 # ERROR HANDLERS & MAIN
 # ===================================================================
@@ -1519,6 +2998,50 @@ def not_found(error):
 def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
+# ===================================================================
+# APPLICATION FACTORY & PROCESS LIFECYCLE
+# ===================================================================
+# Production servers load the app with create_app() (gunicorn.conf.py
+# preloads it in the master and forks workers). Each serving process
+# then calls start_worker(), drain_worker() when it stops accepting
+# requests, and stop_worker() after its last one.
+
+def create_app():
+    """
+    Application factory for WSGI servers
+    Routes are registered when this module is imported; nothing here
+    opens a database connection or starts a thread, so the app can be
+    loaded once and shared by forked workers.
+    """
+    if not os.getenv("SECRET_KEY"):
+        print("Warning: SECRET_KEY is not set; sessions are signed with a random key "
+              "and are lost on restart")
+    return app
+
+def start_worker():
+    """Warm caches and start background jobs (threads don't survive fork, so run this after it)"""
+    get_storage().start_background()
+    platform_settings.refresh(force=True)
+    analytics_refresher.start()
+    if stream_relay is not None:
+        stream_relay.start()
+
+def drain_worker():
+    """End open /api/stream connections and stop background jobs"""
+    stream_hub.close()
+    analytics_refresher.stop()
+    if stream_relay is not None:
+        stream_relay.stop()
+
+def stop_worker():
+    """Close pooled database connections and the password hashing pool"""
+    if _storage is not None:
+        _storage.close_all()
+    hasher.shutdown()
+
 if __name__ == '__main__':
-    # Run in debug mode for development
+    # Warm caches and start background jobs before serving traffic
+    start_worker()
+    
+    # Development server (debug reloader, one process); see gunicorn.conf.py for production
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
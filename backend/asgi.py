@@ -0,0 +1,447 @@
+# ===================================================================
+# CAMPUSSPHERE - ASGI ENTRY POINT
+# ===================================================================
+# Serves the same application under an ASGI server, e.g.
+#
+#   uvicorn asgi:application --host 0.0.0.0 --port 5000 --timeout-graceful-shutdown 5
+#
+# (Open /api/stream connections never finish on their own; without a
+# graceful-shutdown timeout the server waits on them forever. Clients
+# reconnect with Last-Event-ID.)
+#
+# It can serve everything, or only /api/stream next to gunicorn with the
+# reverse proxy routing that path here (see gunicorn.conf.py).
+#
+# The read-heavy GET endpoints in ASYNC_VIEWS run as coroutines on
+# async_storage.py, so a request waiting on the database holds no
+# thread and one process keeps thousands of requests in flight.
+# /api/stream is served on the event loop too, so an open SSE stream
+# costs no thread either. Every other request runs the Flask app on a
+# bounded thread pool (ASGI_WSGI_THREADS), exactly as under a WSGI
+# server.
+#
+# Nothing is redefined here: URLs and methods are matched against
+# app.url_map, access rules come from each view's @login_required and
+# ETags from its @conditional_get, and the SQL and response shaping are
+# the helpers the sync handlers call. Sessions are Flask's signed cookie,
+# so a client can be served by either path.
+#
+# Not on the async path: Flask before/after_request hooks (the async
+# path records its own /metrics series, but QUERY_DIAGNOSTICS and
+# read-replica routing only see sync requests), and the session cookie
+# is read but not re-issued, so only sync requests extend its expiry.
+
+import asyncio
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+from itsdangerous import BadSignature
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import http_date, parse_cookie, parse_date, parse_etags, quote_etag
+
+from app import (app, get_storage, mysql_connect_args, request_metrics, start_worker, drain_worker,
+                 stop_worker, stream_hub, SSE_HEARTBEAT_SECONDS, SSE_RETRY_MS, session_denied,
+                 get_page_params, build_page, student_events_query, profile_query, public_profile,
+                 DEPARTMENTS_QUERY, build_search_query, search_page, table_versions_query,
+                 table_versions_from_rows, cache_validators)
+from async_storage import async_storage_from_env, ASYNC_DB_ERRORS
+from event_stream import parse_last_event_id
+from json_encoding import dumps_bytes
+from metrics import query_operation
+from storage import StorageUnavailableError
+
+# ===================================================================
+# ASYNC VIEWS
+# ===================================================================
+# Keyed by Flask endpoint name. Each takes (db, session, args, **view_args)
+# and returns (body, status) like the sync handler it stands in for.
+
+async def departments(db, user_session, args):
+    return await db.fetch_all(DEPARTMENTS_QUERY), 200
+
+async def current_user(db, user_session, args):
+    user = await db.fetch_one(*profile_query(user_session['user_id']))
+    if not user:
+        return {"error": "User not found"}, 404
+    return public_profile(user), 200
+
+async def student_events(db, user_session, args):
+    try:
+        limit, page_cursor = get_page_params(args)
+    except ValueError as err:
+        return {"error": str(err)}, 400
+    rows = await db.fetch_all(*student_events_query(user_session['user_id'], page_cursor, limit))
+    events, next_cursor = build_page(rows, limit, 'start_datetime')
+    return {"items": events, "next_cursor": next_cursor}, 200
+
+async def search(db, user_session, args):
+    try:
+        query = build_search_query(db.dialect, args, user_session['role'])
+    except ValueError as err:
+        return {"error": str(err)}, 400
+    if query is None:
+        return {"items": [], "next_cursor": None}, 200
+    sql, params, limit, offset = query
+    return search_page(await db.fetch_all(sql, params), limit, offset), 200
+
+ASYNC_VIEWS = {
+    'get_departments': departments,
+    'get_current_user': current_user,
+    'get_student_events': student_events,
+    'search': search,
+}
+
+STREAM_ENDPOINT = 'event_stream'
+
+# ===================================================================
+# HELPERS
+# ===================================================================
+
+class _RequestDB:
+    """Per-request view of the async storage that counts and times queries"""
+
+    def __init__(self, storage, route):
+        self.storage = storage
+        self.dialect = storage.dialect
+        self.route = route
+        self.queries = 0
+        self.db_time = 0.0
+
+    async def fetch_all(self, sql, params=()):
+        started = time.perf_counter()
+        try:
+            return await self.storage.fetch_all(sql, params)
+        finally:
+            seconds = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += seconds
+            if request_metrics is not None:
+                request_metrics.query_latency.observe(seconds, (self.route, query_operation(sql)))
+
+    async def fetch_one(self, sql, params=()):
+        rows = await self.fetch_all(sql, params)
+        return rows[0] if rows else None
+
+
+def cors_headers(headers):
+    """What CORS(app, supports_credentials=True) adds to a response"""
+    origin = headers.get('origin')
+    if not origin:
+        return []
+    return [('access-control-allow-origin', origin), ('access-control-allow-credentials', 'true'),
+            ('vary', 'Origin')]
+
+
+def encode_headers(headers):
+    return [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+
+async def send_json(send, body, status, headers=()):
+    payload = dumps_bytes(body)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': encode_headers([('content-type', 'application/json'),
+                                   ('content-length', str(len(payload))), *headers]),
+    })
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope (PEP 3333)"""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1')
+        if name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        elif name == 'content-type':
+            key = 'CONTENT_TYPE'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        value = value.decode('latin-1')
+        environ[key] = environ[key] + ',' + value if key in environ else value
+    return environ
+
+
+class WSGIBridge:
+    """
+    Runs a WSGI app for ASGI requests on a bounded thread pool.
+    (asgiref's WsgiToAsgi runs every request on one shared thread.)
+    """
+
+    def __init__(self, wsgi_app, threads=32):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix='wsgi')
+
+    async def __call__(self, scope, receive, send):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        loop = asyncio.get_running_loop()
+        disconnected = threading.Event()
+
+        def send_from_thread(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        async def watch_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+
+        # A streamed response (e.g. an export) is otherwise only stopped
+        # by a failed send, which the server may never report
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await loop.run_in_executor(self.executor, self._run, build_environ(scope, bytes(body)),
+                                       send_from_thread, disconnected)
+        finally:
+            watcher.cancel()
+
+    def _run(self, environ, send_message, disconnected):
+        response_start = {}
+
+        def start_response(status, headers, exc_info=None):
+            response_start.update(type='http.response.start', status=int(status.split(' ', 1)[0]),
+                                  headers=encode_headers((name.lower(), value) for name, value in headers))
+
+        result = self.wsgi_app(environ, start_response)
+        started = False
+        try:
+            for chunk in result:
+                if disconnected.is_set():
+                    return  # result.close() below ends the view's generator
+                if not started:
+                    send_message(response_start)
+                    started = True
+                if chunk:
+                    send_message({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if not started:
+                send_message(response_start)
+            send_message({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+# ===================================================================
+# APPLICATION
+# ===================================================================
+
+class AsyncApplication:
+    """
+    ASGI application: ASYNC_VIEWS and /api/stream on the event loop,
+    everything else through WSGIBridge
+    """
+
+    def __init__(self, flask_app, views, wsgi_threads=32):
+        self.flask_app = flask_app
+        self.views = views
+        self.wsgi = WSGIBridge(flask_app.wsgi_app, wsgi_threads)
+        self.urls = flask_app.url_map.bind('localhost')
+        self.session_serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+        self.session_cookie = flask_app.config['SESSION_COOKIE_NAME']
+        self.session_max_age = int(flask_app.permanent_session_lifetime.total_seconds())
+        self.storage = None
+        self._storage_lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] == 'http' and scope['method'] == 'GET':
+            try:
+                rule, view_args = self.urls.match(scope['path'], method='GET', return_rule=True)
+            except HTTPException:  # includes redirects; let Flask answer those
+                rule = None
+            if rule is not None and (rule.endpoint in self.views or rule.endpoint == STREAM_ENDPOINT):
+                return await self._handle(scope, receive, send, rule, view_args)
+        if scope['type'] == 'http':
+            await self.wsgi(scope, receive, send)
+
+    # ---------------------------------------------------------------
+    # Lifecycle
+    # ---------------------------------------------------------------
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await asyncio.get_running_loop().run_in_executor(self.wsgi.executor, start_worker)
+                    await self._get_storage()
+                except Exception as err:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(err)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                drain_worker()
+                if self.storage is not None:
+                    await self.storage.close()
+                self.wsgi.executor.shutdown(wait=False)
+                stop_worker()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _get_storage(self):
+        if self.storage is None:
+            async with self._storage_lock:
+                if self.storage is None:
+                    storage = async_storage_from_env(get_storage(), mysql_connect_args(),
+                                                     observer=request_metrics)
+                    await storage.start()
+                    self.storage = storage
+        return self.storage
+
+    def _load_session(self, headers):
+        value = parse_cookie(headers.get('cookie', '')).get(self.session_cookie)
+        if not value:
+            return {}
+        try:
+            return self.session_serializer.loads(value, max_age=self.session_max_age)
+        except BadSignature:
+            return {}
+
+    # ---------------------------------------------------------------
+    # Requests
+    # ---------------------------------------------------------------
+    async def _handle(self, scope, receive, send, rule, view_args):
+        started = time.perf_counter()
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        query_string = scope.get('query_string', b'').decode('latin-1')
+        args = MultiDict(parse_qsl(query_string, keep_blank_values=True))
+        user_session = self._load_session(headers)
+        view = self.flask_app.view_functions[rule.endpoint]
+        extra = cors_headers(headers)
+        status, db = 500, None
+        try:
+            if getattr(view, 'login_required', False):
+                denied = session_denied(user_session, view.allowed_roles)
+                if denied:
+                    status = denied[1]
+                    await send_json(send, {"error": denied[0]}, status, extra)
+                    return
+
+            if rule.endpoint == STREAM_ENDPOINT:
+                status = await self._stream(receive, send, user_session, headers, args, extra, started, rule)
+                return
+
+            try:
+                db = _RequestDB(await self._get_storage(), rule.rule)
+            except ASYNC_DB_ERRORS + (StorageUnavailableError,) as err:
+                print(f"Database connection error: {err}")
+                await send_json(send, {"error": "Database connection failed"}, 500, extra)
+                return
+
+            validators = []
+            conditional = getattr(view, 'conditional_get', None)
+            if conditional:
+                validators, not_modified = await self._conditional(
+                    db, conditional, f"{scope['path']}?{query_string}", user_session, headers)
+                if not_modified:
+                    status = 304
+                    await send({'type': 'http.response.start', 'status': 304,
+                                'headers': encode_headers(validators + extra)})
+                    await send({'type': 'http.response.body', 'body': b''})
+                    return
+
+            try:
+                body, status = await self.views[rule.endpoint](db, user_session, args, **view_args)
+            except StorageUnavailableError:
+                body, status = {"error": "Database connection failed"}, 500
+            except ASYNC_DB_ERRORS as err:
+                body, status = {"error": f"Database error: {err}"}, 500
+            await send_json(send, body, status, (validators if status == 200 else []) + extra)
+        finally:
+            if request_metrics is not None and rule.endpoint != STREAM_ENDPOINT:
+                request_metrics.observe_request('GET', rule.rule, status, time.perf_counter() - started,
+                                                db.queries if db else 0, db.db_time if db else 0.0)
+
+    async def _conditional(self, db, conditional, full_path, user_session, headers):
+        """ETag/Last-Modified headers and whether the client's copy is current"""
+        tables, per_user = conditional
+        try:
+            rows = await db.fetch_all(*table_versions_query(tables))
+        except ASYNC_DB_ERRORS + (StorageUnavailableError,):
+            return [], False  # Can't validate; fall through to a normal response
+        versions, last_modified = table_versions_from_rows(tables, rows)
+        etag, last_modified = cache_validators(
+            full_path, tables, versions, last_modified, user_session.get('user_id'), per_user)
+
+        validators = [('etag', quote_etag(etag))]
+        if last_modified:
+            validators.append(('last-modified', http_date(last_modified)))
+        validators.append(('cache-control', 'private, no-cache' if per_user else 'no-cache'))
+
+        if headers.get('if-none-match'):
+            return validators, parse_etags(headers['if-none-match']).contains(etag)
+        since = parse_date(headers.get('if-modified-since'))
+        return validators, bool(since and last_modified and last_modified <= since)
+
+    async def _stream(self, receive, send, user_session, headers, args, extra, started, rule):
+        """/api/stream with the subscription woken by the event loop instead of a thread"""
+        last_event_id = parse_last_event_id(headers.get('last-event-id') or args.get('lastEventId'))
+        subscription = stream_hub.subscribe(user_session['user_id'], user_session['role'], last_event_id)
+        if subscription is None:
+            await send_json(send, {"error": "Too many open streams, try again later"}, 503,
+                            [('retry-after', '30')] + extra)
+            return 503
+        subscription.attach_loop(asyncio.get_running_loop())
+
+        async def watch_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            subscription.close()
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': encode_headers([
+                ('content-type', 'text/event-stream; charset=utf-8'), ('cache-control', 'no-cache'),
+                ('x-accel-buffering', 'no'), *extra])})
+            # Timed like the sync path: up to the point the stream starts
+            if request_metrics is not None:
+                request_metrics.observe_request('GET', rule.rule, 200, time.perf_counter() - started)
+            await send({'type': 'http.response.body', 'body': b"retry: %d\n\n" % SSE_RETRY_MS, 'more_body': True})
+            while True:
+                frames = await subscription.get_async(SSE_HEARTBEAT_SECONDS)
+                if frames is None:
+                    break
+                await send({'type': 'http.response.body', 'more_body': True,
+                            'body': b''.join(frames) if frames else b": keepalive\n\n"})
+            if not watcher.done():
+                await send({'type': 'http.response.body', 'body': b''})
+        except OSError:
+            pass  # client went away mid-send
+        finally:
+            watcher.cancel()
+            stream_hub.unsubscribe(subscription)
+        return 200
+
+
+application = AsyncApplication(app, ASYNC_VIEWS, wsgi_threads=int(os.getenv("ASGI_WSGI_THREADS", "32")))
@@ -0,0 +1,159 @@
+# ===================================================================
+# CAMPUSSPHERE - ASYNC STORAGE (ASGI READ PATH)
+# ===================================================================
+# Read-only query access for the async endpoints served by asgi.py.
+# The same DB_BACKEND switch as storage.py picks the implementation:
+#
+#   mysql   aiomysql connection pool (DB_ASYNC_POOL_MIN/MAX/TIMEOUT),
+#           connecting to DB_HOST with the credentials app.py uses
+#   sqlite  SQLite has no async driver; queries run on a small thread
+#           pool (SQLITE_ASYNC_THREADS) against the sync SQLiteStorage
+#
+# Both expose fetch_all(sql, params) / fetch_one(sql, params) returning
+# dict rows, with the same %s placeholders as the sync handlers. Reads
+# go to the primary; replica routing (DB_REPLICA_HOSTS) applies to the
+# sync path only. aiomysql is only needed when serving through asgi.py.
+
+import asyncio
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import aiomysql
+    import pymysql
+except ImportError:  # sync-only deployment
+    aiomysql = None
+
+from storage import StorageUnavailableError
+
+ASYNC_DB_ERRORS = (sqlite3.Error,) + ((pymysql.err.MySQLError,) if aiomysql else ())
+
+
+class AsyncMySQLStorage:
+    """
+    aiomysql pool for the async endpoints
+
+    Args:
+        connect_args: host/user/password/database, as passed to storage_from_env
+        min_size, max_size: pool bounds
+        timeout: seconds to wait for a free connection
+        observer: optional object with observe_acquire(seconds)
+    """
+
+    dialect = 'mysql'
+
+    def __init__(self, connect_args, min_size=1, max_size=20, timeout=5.0, observer=None):
+        if aiomysql is None:
+            raise RuntimeError("The async read path needs aiomysql installed")
+        self.connect_args = connect_args
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.observer = observer
+        self.pool = None
+
+    async def start(self):
+        args = self.connect_args
+        self.pool = await aiomysql.create_pool(
+            host=args["host"], port=int(args.get("port", 3306)), user=args["user"],
+            password=args["password"], db=args["database"], charset=args.get("charset", 'utf8mb4'),
+            autocommit=True, minsize=self.min_size, maxsize=self.max_size,
+            pool_recycle=int(os.getenv("DB_POOL_MAX_IDLE", "300")),
+        )
+
+    async def _acquire(self):
+        started = time.monotonic()
+        try:
+            conn = await asyncio.wait_for(self.pool.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise StorageUnavailableError(
+                f"Timed out after {self.timeout}s waiting for a database connection")
+        if self.observer is not None:
+            self.observer.observe_acquire(time.monotonic() - started)
+        return conn
+
+    async def fetch_all(self, sql, params=()):
+        conn = await self._acquire()
+        try:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(sql, tuple(params))
+                return list(await cursor.fetchall())
+        finally:
+            self.pool.release(conn)
+
+    async def fetch_one(self, sql, params=()):
+        rows = await self.fetch_all(sql, params)
+        return rows[0] if rows else None
+
+    def stats(self):
+        if self.pool is None:
+            return {"backend": 'mysql-async', "open": 0}
+        return {
+            "backend": 'mysql-async',
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "open": self.pool.size,
+            "idle": self.pool.freesize,
+            "in_use": self.pool.size - self.pool.freesize,
+        }
+
+    async def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+
+
+class AsyncSQLiteStorage:
+    """Runs read queries for the async endpoints on a thread pool over SQLiteStorage"""
+
+    dialect = 'sqlite'
+
+    def __init__(self, storage, threads=8):
+        self.storage = storage
+        self.threads = threads
+        self._executor = None
+
+    async def start(self):
+        self._executor = ThreadPoolExecutor(self.threads, thread_name_prefix='sqlite-async')
+
+    def _fetch_all(self, sql, params):
+        from sqlite_storage import SQLiteCursor
+
+        conn = self.storage.get_connection()
+        try:
+            # Plain cursor: the async path times queries itself
+            cursor = SQLiteCursor(conn.raw, dictionary=True)
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        finally:
+            conn.close()
+
+    async def fetch_all(self, sql, params=()):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._fetch_all, sql, params)
+
+    async def fetch_one(self, sql, params=()):
+        rows = await self.fetch_all(sql, params)
+        return rows[0] if rows else None
+
+    def stats(self):
+        return {"backend": 'sqlite-async', "threads": self.threads}
+
+    async def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+def async_storage_from_env(sync_storage, mysql_connect_args, observer=None):
+    """Async counterpart of the sync backend `sync_storage`"""
+    if sync_storage.dialect == 'sqlite':
+        return AsyncSQLiteStorage(sync_storage, threads=int(os.getenv("SQLITE_ASYNC_THREADS", "8")))
+    return AsyncMySQLStorage(
+        mysql_connect_args,
+        min_size=int(os.getenv("DB_ASYNC_POOL_MIN", "1")),
+        max_size=int(os.getenv("DB_ASYNC_POOL_MAX", "20")),
+        timeout=float(os.getenv("DB_ASYNC_POOL_TIMEOUT", "5")),
+        observer=observer,
+    )
@@ -0,0 +1,309 @@
+# ===================================================================
+# CAMPUSSPHERE - HIGH-CONCURRENCY READ BENCHMARK
+# ===================================================================
+# Holds --clients keep-alive connections open against a running server,
+# each issuing the read-heavy student requests served natively by
+# asgi.py (departments, profile, event feed, search) back to back, and
+# reports throughput, latency percentiles and errors. --streams also
+# keeps that many /api/stream connections open for the whole run, and
+# --server-pid reports the server's RSS with everything connected.
+#
+# Run once against each server with the same seeded database, e.g.
+#   python app.py                                    # threaded WSGI
+#   uvicorn asgi:application --port 5000 --timeout-graceful-shutdown 5   # ASGI
+#
+# Seed with benchmarks/seed_campus.py first; clients log in as seeded
+# students (--users sessions shared round-robin across clients).
+#
+# Usage (from backend/):
+#   python benchmarks/concurrency_bench.py --base-url http://127.0.0.1:5000 --clients 1000 --duration 30
+#   python benchmarks/concurrency_bench.py --clients 2000 --streams 2000 --server-pid 12345
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import quote_plus, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seed_campus import EMAIL_DOMAIN, LOADTEST_PASSWORD, SKILLS
+
+# The search endpoint rejects queries shorter than 3 characters
+SEARCH_TERMS = [skill for skill in SKILLS if len(skill) >= 3]
+
+PATHS = (
+    ("GET /api/departments", lambda rng: "/api/departments"),
+    ("GET /api/profile", lambda rng: "/api/profile"),
+    ("GET /api/student/events", lambda rng: "/api/student/events?limit=20"),
+    ("GET /api/search", lambda rng: "/api/search?q=" + quote_plus(rng.choice(SEARCH_TERMS))),
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Many concurrent keep-alive clients against a running server")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--users", type=int, default=50, help="student sessions shared by the clients")
+    parser.add_argument("--streams", type=int, default=0, help="idle /api/stream connections held open")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--server-pid", type=int, help="report this process's RSS")
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args()
+
+
+def raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        if target < needed:
+            print(f"warning: open file limit is {target}, some connections will fail")
+
+
+def rss_kb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def seeded_students(limit):
+    from app import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        raise SystemExit("Database connection failed")
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT email FROM users
+            WHERE email LIKE %s AND role = 'student' AND status = 'active'
+            ORDER BY id LIMIT %s
+        """, (f"%@{EMAIL_DOMAIN}", limit))
+        emails = [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        conn.close()
+    if not emails:
+        raise SystemExit("No seeded students; run benchmarks/seed_campus.py first")
+    return emails
+
+
+def login(base_url, email):
+    """Session cookie ('name=value') for one seeded user"""
+    req = urllib.request.Request(
+        base_url.rstrip('/') + '/api/login', method='POST',
+        data=json.dumps({"email": email, "password": LOADTEST_PASSWORD}).encode('utf-8'),
+        headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            cookie = response.headers.get('Set-Cookie', '')
+    except urllib.error.HTTPError as err:
+        raise SystemExit(f"Login failed for {email}: HTTP {err.code}")
+    return cookie.split(';', 1)[0]
+
+
+# ===================================================================
+# MINIMAL HTTP/1.1 CLIENT
+# ===================================================================
+
+class Connection:
+    """One keep-alive connection; reconnects after the server closes it"""
+
+    def __init__(self, host, port, cookie):
+        self.host = host
+        self.port = port
+        self.cookie = cookie
+        self.reader = self.writer = None
+
+    async def _open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def get(self, path):
+        if self.writer is None:
+            return await self._get(path)
+        try:
+            return await self._get(path)
+        except (OSError, asyncio.IncompleteReadError):
+            # The server closed the idle connection (e.g. a recycled
+            # worker); retry once on a new one, as HTTP clients do
+            self.close()
+            return await self._get(path)
+
+    async def _get(self, path):
+        if self.writer is None:
+            await self._open()
+        self.writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Cookie: {self.cookie}\r\nConnection: keep-alive\r\n\r\n".encode('latin-1'))
+        await self.writer.drain()
+        status, headers = await self._read_head()
+        if headers.get('transfer-encoding') == 'chunked':
+            while True:
+                size = int((await self.reader.readline()).split(b';', 1)[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in headers:
+            await self.reader.readexactly(int(headers['content-length']))
+        else:
+            await self.reader.read()
+            self.close()
+            return status
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status
+
+    async def _read_head(self):
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split(' ', 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        return status, headers
+
+    async def open_stream(self):
+        """Start a GET /api/stream and return its status; frames are then drained in the background"""
+        await self._open()
+        self.writer.write(
+            f"GET /api/stream HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+            f"Cookie: {self.cookie}\r\nAccept: text/event-stream\r\n\r\n".encode('latin-1'))
+        await self.writer.drain()
+        status, _ = await self._read_head()
+        return status
+
+
+# ===================================================================
+# LOAD
+# ===================================================================
+
+async def client(index, args, host, port, cookie, deadline, measure_from, results):
+    rng = random.Random(args.seed * 100003 + index)
+    conn = Connection(host, port, cookie)
+    try:
+        while time.perf_counter() < deadline:
+            name, path = rng.choice(PATHS)
+            started = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(conn.get(path(rng)), args.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                status = None
+                conn.close()
+            finished = time.perf_counter()
+            if started >= measure_from and finished <= deadline:
+                results.setdefault(name, []).append((finished - started, status))
+            if status is None:
+                await asyncio.sleep(0.1)
+    finally:
+        conn.close()
+
+
+async def hold_stream(host, port, cookie, opened, stop):
+    conn = Connection(host, port, cookie)
+    try:
+        status = await asyncio.wait_for(conn.open_stream(), 30)
+        opened.append(status)
+        while not stop.is_set():
+            if not await conn.reader.read(65536):
+                break
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+        opened.append(None)
+    finally:
+        conn.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run(args, cookies):
+    url = urlsplit(args.base_url)
+    host, port = url.hostname, url.port or 80
+    results = {}
+
+    stop = asyncio.Event()
+    opened = []
+    streams = [asyncio.ensure_future(hold_stream(host, port, cookies[i % len(cookies)], opened, stop))
+               for i in range(args.streams)]
+    while len(opened) < args.streams:
+        await asyncio.sleep(0.1)
+    if args.streams:
+        print(f"streams open: {sum(1 for s in opened if s == 200)} of {args.streams}")
+
+    started = time.perf_counter()
+    measure_from = started + args.warmup
+    deadline = measure_from + args.duration
+    tasks = [asyncio.ensure_future(client(i, args, host, port, cookies[i % len(cookies)],
+                                          deadline, measure_from, results))
+             for i in range(args.clients)]
+
+    peak_rss = None
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(1)
+        if args.server_pid:
+            rss = rss_kb(args.server_pid)
+            peak_rss = max(peak_rss or 0, rss or 0)
+    await asyncio.gather(*tasks)
+    stop.set()
+    for task in streams:
+        task.cancel()
+    await asyncio.gather(*streams, return_exceptions=True)
+    return results, peak_rss
+
+
+def report(args, results, peak_rss):
+    print(f"{args.clients} clients, {args.streams} idle streams, {args.duration:.0f} s against {args.base_url}")
+    print(f"{'endpoint':26s} {'requests':>9s} {'errors':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}")
+    total = errors = 0
+    all_latencies = []
+    for name in sorted(results):
+        samples = results[name]
+        latencies = sorted(seconds for seconds, _ in samples)
+        failed = sum(1 for _, status in samples if status != 200)
+        total += len(samples)
+        errors += failed
+        all_latencies.extend(latencies)
+        print(f"{name:26s} {len(samples):9d} {failed:7d} {percentile(latencies, 0.5) * 1000:8.1f} "
+              f"{percentile(latencies, 0.95) * 1000:8.1f} {percentile(latencies, 0.99) * 1000:8.1f}")
+    all_latencies.sort()
+    print(f"{'all':26s} {total:9d} {errors:7d} {percentile(all_latencies, 0.5) * 1000:8.1f} "
+          f"{percentile(all_latencies, 0.95) * 1000:8.1f} {percentile(all_latencies, 0.99) * 1000:8.1f}")
+    print(f"throughput: {total / args.duration:.0f} req/s")
+    if peak_rss:
+        print(f"server peak RSS: {peak_rss / 1024:.1f} MiB")
+
+
+def main():
+    args = parse_args()
+    raise_fd_limit(args.clients + args.streams + 256)
+    emails = seeded_students(args.users)
+    cookies = [login(args.base_url, email) for email in emails]
+    results, peak_rss = asyncio.run(run(args, cookies))
+    report(args, results, peak_rss)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# ===================================================================
+# CAMPUSSPHERE - JSON ENCODING MICROBENCHMARK
+# ===================================================================
+# Compares the old per-handler path (loop over rows calling .isoformat()
+# and json.loads per row, then Flask's default json.dumps) with the
+# shared json_encoding layer on synthetic collaboration-post rows.
+#
+# Usage (from backend/):
+#   python benchmarks/json_encoding_bench.py --rows 10000 --repeat 20
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json_encoding
+
+
+def make_rows(n):
+    """Rows shaped like the /api/student/collaborate query result"""
+    base = datetime(2026, 1, 1, 9, 30)
+    return [{
+        "id": i,
+        "author_id": i % 500,
+        "title": f"Project {i}",
+        "description": "Looking for teammates to build something interesting " * 3,
+        "skills_required": json.dumps(["python", "react", "sql", f"skill-{i % 40}"]),
+        "team_size_needed": 4,
+        "registration_form_url": None,
+        "project_category": "technical",
+        "status": "active",
+        "interest_count": i % 17,
+        "created_at": base + timedelta(minutes=i),
+        "updated_at": base + timedelta(minutes=i, seconds=30),
+        "author_name": f"Student {i % 500}",
+        "user_interested": Decimal(i % 2),
+    } for i in range(n)]
+
+
+def _legacy_default(obj):
+    # What Flask's DefaultJSONProvider does for the leftovers
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError
+
+
+def legacy_path(rows):
+    for post in rows:
+        if post.get('skills_required'):
+            try:
+                post['skills_required'] = json.loads(post['skills_required'])
+            except Exception:
+                post['skills_required'] = []
+        else:
+            post['skills_required'] = []
+        if post['created_at']:
+            post['created_at'] = post['created_at'].isoformat()
+        if post['updated_at']:
+            post['updated_at'] = post['updated_at'].isoformat()
+    return json.dumps({"items": rows}, default=_legacy_default, ensure_ascii=False,
+                      sort_keys=True).encode('utf-8')
+
+
+def new_path(rows):
+    json_encoding.decode_json_columns(rows, 'skills_required')
+    return json_encoding.dumps_bytes({"items": rows})
+
+
+def bench(fn, rows_count, repeat):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        rows = make_rows(rows_count)  # fresh rows: both paths mutate in place
+        started = time.perf_counter()
+        size = len(fn(rows))
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return timings[len(timings) // 2], timings[0], size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON response encoding microbenchmark")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    backend = "orjson" if json_encoding.orjson is not None else "stdlib json"
+    print(f"rows={args.rows} repeat={args.repeat} backend={backend}")
+
+    legacy_median, legacy_best, legacy_size = bench(legacy_path, args.rows, args.repeat)
+    new_median, new_best, new_size = bench(new_path, args.rows, args.repeat)
+
+    print(f"legacy:  median {legacy_median * 1000:8.2f} ms  best {legacy_best * 1000:8.2f} ms  "
+          f"{legacy_size / 1024:.0f} KiB")
+    print(f"new:     median {new_median * 1000:8.2f} ms  best {new_best * 1000:8.2f} ms  "
+          f"{new_size / 1024:.0f} KiB")
+    print(f"speedup: {legacy_median / new_median:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,449 @@
+# ===================================================================
+# CAMPUSSPHERE - LOAD TEST HARNESS
+# ===================================================================
+# Drives a weighted mix of per-role traffic against the app and writes
+# per-endpoint latency percentiles and throughput as JSON, so a change
+# can be measured against a saved baseline.
+#
+# Seed the database first with benchmarks/seed_campus.py. By default
+# requests run in-process through Flask's test client (app + database,
+# no network); --base-url drives a running server over HTTP instead,
+# logging in as seeded users.
+#
+# To compare storage backends, seed and run once per DB_BACKEND and
+# compare the second run against the first:
+#   DB_BACKEND=mysql  python benchmarks/load_test.py --output mysql.json
+#   DB_BACKEND=sqlite python benchmarks/load_test.py --compare mysql.json
+#
+# Usage (from backend/):
+#   python benchmarks/load_test.py --duration 60 --concurrency 32 --output baseline.json
+#   python benchmarks/load_test.py --mix burst --compare baseline.json --fail-on-regression 20
+#   python benchmarks/load_test.py --diagnostics --output run.json   # + per-route query summary
+#
+# Scenarios (weights via --mix name=weight,... or a preset name):
+#   student_dashboard   profile, event feed (+ next page), collaboration feed,
+#                       recommendations, search
+#   student_interest    express interest in a collaboration post
+#   registration_burst  register for one of a few hot events
+#   faculty             profile, events, proposals, mentorship
+#   admin_analytics     analytics, registration trends, user and event lists
+
+import argparse
+import http.cookiejar
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seed_campus import EMAIL_DOMAIN, LOADTEST_PASSWORD, SKILLS
+
+MIX_PRESETS = {
+    'dashboard': {'student_dashboard': 60, 'student_interest': 5, 'registration_burst': 10,
+                  'faculty': 15, 'admin_analytics': 10},
+    'burst': {'registration_burst': 90, 'student_dashboard': 10},
+    'admin': {'admin_analytics': 80, 'faculty': 20},
+}
+
+HOT_EVENTS = 5
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="CampusSphere load test")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds before measuring")
+    parser.add_argument("--concurrency", type=int, default=16, help="virtual users")
+    parser.add_argument("--mix", default="dashboard",
+                        help=f"preset ({', '.join(MIX_PRESETS)}) or name=weight,...")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for scenario choices")
+    parser.add_argument("--base-url", default=None, help="drive a running server instead of in-process")
+    parser.add_argument("--output", default=None, help="write results JSON here")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--diagnostics", action="store_true",
+                        help="enable QUERY_DIAGNOSTICS and include its per-route report in the output")
+    parser.add_argument("--fail-on-regression", type=float, default=None,
+                        help="exit non-zero if any endpoint p95 regresses by more than this percent")
+    return parser.parse_args()
+
+
+def parse_mix(spec):
+    if spec in MIX_PRESETS:
+        return dict(MIX_PRESETS[spec])
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario: {name}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+# ===================================================================
+# CLIENTS
+# ===================================================================
+class InProcessClient:
+    """Flask test client with the session set directly (no login round trip)"""
+
+    def __init__(self, app, user_id, role):
+        self._client = app.test_client()
+        with self._client.session_transaction() as sess:
+            sess['user_id'] = user_id
+            sess['role'] = role
+
+    def request(self, method, path, body=None):
+        response = self._client.open(path, method=method, json=body)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpClient:
+    """urllib client holding the session cookie of one logged-in user"""
+
+    def __init__(self, base_url, email):
+        self._base_url = base_url.rstrip('/')
+        self._opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        status, _ = self.request('POST', '/api/login', {"email": email, "password": LOADTEST_PASSWORD})
+        if status != 200:
+            raise RuntimeError(f"Login failed for {email}: HTTP {status}")
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        req = urllib.request.Request(self._base_url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"})
+        try:
+            with self._opener.open(req, timeout=30) as response:
+                status, payload = response.status, response.read()
+        except urllib.error.HTTPError as err:
+            status, payload = err.code, err.read()
+        try:
+            return status, json.loads(payload) if payload else None
+        except ValueError:
+            return status, None
+
+
+# ===================================================================
+# SCENARIOS
+# ===================================================================
+# Each scenario is a function(call, rng, pools); call(name, method, path, body)
+# issues one request, records it under `name` and returns (status, json)
+
+def student_dashboard(call, rng, pools):
+    call("GET /api/student/profile", "GET", "/api/student/profile")
+    status, page = call("GET /api/student/events", "GET", "/api/student/events")
+    if status == 200 and page and page.get('next_cursor') and rng.random() < 0.3:
+        call("GET /api/student/events?cursor", "GET", f"/api/student/events?cursor={page['next_cursor']}")
+    call("GET /api/student/collaborate", "GET", "/api/student/collaborate")
+    call("GET /api/student/recommendations", "GET", "/api/student/recommendations?limit=10")
+    call("GET /api/search", "GET", f"/api/search?q={urllib.parse.quote(rng.choice(SKILLS))}")
+
+
+def student_interest(call, rng, pools):
+    post_id = rng.choice(pools['posts'])
+    call("POST /api/student/collaborate/<id>/interest", "POST",
+         f"/api/student/collaborate/{post_id}/interest", {"message": "load test"})
+
+
+def registration_burst(call, rng, pools):
+    event_id = rng.choice(pools['hot_events'])
+    call("POST /api/student/events/<id>/register", "POST", f"/api/student/events/{event_id}/register")
+
+
+def faculty(call, rng, pools):
+    call("GET /api/faculty/profile", "GET", "/api/faculty/profile")
+    call("GET /api/faculty/events", "GET", "/api/faculty/events")
+    call("GET /api/faculty/proposals", "GET", "/api/faculty/proposals")
+    call("GET /api/faculty/mentorship", "GET", "/api/faculty/mentorship")
+
+
+def admin_analytics(call, rng, pools):
+    call("GET /api/admin/analytics", "GET", "/api/admin/analytics")
+    end = date.today()
+    start = end - timedelta(days=rng.choice([7, 30, 90, 365]))
+    bucket = rng.choice(['day', 'week', 'month'])
+    dimension = rng.choice(['', 'department', 'category', 'role'])
+    call("GET /api/admin/analytics/registrations", "GET",
+         f"/api/admin/analytics/registrations?start={start}&end={end}&bucket={bucket}&dimension={dimension}")
+    call("GET /api/admin/users", "GET", f"/api/admin/users?role={rng.choice(['student', 'faculty'])}")
+    call("GET /api/admin/events", "GET", "/api/admin/events")
+
+
+SCENARIOS = {
+    'student_dashboard': ('student', student_dashboard),
+    'student_interest': ('student', student_interest),
+    'registration_burst': ('student', registration_burst),
+    'faculty': ('faculty', faculty),
+    'admin_analytics': ('admin', admin_analytics),
+}
+
+
+# ===================================================================
+# RUNNER
+# ===================================================================
+def load_pools():
+    """Seeded user, event and post ids to draw traffic from"""
+    from app import get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        raise SystemExit("Database connection failed")
+    cursor = conn.cursor()
+    try:
+        pools = {}
+        cursor.execute("""
+            SELECT id, role, email FROM users
+            WHERE email LIKE %s AND status = 'active'
+        """, (f"%@{EMAIL_DOMAIN}",))
+        users = cursor.fetchall()
+        for role in ('student', 'faculty', 'admin'):
+            pools[role] = [(user_id, email) for user_id, r, email in users if r == role]
+            if not pools[role]:
+                raise SystemExit(f"No seeded {role} users; run benchmarks/seed_campus.py first")
+
+        cursor.execute("""
+            SELECT e.id FROM events e JOIN users u ON e.organizer_id = u.id
+            WHERE u.email LIKE %s AND e.status = 'approved' AND e.start_datetime > NOW()
+            ORDER BY e.id LIMIT %s
+        """, (f"%@{EMAIL_DOMAIN}", HOT_EVENTS))
+        pools['hot_events'] = [row[0] for row in cursor.fetchall()]
+
+        cursor.execute("""
+            SELECT cp.id FROM collaboration_posts cp JOIN users u ON cp.author_id = u.id
+            WHERE u.email LIKE %s AND cp.status = 'active'
+        """, (f"%@{EMAIL_DOMAIN}",))
+        pools['posts'] = [row[0] for row in cursor.fetchall()]
+        conn.commit()
+        return pools
+    finally:
+        cursor.close()
+        conn.close()
+
+
+class Recorder:
+    """Thread-safe latency samples per endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.statuses = {}
+        self.measuring = False
+
+    def record(self, name, status, seconds):
+        if not self.measuring:
+            return
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+            codes = self.statuses.setdefault(name, {})
+            codes[status] = codes.get(status, 0) + 1
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples, statuses, elapsed):
+    values = sorted(samples)
+    errors = sum(n for code, n in statuses.items() if code >= 500 or code == 0)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+        "status_codes": {str(code): n for code, n in sorted(statuses.items())},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    mix = parse_mix(args.mix)
+    app = None
+    if not args.base_url:
+        # Size the pool before app import so virtual users don't queue on it
+        os.environ.setdefault("DB_POOL_MAX", str(args.concurrency))
+        if args.diagnostics:
+            os.environ["QUERY_DIAGNOSTICS"] = "true"
+        from app import app
+    pools = load_pools()
+
+    recorder = Recorder()
+    stop = threading.Event()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+
+    def virtual_user(index):
+        rng = random.Random(args.seed * 100003 + index)
+        clients = {}
+
+        def client_for(role):
+            if role not in clients:
+                user_id, email = rng.choice(pools[role])
+                clients[role] = (HttpClient(args.base_url, email) if args.base_url
+                                 else InProcessClient(app, user_id, role))
+            return clients[role]
+
+        while not stop.is_set():
+            role, scenario = SCENARIOS[rng.choices(names, weights)[0]]
+            client = client_for(role)
+
+            def call(name, method, path, body=None):
+                started = time.perf_counter()
+                try:
+                    status, payload = client.request(method, path, body)
+                except Exception:
+                    status, payload = 0, None
+                recorder.record(name, status, time.perf_counter() - started)
+                return status, payload
+
+            scenario(call, rng, pools)
+            # Rotate identities now and then so caches see many users
+            if rng.random() < 0.05:
+                clients.pop(role, None)
+
+    threads = [threading.Thread(target=virtual_user, args=(i,), daemon=True)
+               for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+
+    time.sleep(args.warmup)
+    recorder.measuring = True
+    started = time.perf_counter()
+    time.sleep(args.duration)
+    recorder.measuring = False
+    elapsed = time.perf_counter() - started
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    all_samples, all_statuses = [], {}
+    endpoints = {}
+    for name in sorted(recorder.samples):
+        endpoints[name] = summarize(recorder.samples[name], recorder.statuses[name], elapsed)
+        all_samples.extend(recorder.samples[name])
+        for code, n in recorder.statuses[name].items():
+            all_statuses[code] = all_statuses.get(code, 0) + n
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "git_revision": git_revision(),
+            "mode": "http" if args.base_url else "in-process",
+            "backend": os.getenv("DB_BACKEND", "mysql"),
+            "base_url": args.base_url,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "concurrency": args.concurrency,
+            "mix": mix,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "host": platform.node(),
+        },
+        "overall": summarize(all_samples, all_statuses, elapsed),
+        "endpoints": endpoints,
+    }
+    if args.diagnostics:
+        results["query_diagnostics"] = fetch_diagnostics(args, pools, app)
+    return results
+
+
+def fetch_diagnostics(args, pools, app):
+    """Per-route query report (the server needs QUERY_DIAGNOSTICS=true in --base-url mode)"""
+    user_id, email = pools['admin'][0]
+    client = HttpClient(args.base_url, email) if args.base_url else InProcessClient(app, user_id, 'admin')
+    status, report = client.request('GET', '/api/admin/query-diagnostics?top=10')
+    if status != 200:
+        print(f"query diagnostics unavailable: HTTP {status}")
+        return None
+    return report
+
+
+# ===================================================================
+# REPORTING
+# ===================================================================
+def print_diagnostics(report, limit=10):
+    print(f"\n{'route':46s} {'q/req':>7s} {'max':>5s} {'db ms':>8s} {'n+1':>5s}  top statement")
+    for route in report['routes'][:limit]:
+        top = route['top_statements'][0] if route['top_statements'] else None
+        top_text = f"{top['per_request']:.1f}x {top['statement'][:60]}" if top else ''
+        print(f"{route['route']:46s} {route['avg_queries']:7.1f} {route['max_queries']:5d} "
+              f"{route['avg_db_ms']:8.1f} {route['repeat_flags']:5d}  {top_text}")
+
+
+def print_report(results):
+    print(f"{'endpoint':46s} {'req':>7s} {'rps':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'err':>5s}")
+    rows = list(results['endpoints'].items()) + [("overall", results['overall'])]
+    for name, stats in rows:
+        print(f"{name:46s} {stats['requests']:7d} {stats['throughput_rps']:8.1f} "
+              f"{stats['p50_ms']:8.1f} {stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f} {stats['errors']:5d}")
+
+
+def compare(results, baseline, threshold=None):
+    """Print per-endpoint deltas against a baseline; returns endpoints over `threshold`"""
+    print(f"\nvs baseline {baseline['meta'].get('git_revision')} ({baseline['meta'].get('timestamp')}, "
+          f"{baseline['meta'].get('backend', 'mysql')})")
+    print(f"{'endpoint':46s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'rps':>9s}")
+    regressions = []
+
+    def delta(new, old):
+        return (new - old) / old * 100.0 if old else 0.0
+
+    rows = list(results['endpoints'].items()) + [("overall", results['overall'])]
+    for name, stats in rows:
+        old = baseline['overall'] if name == "overall" else baseline['endpoints'].get(name)
+        if not old:
+            print(f"{name:46s} (not in baseline)")
+            continue
+        p95_delta = delta(stats['p95_ms'], old['p95_ms'])
+        print(f"{name:46s} {delta(stats['p50_ms'], old['p50_ms']):+8.1f}% {p95_delta:+8.1f}% "
+              f"{delta(stats['p99_ms'], old['p99_ms']):+8.1f}% "
+              f"{delta(stats['throughput_rps'], old['throughput_rps']):+8.1f}%")
+        if threshold is not None and p95_delta > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    args = parse_args()
+    results = run(args)
+    print_report(results)
+    if results.get('query_diagnostics'):
+        print_diagnostics(results['query_diagnostics'])
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\nwrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.fail_on_regression)
+        if regressions:
+            print(f"\nFAIL: p95 regressed more than {args.fail_on_regression}% on: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
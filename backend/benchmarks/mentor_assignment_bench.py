@@ -0,0 +1,85 @@
+# ===================================================================
+# CAMPUSSPHERE - MENTOR ASSIGNMENT BENCHMARK
+# ===================================================================
+# Runs solve_assignment() on a synthetic campus and compares placement
+# count and total affinity with a greedy first-come pairing.
+#
+# Usage (from backend/):
+#   python benchmarks/mentor_assignment_bench.py --students 20000 --faculty 800
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mentor_matching import affinity, solve_assignment, summarize
+
+
+def make_campus(n_students, n_faculty, n_departments, n_skills, rng):
+    vocabulary = [f"skill-{i}" for i in range(n_skills)]
+    mentors = [{
+        "id": 100000 + i,
+        "department_id": rng.randint(1, n_departments),
+        "skills": set(rng.sample(vocabulary, rng.randint(2, 8))),
+        "remaining": rng.randint(0, 30),
+    } for i in range(n_faculty)]
+    students = [{
+        "id": i + 1,
+        "department_id": rng.randint(1, n_departments),
+        "skills": set(rng.sample(vocabulary, rng.randint(0, 6))),
+    } for i in range(n_students)]
+    return students, mentors
+
+
+def greedy(students, mentors):
+    """Each student in turn takes the best mentor that still has room"""
+    remaining = {m['id']: m['remaining'] for m in mentors}
+    pairs, unassigned = [], []
+    for student in students:
+        best = max((m for m in mentors if remaining[m['id']] > 0),
+                   key=lambda m: affinity(student, m), default=None)
+        if best is None:
+            unassigned.append(student['id'])
+            continue
+        remaining[best['id']] -= 1
+        pairs.append((student['id'], best['id'], affinity(student, best)))
+    return pairs, unassigned
+
+
+def report(label, pairs, unassigned, mentors, elapsed):
+    summary = summarize(pairs, unassigned, mentors)
+    print(f"{label:8s} {elapsed:8.2f} s  paired {summary['students_paired']:6d}  "
+          f"unpaired {summary['students_unpaired']:6d}  same dept {summary['same_department']:6d}  "
+          f"total affinity {summary['total_affinity']:7d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch mentor assignment benchmark")
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--faculty", type=int, default=800)
+    parser.add_argument("--departments", type=int, default=12)
+    parser.add_argument("--skills", type=int, default=200)
+    parser.add_argument("--max-candidates", type=int, default=10)
+    parser.add_argument("--greedy", action="store_true", help="also time the greedy baseline")
+    args = parser.parse_args()
+
+    students, mentors = make_campus(args.students, args.faculty, args.departments,
+                                    args.skills, random.Random(7))
+    print(f"students={args.students} faculty={args.faculty} "
+          f"capacity={sum(m['remaining'] for m in mentors)}")
+
+    started = time.perf_counter()
+    pairs, unassigned = solve_assignment(students, mentors, max_candidates=args.max_candidates)
+    report("optimal", pairs, unassigned, mentors, time.perf_counter() - started)
+
+    if args.greedy:
+        started = time.perf_counter()
+        pairs, unassigned = greedy(students, mentors)
+        report("greedy", pairs, unassigned, mentors, time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# ===================================================================
+# CAMPUSSPHERE - METRICS OVERHEAD MICROBENCHMARK
+# ===================================================================
+# Measures what metrics.RequestMetrics adds to a request: the request
+# start/finish bookkeeping plus one InstrumentedCursor round per query.
+# Queries run against an in-memory SQLite database so the per-query
+# cost is close to the floor; real MySQL round trips are 10-100x
+# slower, which makes the relative overhead smaller still.
+#
+# Usage (from backend/):
+#   python benchmarks/metrics_overhead_bench.py --requests 20000 --queries 6
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import RequestMetrics
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Metrics instrumentation overhead")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=6, help="queries per simulated request")
+    parser.add_argument("--routes", type=int, default=40, help="distinct route labels")
+    return parser.parse_args()
+
+
+def run(conn, args, metrics=None):
+    started = time.perf_counter()
+    for i in range(args.requests):
+        route = f"/api/route/{i % args.routes}"
+        if metrics is not None:
+            metrics.start_request('GET', route)
+        cursor = conn.cursor()
+        if metrics is not None:
+            cursor = metrics.wrap_cursor(cursor)
+        for q in range(args.queries):
+            cursor.execute("SELECT id, name FROM items WHERE id = ?", (q,))
+            cursor.fetchall()
+        cursor.close()
+        if metrics is not None:
+            metrics.finish_request(200)
+    return time.perf_counter() - started
+
+
+def main():
+    args = parse_args()
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO items VALUES (?, ?)", [(i, f"item {i}") for i in range(100)])
+
+    run(conn, args, RequestMetrics())  # warm-up
+    plain = run(conn, args)
+    metrics = RequestMetrics()
+    instrumented = run(conn, args, metrics)
+
+    per_request = (instrumented - plain) / args.requests * 1e6
+    print(f"requests={args.requests} queries/request={args.queries}")
+    print(f"plain        {plain:.3f}s  ({plain / args.requests * 1e6:.1f} us/request)")
+    print(f"instrumented {instrumented:.3f}s  ({instrumented / args.requests * 1e6:.1f} us/request)")
+    print(f"overhead     {per_request:.1f} us/request ({(instrumented / plain - 1) * 100:.1f}% of a SQLite-only request)")
+
+    started = time.perf_counter()
+    text = metrics.render()
+    print(f"render       {(time.perf_counter() - started) * 1000:.1f} ms, {len(text.splitlines())} lines")
+
+
+if __name__ == '__main__':
+    main()
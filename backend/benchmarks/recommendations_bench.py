@@ -0,0 +1,98 @@
+# ===================================================================
+# CAMPUSSPHERE - RECOMMENDATION SCORING BENCHMARK
+# ===================================================================
+# Builds a SkillRecommender index from synthetic collaboration posts and
+# times single-student recommend() calls and full-campus score_all()
+# against a naive per-pair Python loop.
+#
+# Usage (from backend/):
+#   python benchmarks/recommendations_bench.py --posts 5000 --students 20000
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recommendations import SkillRecommender, normalize_skills
+
+
+def make_skill_sets(n, vocabulary, rng):
+    return [rng.sample(vocabulary, rng.randint(1, 6)) for _ in range(n)]
+
+
+def naive_scores(post_skills, student_skills):
+    """Per-pair TF-IDF cosine in pure Python, as a reference"""
+    n_posts = len(post_skills)
+    doc_freq = {}
+    for skills in post_skills.values():
+        for skill in skills:
+            doc_freq[skill] = doc_freq.get(skill, 0) + 1
+    idf = {s: math.log((1.0 + n_posts) / (1.0 + df)) + 1.0 for s, df in doc_freq.items()}
+
+    def vector(skills):
+        weights = {s: idf[s] for s in skills if s in idf}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {s: w / norm for s, w in weights.items()}
+
+    post_vectors = {pid: vector(skills) for pid, skills in post_skills.items()}
+    results = {}
+    for student_id, skills in student_skills:
+        sv = vector(skills)
+        scores = [(pid, sum(w * pv.get(s, 0.0) for s, w in sv.items()))
+                  for pid, pv in post_vectors.items()]
+        scores.sort(key=lambda item: -item[1])
+        results[student_id] = scores[:10]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Skill recommendation scoring benchmark")
+    parser.add_argument("--posts", type=int, default=5000)
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--skills", type=int, default=300, help="vocabulary size")
+    parser.add_argument("--naive-sample", type=int, default=200,
+                        help="students scored with the pure-Python reference")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = [f"skill-{i}" for i in range(args.skills)]
+    recommender = SkillRecommender(lambda: None)
+    if not recommender.available:
+        sys.exit("numpy is not installed")
+
+    recommender._post_skills = {
+        i + 1: normalize_skills(skills)
+        for i, skills in enumerate(make_skill_sets(args.posts, vocabulary, rng))
+    }
+    students = [(i + 1, skills) for i, skills in enumerate(make_skill_sets(args.students, vocabulary, rng))]
+    print(f"posts={args.posts} students={args.students} skills={args.skills}")
+
+    started = time.perf_counter()
+    recommender._rebuild()
+    print(f"index build:       {(time.perf_counter() - started) * 1000:8.2f} ms")
+
+    started = time.perf_counter()
+    for _, skills in students[:1000]:
+        recommender.recommend(skills, top_k=10)
+    per_call = (time.perf_counter() - started) / min(1000, len(students))
+    print(f"recommend():       {per_call * 1e6:8.1f} us/student")
+
+    started = time.perf_counter()
+    recommender.score_all(students, top_k=10)
+    batch = time.perf_counter() - started
+    print(f"score_all():       {batch * 1000:8.2f} ms total, {batch / len(students) * 1e6:.1f} us/student")
+
+    sample = students[:args.naive_sample]
+    started = time.perf_counter()
+    naive_scores(recommender._post_skills, sample)
+    naive = (time.perf_counter() - started) / max(1, len(sample))
+    print(f"naive loop:        {naive * 1e6:8.1f} us/student")
+    print(f"speedup (batch):   {naive / (batch / len(students)):.1f}x")
+
+
+if __name__ == '__main__':
+    main()
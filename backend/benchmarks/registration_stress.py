@@ -0,0 +1,137 @@
+# ===================================================================
+# CAMPUSSPHERE - EVENT REGISTRATION STRESS TEST
+# ===================================================================
+# Fires many concurrent registrations at a single capacity-limited
+# event through the real /api/student/events/<id>/register handler and
+# checks that the event is never oversold.
+#
+# Usage (from backend/, against a local MySQL configured in .env):
+#   python benchmarks/registration_stress.py --students 500 --capacity 100 --workers 64
+#
+# Exits non-zero if more registrations than seats were accepted or the
+# stored participant_count disagrees with the registration table.
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Concurrent event registration stress test")
+    parser.add_argument("--students", type=int, default=500, help="distinct students registering")
+    parser.add_argument("--capacity", type=int, default=100, help="event max_participants")
+    parser.add_argument("--workers", type=int, default=64, help="concurrent client threads")
+    parser.add_argument("--duplicates", type=int, default=2,
+                        help="attempts per student (extra attempts must hit the unique key)")
+    return parser.parse_args()
+
+
+def seed(conn, run_id, students, capacity):
+    """Create an organizer, one approved event and N students; return their ids"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO users (full_name, email, password_hash, role, status)
+        VALUES (%s, %s, 'x', 'faculty', 'active')
+    """, (f"Stress Organizer {run_id}", f"stress-org-{run_id}@example.test"))
+    organizer_id = cursor.lastrowid
+
+    cursor.execute("""
+        INSERT INTO events (title, description, start_datetime, category, organizer_id,
+                            status, max_participants)
+        VALUES (%s, 'stress test', %s, 'technical', %s, 'approved', %s)
+    """, (f"Stress Event {run_id}", datetime.now() + timedelta(days=7), organizer_id, capacity))
+    event_id = cursor.lastrowid
+
+    cursor.executemany("""
+        INSERT INTO users (full_name, email, password_hash, role, status)
+        VALUES (%s, %s, 'x', 'student', 'active')
+    """, [(f"Stress Student {i}", f"stress-{run_id}-{i}@example.test") for i in range(students)])
+    conn.commit()
+
+    cursor.execute("SELECT id FROM users WHERE email LIKE %s", (f"stress-{run_id}-%",))
+    student_ids = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return organizer_id, event_id, student_ids
+
+
+def cleanup(conn, run_id, event_id):
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM event_registrations WHERE event_id = %s", (event_id,))
+    cursor.execute("DELETE FROM events WHERE id = %s", (event_id,))
+    cursor.execute("DELETE FROM users WHERE email LIKE %s", (f"stress-%{run_id}%",))
+    conn.commit()
+    cursor.close()
+
+
+def main():
+    args = parse_args()
+    os.environ.setdefault("DB_POOL_MAX", str(args.workers))
+
+    from app import app, get_db_connection
+
+    conn = get_db_connection()
+    if not conn:
+        sys.exit("Database connection failed")
+
+    run_id = uuid.uuid4().hex[:8]
+    _, event_id, student_ids = seed(conn, run_id, args.students, args.capacity)
+    url = f"/api/student/events/{event_id}/register"
+
+    def attempt(student_id):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = student_id
+            sess['role'] = 'student'
+        started = time.perf_counter()
+        status = client.post(url).status_code
+        return status, time.perf_counter() - started
+
+    jobs = student_ids * args.duplicates
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(attempt, jobs))
+        elapsed = time.perf_counter() - started
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM event_registrations WHERE event_id = %s", (event_id,))
+        registered = cursor.fetchone()[0]
+        cursor.execute("SELECT participant_count FROM events WHERE id = %s", (event_id,))
+        stored_count = cursor.fetchone()[0]
+        cursor.close()
+        conn.commit()
+    finally:
+        cleanup(conn, run_id, event_id)
+        conn.close()
+
+    statuses = {}
+    for status, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+    latencies = sorted(latency for _, latency in results)
+
+    print(f"requests:          {len(results)} ({args.students} students x {args.duplicates})")
+    print(f"workers:           {args.workers}")
+    print(f"capacity:          {args.capacity}")
+    print(f"status codes:      {dict(sorted(statuses.items()))}")
+    print(f"registrations:     {registered}")
+    print(f"participant_count: {stored_count}")
+    print(f"throughput:        {len(results) / elapsed:.1f} req/s")
+    print(f"latency p50/p99:   {latencies[len(latencies) // 2] * 1000:.1f} / "
+          f"{latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+
+    expected = min(args.capacity, args.students)
+    ok = registered == expected and stored_count == registered and statuses.get(201, 0) == registered
+    if not ok:
+        print("FAIL: capacity invariant violated")
+        sys.exit(1)
+    print("OK: no overselling")
+
+
+if __name__ == '__main__':
+    main()
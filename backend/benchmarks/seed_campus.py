@@ -0,0 +1,306 @@
+# ===================================================================
+# CAMPUSSPHERE - SYNTHETIC CAMPUS SEEDER
+# ===================================================================
+# Fills the database configured in .env (MySQL, or the SQLite file when
+# DB_BACKEND=sqlite) with a reproducible synthetic campus for load
+# testing: departments, students, faculty (with profiles), admins,
+# events, registrations, collaboration posts, interests, mentorships
+# and announcements. The same --seed always produces the same data.
+#
+# Every seeded user has an @loadtest.campussphere.test email and the
+# password LOADTEST_PASSWORD, so --reset can remove exactly what was
+# seeded and benchmarks/load_test.py can log in over HTTP.
+#
+# Usage (from backend/):
+#   python benchmarks/seed_campus.py --users 50000 --events 20000 --registrations 2000000
+#   python benchmarks/seed_campus.py --reset
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+
+EMAIL_DOMAIN = 'loadtest.campussphere.test'
+DEPARTMENT_CODE_PREFIX = 'LT'
+LOADTEST_PASSWORD = 'loadtest-password'
+CHUNK_SIZE = 5000
+
+SKILLS = [
+    'python', 'java', 'c++', 'javascript', 'react', 'node.js', 'sql', 'machine learning',
+    'data analysis', 'statistics', 'deep learning', 'computer vision', 'nlp', 'cloud',
+    'docker', 'kubernetes', 'networking', 'security', 'embedded systems', 'iot', 'robotics',
+    'cad', 'matlab', 'circuit design', 'signal processing', 'thermodynamics', 'fluid mechanics',
+    'structural analysis', 'biotech', 'chemistry', 'ui design', 'ux research', 'product management',
+    'marketing', 'finance', 'public speaking', 'writing', 'photography', 'video editing',
+    'music production', 'game development', 'blockchain', 'android', 'ios', 'flutter',
+    'rust', 'go', 'linux', 'devops', 'quantum computing',
+]
+EVENT_CATEGORIES = ['technical', 'cultural', 'sports', 'workshop', 'seminar', 'hackathon', 'social']
+PROJECT_CATEGORIES = ['technical', 'research', 'startup', 'social', 'creative']
+DEPARTMENT_NAMES = [
+    'Computer Science', 'Electrical Engineering', 'Mechanical Engineering', 'Civil Engineering',
+    'Chemical Engineering', 'Physics', 'Mathematics', 'Chemistry', 'Biology', 'Economics',
+    'Business', 'Design', 'History', 'Literature', 'Psychology', 'Architecture',
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed a synthetic campus for load testing")
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--faculty-share", type=float, default=0.08, help="fraction of users who are faculty")
+    parser.add_argument("--admins", type=int, default=5)
+    parser.add_argument("--departments", type=int, default=12)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--registrations", type=int, default=2000000)
+    parser.add_argument("--posts", type=int, default=10000, help="collaboration posts")
+    parser.add_argument("--interests", type=int, default=100000)
+    parser.add_argument("--mentorships", type=int, default=15000)
+    parser.add_argument("--announcements", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reset", action="store_true", help="delete previously seeded data and exit")
+    return parser.parse_args()
+
+
+def chunked(rows, size=CHUNK_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def insert_many(conn, sql, rows, label):
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    for chunk in chunked(rows):
+        cursor.executemany(sql, chunk)
+        conn.commit()
+    cursor.close()
+    print(f"  {label:24s} {len(rows):>9d} rows in {time.perf_counter() - started:6.1f} s")
+
+
+def reset(conn):
+    """Remove everything a previous run seeded"""
+    cursor = conn.cursor()
+    pattern = f"%@{EMAIL_DOMAIN}"
+    seeded = "(SELECT id FROM users WHERE email LIKE %s)"
+    for sql in (
+        f"DELETE FROM event_registrations WHERE user_id IN {seeded}",
+        f"DELETE FROM event_registrations WHERE event_id IN "
+        f"(SELECT id FROM events WHERE organizer_id IN {seeded})",
+        f"DELETE FROM collaboration_interests WHERE user_id IN {seeded}",
+        f"DELETE FROM collaboration_interests WHERE post_id IN "
+        f"(SELECT id FROM collaboration_posts WHERE author_id IN {seeded})",
+        f"DELETE FROM collaboration_posts WHERE author_id IN {seeded}",
+        f"DELETE FROM mentorship_relationships WHERE mentor_id IN {seeded} OR mentee_id IN {seeded}",
+        f"DELETE FROM announcements WHERE created_by IN {seeded}",
+        f"DELETE FROM events WHERE organizer_id IN {seeded}",
+        f"DELETE FROM faculty_profiles WHERE user_id IN {seeded}",
+    ):
+        params = (pattern,) * sql.count('%s')
+        cursor.execute(sql, params)
+        conn.commit()
+    cursor.execute("DELETE FROM users WHERE email LIKE %s", (pattern,))
+    cursor.execute("DELETE FROM departments WHERE code LIKE %s", (f"{DEPARTMENT_CODE_PREFIX}%",))
+    conn.commit()
+    cursor.close()
+
+
+def seed(conn, args):
+    rng = random.Random(args.seed)
+    now = datetime.now().replace(microsecond=0)
+    cursor = conn.cursor()
+
+    def past(days):
+        return now - timedelta(seconds=rng.randint(0, days * 86400))
+
+    def skills(low, high):
+        return json.dumps(rng.sample(SKILLS, rng.randint(low, high)))
+
+    # Departments
+    insert_many(conn, "INSERT INTO departments (name, code) VALUES (%s, %s)", [
+        (f"{DEPARTMENT_NAMES[i % len(DEPARTMENT_NAMES)]} (LT{i})", f"{DEPARTMENT_CODE_PREFIX}{i:03d}")
+        for i in range(args.departments)
+    ], "departments")
+    cursor.execute("SELECT id FROM departments WHERE code LIKE %s ORDER BY code", (f"{DEPARTMENT_CODE_PREFIX}%",))
+    department_ids = [row[0] for row in cursor.fetchall()]
+
+    # Users: one shared hash so logins are realistic without hashing 50k times
+    rounds = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))
+    password_hash = bcrypt.hashpw(LOADTEST_PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+    n_faculty = int(args.users * args.faculty_share)
+    users = []
+    for i in range(args.users):
+        if i < args.admins:
+            role = 'admin'
+        elif i < args.admins + n_faculty:
+            role = 'faculty'
+        else:
+            role = 'student'
+        status = 'pending' if role != 'admin' and rng.random() < 0.03 else 'active'
+        users.append((f"Load Test {role.title()} {i}", f"{role}-{i}@{EMAIL_DOMAIN}", password_hash,
+                      role, status, rng.choice(department_ids), skills(0, 6), past(730)))
+    insert_many(conn, """
+        INSERT INTO users (full_name, email, password_hash, role, status, department_id, skills, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, users, "users")
+
+    cursor.execute("SELECT id, role, status FROM users WHERE email LIKE %s ORDER BY id", (f"%@{EMAIL_DOMAIN}",))
+    by_role = {'student': [], 'faculty': [], 'admin': []}
+    active = set()
+    for user_id, role, status in cursor.fetchall():
+        by_role[role].append(user_id)
+        if status == 'active':
+            active.add(user_id)
+    students, faculty, admins = by_role['student'], by_role['faculty'], by_role['admin']
+
+    insert_many(conn, """
+        INSERT INTO faculty_profiles (user_id, designation, areas_of_expertise, mentorship_capacity,
+                                      is_accepting_requests)
+        VALUES (%s, %s, %s, %s, %s)
+    """, [(user_id, rng.choice(['Assistant Professor', 'Associate Professor', 'Professor', 'Lecturer']),
+           skills(2, 8), rng.randint(0, 15), rng.random() < 0.8) for user_id in faculty], "faculty_profiles")
+
+    # Events: mostly approved, organised by faculty and some students
+    events = []
+    for _ in range(args.events):
+        created = past(365)
+        start = created + timedelta(days=rng.randint(1, 200), hours=rng.randint(8, 20))
+        status = rng.choices(['approved', 'pending_approval', 'rejected'], [85, 10, 5])[0]
+        organizer = rng.choice(faculty) if rng.random() < 0.7 or not students else rng.choice(students)
+        reviewer = rng.choice(faculty) if status != 'pending_approval' and faculty else None
+        capacity = rng.choice([None, None, 50, 100, 200, 500])
+        events.append((f"Load Test Event {len(events)}", "Synthetic event for load testing. " * 4,
+                       start, start + timedelta(hours=rng.randint(1, 8)), rng.choice(EVENT_CATEGORIES),
+                       organizer, status, capacity, reviewer, created))
+    insert_many(conn, """
+        INSERT INTO events (title, description, start_datetime, end_datetime, category, organizer_id,
+                            status, max_participants, reviewed_by, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, events, "events")
+    cursor.execute("""
+        SELECT e.id, e.max_participants, e.created_at, e.start_datetime
+        FROM events e JOIN users u ON e.organizer_id = u.id
+        WHERE u.email LIKE %s AND e.status = 'approved'
+        ORDER BY e.id
+    """, (f"%@{EMAIL_DOMAIN}",))
+    approved = cursor.fetchall()
+
+    # Registrations: Zipf-like popularity, no duplicate (event, user) pairs
+    registrations = []
+    if approved and students:
+        weights = [1.0 / (rank + 1) ** 0.8 for rank in range(len(approved))]
+        rng.shuffle(weights)
+        total = sum(weights)
+        for (event_id, capacity, created, start), weight in zip(approved, weights):
+            n = int(args.registrations * weight / total)
+            n = min(n, capacity or n, len(students))
+            span = max(1, int((min(start, now) - created).total_seconds()))
+            for user_id in rng.sample(students, n):
+                registrations.append((user_id, event_id, 'registered',
+                                      created + timedelta(seconds=rng.randint(0, span))))
+    insert_many(conn, """
+        INSERT INTO event_registrations (user_id, event_id, status, registered_at)
+        VALUES (%s, %s, %s, %s)
+    """, registrations, "event_registrations")
+
+    # Collaboration posts and interests
+    posts = []
+    for i in range(args.posts):
+        created = past(180)
+        posts.append((rng.choice(students), f"Load Test Project {i}", "Looking for teammates. " * 6,
+                      skills(1, 5), rng.randint(2, 6), rng.choice(PROJECT_CATEGORIES),
+                      'active' if rng.random() < 0.85 else 'closed', created, created))
+    insert_many(conn, """
+        INSERT INTO collaboration_posts (author_id, title, description, skills_required, team_size_needed,
+                                         project_category, status, created_at, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, posts, "collaboration_posts")
+    cursor.execute("""
+        SELECT cp.id FROM collaboration_posts cp JOIN users u ON cp.author_id = u.id
+        WHERE u.email LIKE %s ORDER BY cp.id
+    """, (f"%@{EMAIL_DOMAIN}",))
+    post_ids = [row[0] for row in cursor.fetchall()]
+
+    interests = set()
+    target = min(args.interests, len(post_ids) * len(students))
+    while post_ids and len(interests) < target:
+        interests.add((rng.choice(post_ids), rng.choice(students)))
+    insert_many(conn, """
+        INSERT INTO collaboration_interests (post_id, user_id, message) VALUES (%s, %s, 'interested')
+    """, sorted(interests), "collaboration_interests")
+
+    # Mentorships: each mentee at most once, within mentor capacity
+    cursor.execute("""
+        SELECT fp.user_id, fp.mentorship_capacity FROM faculty_profiles fp
+        JOIN users u ON u.id = fp.user_id WHERE u.email LIKE %s
+    """, (f"%@{EMAIL_DOMAIN}",))
+    slots = [mentor_id for mentor_id, capacity in cursor.fetchall() for _ in range(capacity or 0)]
+    rng.shuffle(slots)
+    mentees = rng.sample([s for s in students if s in active], min(args.mentorships, len(slots)))
+    insert_many(conn, """
+        INSERT INTO mentorship_relationships (mentor_id, mentee_id, status, created_at)
+        VALUES (%s, %s, 'active', %s)
+    """, [(mentor_id, mentee_id, past(365)) for mentor_id, mentee_id in zip(slots, mentees)],
+        "mentorship_relationships")
+    cursor.execute("""
+        UPDATE faculty_profiles SET current_mentees = (
+            SELECT COUNT(*) FROM mentorship_relationships mr
+            WHERE mr.mentor_id = faculty_profiles.user_id AND mr.status = 'active'
+        )
+        WHERE user_id IN (SELECT id FROM users WHERE email LIKE %s)
+    """, (f"%@{EMAIL_DOMAIN}",))
+    conn.commit()
+
+    insert_many(conn, """
+        INSERT INTO announcements (title, message, target_audience, priority, is_banner, created_by,
+                                   expires_at, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, [(f"Load Test Announcement {i}", "Synthetic announcement body. " * 5,
+           rng.choice(['all', 'students', 'faculty']), rng.choice(['normal', 'normal', 'important']),
+           rng.random() < 0.05, rng.choice(admins) if admins else rng.choice(faculty),
+           None if rng.random() < 0.7 else now + timedelta(days=rng.randint(-30, 60)), past(365))
+          for i in range(args.announcements)], "announcements")
+    cursor.close()
+
+
+def main():
+    args = parse_args()
+
+    from app import get_db_connection, reconcile_counters, refresh_rollups
+
+    conn = get_db_connection()
+    if not conn:
+        sys.exit("Database connection failed")
+    try:
+        print("removing previously seeded data")
+        reset(conn)
+        if args.reset:
+            return
+
+        started = time.perf_counter()
+        print(f"seeding campus (seed={args.seed})")
+        seed(conn, args)
+
+        print("reconciling counters and rebuilding analytics rollups")
+        reconcile_counters(conn)
+        refresh_rollups(conn, full=True)
+        cursor = conn.cursor()
+        if conn.dialect == 'sqlite':
+            cursor.execute("ANALYZE")
+        else:
+            cursor.execute("ANALYZE TABLE users, events, event_registrations, collaboration_posts, "
+                           "collaboration_interests, mentorship_relationships, announcements")
+            cursor.fetchall()
+        cursor.close()
+        print(f"done in {time.perf_counter() - started:.1f} s")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# ===================================================================
+# CAMPUSSPHERE - LIVE UPDATE HUB BENCHMARK
+# ===================================================================
+# Measures what event_stream.BroadcastHub costs with thousands of open
+# streams:
+#
+#   - memory per idle subscriber (hub bookkeeping only, via tracemalloc)
+#   - RSS per idle stream including the thread that serves it, as under
+#     a threaded WSGI server
+#   - publish cost and time until every recipient has an event, for
+#     broadcast, role and single-user events while every stream waits
+#
+# Usage (from backend/):
+#   python benchmarks/stream_hub_bench.py --subscribers 5000 --events 200
+
+import argparse
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from event_stream import BroadcastHub
+
+ROLES = ('student', 'student', 'student', 'faculty', 'admin')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Broadcast hub fan-out and idle-stream cost")
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=200, help="events published per audience")
+    parser.add_argument("--stack-kb", type=int, default=256, help="thread stack size for stream threads")
+    return parser.parse_args()
+
+
+def rss_kb():
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def hub_memory(n):
+    hub = BroadcastHub(max_subscribers=0)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    subscriptions = [hub.subscribe(i, ROLES[i % len(ROLES)]) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del subscriptions
+    return (after - before) / n
+
+
+def fan_out(args):
+    hub = BroadcastHub(max_queue=args.events * 3 + 10, max_subscribers=0)
+    received = [0] * args.subscribers
+    latencies = {}
+    stop = False
+
+    def stream(index):
+        subscription = hub.subscribe(index, ROLES[index % len(ROLES)])
+        try:
+            while not stop:
+                frames = subscription.get(1.0)
+                if frames is None:
+                    break
+                received[index] += len(frames)
+        finally:
+            hub.unsubscribe(subscription)
+
+    threading.stack_size(args.stack_kb * 1024)
+    base_rss = rss_kb()
+    threads = [threading.Thread(target=stream, args=(i,), daemon=True) for i in range(args.subscribers)]
+    for thread in threads:
+        thread.start()
+    while hub.stats()["subscribers"] < args.subscribers:
+        time.sleep(0.01)
+    idle_rss = rss_kb()
+
+    audiences = (
+        ("broadcast", {}, args.subscribers),
+        ("role=faculty", {"roles": ("faculty",)}, sum(1 for i in range(args.subscribers) if ROLES[i % len(ROLES)] == 'faculty')),
+        ("one user", {"user_ids": (0,)}, 1),
+    )
+    for label, audience, recipients in audiences:
+        expected = sum(received) + recipients * args.events
+        started = time.perf_counter()
+        publish_time = 0.0
+        for i in range(args.events):
+            t = time.perf_counter()
+            hub.publish('bench', {"n": i}, **audience)
+            publish_time += time.perf_counter() - t
+        while sum(received) < expected:
+            time.sleep(0.001)
+        latencies[label] = (publish_time / args.events, (time.perf_counter() - started) / args.events, recipients)
+
+    stop = True
+    hub.close()
+    for thread in threads:
+        thread.join()
+    return base_rss, idle_rss, latencies
+
+
+def main():
+    args = parse_args()
+    per_subscriber = hub_memory(args.subscribers)
+    print(f"hub bookkeeping per idle subscriber: {per_subscriber:.0f} bytes")
+
+    base_rss, idle_rss, latencies = fan_out(args)
+    if base_rss and idle_rss:
+        print(f"RSS with {args.subscribers} idle streams (one thread each): "
+              f"+{(idle_rss - base_rss) / 1024:.1f} MiB, {(idle_rss - base_rss) / args.subscribers:.1f} KiB per stream")
+    print(f"{'audience':14s} {'recipients':>10s} {'publish us':>11s} {'ms per event':>13s}")
+    for label, (publish, delivered, recipients) in latencies.items():
+        print(f"{label:14s} {recipients:10d} {publish * 1e6:11.1f} {delivered * 1000:13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,343 @@
+# ===================================================================
+# CAMPUSSPHERE - DATABASE CONNECTION POOL
+# ===================================================================
+# A small thread-safe MySQL connection pool used behind
+# get_db_connection() in app.py. Handlers keep calling conn.close()
+# exactly as before; the pooled wrapper returns the connection to the
+# pool instead of tearing down the TCP session.
+#
+# An optional observer (metrics.RequestMetrics) is told how long each
+# checkout waited and gets to wrap every cursor the connection hands out.
+#
+# A connection that is never closed (e.g. a handler returning before its
+# try/finally) is closed when the proxy is garbage collected, so its slot
+# is freed instead of being lost for the life of the process.
+
+import threading
+import time
+import os
+import weakref
+
+import mysql.connector
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out within the timeout"""
+
+
+class PooledConnection:
+    """
+    Thin proxy around a mysql.connector connection.
+    Everything is forwarded to the real connection except close(),
+    which hands the connection back to its pool.
+    """
+
+    dialect = 'mysql'
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+        self._conn = entry["conn"]
+        self._closed = False
+        # Must not reference self, or the proxy would never be collected
+        self._finalizer = weakref.finalize(self, pool._reclaim, entry)
+        self._finalizer.atexit = False
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the proxy itself
+        return getattr(self._conn, name)
+
+    @property
+    def raw(self):
+        """The underlying mysql.connector connection"""
+        return self._conn
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._conn.cursor(*args, **kwargs)
+        observer = self._pool.observer
+        return observer.wrap_cursor(cursor) if observer is not None else cursor
+
+    def close(self):
+        """Return the connection to the pool (safe to call twice)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._finalizer.detach()
+        self._pool._release(self)
+
+    def discard(self):
+        """
+        Close the connection instead of returning it (safe to call twice)
+        For a connection abandoned mid-result: close() would roll back,
+        which makes the connector read every remaining row first
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._finalizer.detach()
+        self._pool._discard_checked_out(self)
+
+
+class ConnectionPool:
+    """
+    Bounded pool of MySQL connections.
+
+    Args:
+        connect_args: kwargs passed to mysql.connector.connect()
+        min_size: connections opened eagerly and kept warm
+        max_size: hard upper bound on open connections
+        timeout: seconds a caller waits for a free connection
+        max_uses: recycle a connection after this many checkouts (0 = never)
+        max_idle: recycle a connection idle for this many seconds (0 = never)
+        validate_after: ping connections idle longer than this before reuse
+        observer: optional object with observe_acquire(seconds) and
+            wrap_cursor(cursor), e.g. metrics.RequestMetrics
+    """
+
+    def __init__(self, connect_args, min_size=2, max_size=10, timeout=5.0,
+                 max_uses=1000, max_idle=300, validate_after=1.0, observer=None):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size bounds")
+
+        self.connect_args = dict(connect_args)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_uses = max_uses
+        self.max_idle = max_idle
+        self.validate_after = validate_after
+        self.observer = observer
+
+        self._lock = threading.Condition(threading.Lock())
+        self._idle = []          # LIFO stack of idle raw connections + metadata
+        self._open = 0           # total connections currently open
+        self._in_use = 0
+        self._waiters = 0
+
+        # Counters for stats()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._validation_failures = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+        for _ in range(min_size):
+            try:
+                self._idle.append(self._new_entry())
+            except mysql.connector.Error as err:
+                print(f"Database pool warm-up error: {err}")
+                break
+
+    # ---------------------------------------------------------------
+    # Internal helpers
+    # ---------------------------------------------------------------
+    def _new_entry(self):
+        """Open a brand new connection and count it against max_size"""
+        raw = mysql.connector.connect(**self.connect_args)
+        with self._lock:
+            self._open += 1
+        now = time.monotonic()
+        return {"conn": raw, "created_at": now, "last_used_at": now, "uses": 0}
+
+    def _discard(self, raw):
+        """Close a raw connection and free its slot"""
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._open -= 1
+            self._lock.notify()
+
+    def _is_stale(self, entry, now):
+        if self.max_uses and entry["uses"] >= self.max_uses:
+            return True
+        if self.max_idle and now - entry["last_used_at"] > self.max_idle:
+            return True
+        return False
+
+    def _is_alive(self, entry, now):
+        # Skip the round-trip for connections that were just used
+        if now - entry["last_used_at"] < self.validate_after:
+            return True
+        try:
+            entry["conn"].ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    # ---------------------------------------------------------------
+    # Public API
+    # ---------------------------------------------------------------
+    def get_connection(self):
+        """
+        Check out a connection, waiting up to `timeout` seconds.
+        Raises PoolTimeoutError or mysql.connector.Error on failure.
+        """
+        started = time.monotonic()
+        deadline = started + self.timeout
+
+        while True:
+            entry = None
+            create = False
+
+            with self._lock:
+                while not self._idle and self._open >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"Timed out after {self.timeout}s waiting for a database connection"
+                        )
+                    self._waiters += 1
+                    try:
+                        self._lock.wait(remaining)
+                    finally:
+                        self._waiters -= 1
+
+                if self._idle:
+                    entry = self._idle.pop()
+                else:
+                    # Reserve a slot before connecting outside the lock
+                    self._open += 1
+                    create = True
+
+            if create:
+                try:
+                    raw = mysql.connector.connect(**self.connect_args)
+                except Exception:
+                    with self._lock:
+                        self._open -= 1
+                        self._lock.notify()
+                    raise
+                now = time.monotonic()
+                entry = {"conn": raw, "created_at": now, "last_used_at": now, "uses": 0}
+            else:
+                now = time.monotonic()
+                # The loop then opens a replacement if nothing else is idle
+                if self._is_stale(entry, now):
+                    with self._lock:
+                        self._recycled += 1
+                    self._discard(entry["conn"])
+                    continue
+                if not self._is_alive(entry, now):
+                    with self._lock:
+                        self._validation_failures += 1
+                    self._discard(entry["conn"])
+                    continue
+
+            waited = time.monotonic() - started
+            with self._lock:
+                self._in_use += 1
+                self._checkouts += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+            if self.observer is not None:
+                self.observer.observe_acquire(waited)
+
+            entry["uses"] += 1
+            return PooledConnection(self, entry)
+
+    def _release(self, pooled):
+        """Called by PooledConnection.close()"""
+        entry = pooled._entry
+        raw = entry["conn"]
+        entry["last_used_at"] = time.monotonic()
+
+        # Never hand out a connection with an open transaction
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+            self._discard(raw)
+            return
+
+        with self._lock:
+            self._in_use -= 1
+
+        if self._is_stale(entry, entry["last_used_at"]):
+            with self._lock:
+                self._recycled += 1
+            self._discard(raw)
+            self._refill()
+            return
+
+        with self._lock:
+            self._idle.append(entry)
+            self._lock.notify()
+
+    def _discard_checked_out(self, pooled):
+        """Called by PooledConnection.discard()"""
+        with self._lock:
+            self._in_use -= 1
+        self._discard(pooled._entry["conn"])
+
+    def _reclaim(self, entry):
+        """Called when a PooledConnection is garbage collected without close()"""
+        # Its state (open transaction, unread rows) is unknown: close it
+        print("Database connection was never closed; discarding it")
+        with self._lock:
+            self._in_use -= 1
+        self._discard(entry["conn"])
+
+    def _refill(self):
+        """Open connections back up to min_size after recycling one"""
+        while True:
+            with self._lock:
+                if self._open >= self.min_size:
+                    return
+                self._open += 1
+            try:
+                raw = mysql.connector.connect(**self.connect_args)
+            except Exception as err:
+                with self._lock:
+                    self._open -= 1
+                    self._lock.notify()
+                print(f"Database pool refill error: {err}")
+                return
+            now = time.monotonic()
+            with self._lock:
+                self._idle.append({"conn": raw, "created_at": now, "last_used_at": now, "uses": 0})
+                self._lock.notify()
+
+    def stats(self):
+        """Snapshot of pool counters for monitoring"""
+        with self._lock:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiters": self._waiters,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "validation_failures": self._validation_failures,
+                "avg_wait_ms": round(self._total_wait / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+            }
+
+    def close_all(self):
+        """Close every idle connection (in-use ones close on release)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            self._discard(entry["conn"])
+
+
+def pool_from_env(connect_args, observer=None):
+    """Build a ConnectionPool using DB_POOL_* environment variables"""
+    return ConnectionPool(
+        connect_args,
+        min_size=int(os.getenv("DB_POOL_MIN", "2")),
+        max_size=int(os.getenv("DB_POOL_MAX", "10")),
+        timeout=float(os.getenv("DB_POOL_TIMEOUT", "5")),
+        max_uses=int(os.getenv("DB_POOL_MAX_USES", "1000")),
+        max_idle=float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+        validate_after=float(os.getenv("DB_POOL_VALIDATE_AFTER", "1")),
+        observer=observer,
+    )
@@ -0,0 +1,175 @@
+# ===================================================================
+# CAMPUSSPHERE - READ REPLICA ROUTING
+# ===================================================================
+# MySQL read replicas listed in DB_REPLICA_HOSTS each get their own
+# db_pool.ConnectionPool. storage.MySQLStorage hands out a replica
+# connection for read-only work and a primary connection for everything
+# else; app.py decides which a request gets (see @read_replica there).
+#
+# Replication lag is checked on a background thread (start(), called
+# from app.start_worker) that runs SHOW REPLICA STATUS on every replica
+# each `check_interval` seconds; checkouts only read the last known
+# state, so a slow or unreachable replica never delays a request. A
+# replica whose Seconds_Behind_Source exceeds `max_lag` (or is NULL, or
+# whose check fails) is taken out of rotation until a later check
+# passes. Replicas start out of rotation, so until the first check
+# completes (or when the thread was never started) and whenever no
+# replica is in rotation, reads go to the primary.
+#
+# The database user needs the REPLICATION CLIENT privilege on replicas
+# for the lag check; without it every replica stays out of rotation.
+
+import itertools
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import errorcode
+
+
+class Replica:
+    """One replica endpoint, its pool and its last health check"""
+
+    def __init__(self, name, pool):
+        self.name = name
+        self.pool = pool
+        self.lag = None            # seconds behind the primary at the last check
+        self.in_rotation = False
+        self.last_error = None
+        self.checked_at = None
+        self.status_statement = "SHOW REPLICA STATUS"
+
+    def as_dict(self):
+        return dict(
+            self.pool.stats(),
+            lag_s=self.lag,
+            in_rotation=self.in_rotation,
+            last_error=self.last_error,
+            last_check_age_s=round(time.monotonic() - self.checked_at, 1) if self.checked_at else None,
+        )
+
+
+class ReplicaSet:
+    """
+    Round-robin over replica pools, skipping replicas that lag.
+
+    Args:
+        pools: list of (name, ConnectionPool) pairs
+        max_lag: take a replica out of rotation above this many seconds of lag
+        check_interval: seconds between lag checks
+    """
+
+    def __init__(self, pools, max_lag=5.0, check_interval=5.0):
+        self.replicas = [Replica(name, pool) for name, pool in pools]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._next = itertools.count()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._routed = 0
+        self._fallbacks = 0
+
+    # ---------------------------------------------------------------
+    # Lag checks
+    # ---------------------------------------------------------------
+    def _replication_lag(self, replica):
+        """Seconds behind the primary, or None if replication is not running"""
+        conn = replica.pool.get_connection()
+        try:
+            # Raw cursor: health checks are not request queries
+            cursor = conn.raw.cursor(dictionary=True)
+            try:
+                try:
+                    cursor.execute(replica.status_statement)
+                except mysql.connector.ProgrammingError as err:
+                    if err.errno != errorcode.ER_PARSE_ERROR or replica.status_statement == "SHOW SLAVE STATUS":
+                        raise
+                    # MySQL before 8.0.22 / MariaDB
+                    replica.status_statement = "SHOW SLAVE STATUS"
+                    cursor.execute(replica.status_statement)
+                row = cursor.fetchone()
+                cursor.fetchall()
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+        if row is None:
+            raise RuntimeError("not configured as a replica")
+        lag = row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master'))
+        return None if lag is None else float(lag)
+
+    def check(self):
+        """Refresh lag and rotation state of every replica"""
+        for replica in self.replicas:
+            try:
+                lag = self._replication_lag(replica)
+                error = None if lag is not None else "replication stopped"
+            except Exception as err:
+                lag, error = None, str(err)
+            replica.lag = lag
+            replica.last_error = error
+            replica.checked_at = time.monotonic()
+            in_rotation = lag is not None and lag <= self.max_lag
+            if in_rotation != replica.in_rotation:
+                print(f"Read replica {replica.name} {'back in' if in_rotation else 'out of'} rotation "
+                      f"(lag={lag}, error={error})")
+            replica.in_rotation = in_rotation
+
+    def start(self):
+        """Start the background lag checks (threads don't survive fork, so call this in each worker)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='replica-check', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.check()
+            self._stop.wait(max(0.0, self.check_interval - (time.monotonic() - started)))
+
+    # ---------------------------------------------------------------
+    # Public API
+    # ---------------------------------------------------------------
+    def get_connection(self):
+        """
+        Check out a connection from the next replica in rotation
+        Returns None when no replica can serve the read
+        """
+        healthy = [replica for replica in self.replicas if replica.in_rotation]
+        if healthy:
+            start = next(self._next)
+            for offset in range(len(healthy)):
+                replica = healthy[(start + offset) % len(healthy)]
+                try:
+                    conn = replica.pool.get_connection()
+                except Exception as err:
+                    # Connection refused or pool exhausted: skip it until the next check
+                    replica.in_rotation = False
+                    replica.last_error = str(err)
+                    print(f"Read replica {replica.name} out of rotation ({err})")
+                    continue
+                with self._stats_lock:
+                    self._routed += 1
+                return conn
+        with self._stats_lock:
+            self._fallbacks += 1
+        return None
+
+    def stats(self):
+        return {
+            "max_lag_s": self.max_lag,
+            "routed_reads": self._routed,
+            "primary_fallbacks": self._fallbacks,
+            "replicas": {replica.name: replica.as_dict() for replica in self.replicas},
+        }
+
+    def close_all(self):
+        self.stop()
+        for replica in self.replicas:
+            replica.pool.close_all()
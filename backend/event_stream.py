@@ -0,0 +1,302 @@
+# ===================================================================
+# CAMPUSSPHERE - LIVE UPDATE BROADCAST HUB
+# ===================================================================
+# In-process fan-out behind GET /api/stream (Server-Sent Events).
+# Handlers publish small events after their transaction commits; every
+# open stream whose user matches the event's audience gets a copy.
+#
+# Costs are kept per event rather than per connection:
+#
+#   - an event is encoded into its SSE frame once, at publish time,
+#     and the same bytes are queued for every recipient
+#   - subscribers are indexed by role and by user id, so publishing to
+#     "faculty" or to one organizer never walks the other streams
+#   - an idle subscriber is a short deque and an Event; nothing runs
+#     for it until something is published or its heartbeat is due
+#
+# Each delivery to a thread-per-stream server still wakes one thread,
+# which dominates at thousands of streams (benchmarks/stream_hub_bench.py),
+# so frequent updates go through publish_coalesced(): within
+# `coalesce_window` seconds only the latest value per key is kept and
+# they all go out as one event.
+#
+# A subscriber that falls more than `max_queue` events behind loses the
+# oldest ones and is sent a `resync` event telling the client to
+# refetch. The last `history` events are kept so a client reconnecting
+# with Last-Event-ID gets what it missed (or `resync` if that is too old).
+#
+# The hub lives in one process. With several worker processes a
+# stream_relay.StreamRelay is attached: publish() then hands events to
+# the relay, which shares them through the database, and every worker's
+# relay calls deliver() with the shared event id.
+
+import asyncio
+import json
+import threading
+from collections import deque
+
+
+def format_event(event_id, event_type, payload):
+    """One SSE frame; `payload` is already-encoded JSON bytes"""
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event_type.encode('ascii'), payload)
+
+
+def parse_last_event_id(value):
+    """Last-Event-ID header value as an int, or None"""
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+class Subscription:
+    """
+    One open stream: a bounded queue of encoded frames.
+    Threaded servers wait in get(); an asyncio server calls attach_loop()
+    once and waits in get_async() instead, so an idle stream holds no thread.
+    """
+
+    __slots__ = ('user_id', 'role', '_frames', '_wakeup', '_lock', '_loop', '_async_wakeup',
+                 'overflowed', 'closed')
+
+    def __init__(self, user_id, role, max_queue):
+        self.user_id = user_id
+        self.role = role
+        self._frames = deque(maxlen=max_queue)
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._async_wakeup = None
+        self.overflowed = False
+        self.closed = False
+
+    def attach_loop(self, loop):
+        self._loop = loop
+        self._async_wakeup = asyncio.Event()
+
+    def _wake(self):
+        if self._loop is None:
+            self._wakeup.set()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._async_wakeup.set)
+        except RuntimeError:
+            pass  # loop already closed
+
+    def _push(self, frame):
+        with self._lock:
+            if len(self._frames) == self._frames.maxlen:
+                self.overflowed = True
+            self._frames.append(frame)
+        self._wake()
+
+    def close(self):
+        """End this stream; the waiting get()/get_async() returns None"""
+        self.closed = True
+        self._wake()
+
+    def get(self, timeout):
+        """
+        Wait up to `timeout` seconds and return the queued frames
+        Returns [] on timeout and None once the hub has closed the stream
+        """
+        if not self._frames and not self.closed:
+            self._wakeup.wait(timeout)
+        self._wakeup.clear()
+        return self._drain()
+
+    async def get_async(self, timeout):
+        """get() for streams served from an asyncio event loop"""
+        if not self._frames and not self.closed:
+            try:
+                await asyncio.wait_for(self._async_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._async_wakeup.clear()
+        return self._drain()
+
+    def _drain(self):
+        with self._lock:
+            frames = list(self._frames)
+            self._frames.clear()
+            overflowed, self.overflowed = self.overflowed, False
+        if self.closed and not frames:
+            return None
+        if overflowed:
+            frames.insert(0, b"event: resync\ndata: {}\n\n")
+        return frames
+
+
+class BroadcastHub:
+    """
+    Role- and user-filtered publish/subscribe for live updates.
+
+    Args:
+        max_queue: frames buffered per subscriber before the oldest are dropped
+        history: recent events kept for Last-Event-ID replay
+        max_subscribers: subscribe() refuses new streams beyond this (0 = no limit)
+        coalesce_window: seconds publish_coalesced() gathers values before sending
+        encode: callable turning an event's data into JSON bytes
+    """
+
+    def __init__(self, max_queue=100, history=256, max_subscribers=0, coalesce_window=1.0, encode=None):
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self.coalesce_window = coalesce_window
+        self._encode = encode or (lambda data: json.dumps(data, default=str).encode('utf-8'))
+        self._lock = threading.Lock()
+        self._by_role = {}
+        self._by_user = {}
+        self._count = 0
+        self._last_id = 0
+        self._history = deque(maxlen=history)   # (id, frame, roles, user_ids)
+        self._published = 0
+        self._delivered = 0
+        self._pending = {}      # (event_type, roles, user_ids) -> {key: data}
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        self._relay = None
+
+    @property
+    def has_subscribers(self):
+        """False only if nobody can receive an event (with a relay, other processes might)"""
+        return self._relay is not None or self._count > 0
+
+    def attach_relay(self, relay, last_event_id):
+        """Route publish() through `relay`; ids continue from `last_event_id`"""
+        with self._lock:
+            self._relay = relay
+            self._last_id = last_event_id
+
+    def detach_relay(self, relay):
+        with self._lock:
+            if self._relay is relay:
+                self._relay = None
+
+    def subscribe(self, user_id, role, last_event_id=None):
+        """
+        Register a stream; returns None when max_subscribers is reached
+        or the hub has been closed
+        With `last_event_id`, events published since then are queued first
+        """
+        subscription = Subscription(user_id, role, self.max_queue)
+        with self._lock:
+            if self._closed or (self.max_subscribers and self._count >= self.max_subscribers):
+                return None
+            self._by_role.setdefault(role, set()).add(subscription)
+            self._by_user.setdefault(user_id, set()).add(subscription)
+            self._count += 1
+            if last_event_id is not None and last_event_id > self._last_id:
+                # Ids restarted (new process): the client cannot know what it missed
+                subscription.overflowed = True
+            elif last_event_id is not None and last_event_id < self._last_id:
+                oldest = self._history[0][0] if self._history else self._last_id + 1
+                if last_event_id < oldest - 1:
+                    subscription.overflowed = True
+                for event_id, frame, roles, user_ids in self._history:
+                    if event_id > last_event_id and self._matches(subscription, roles, user_ids):
+                        subscription._push(frame)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            members = self._by_role.get(subscription.role)
+            if members is None or subscription not in members:
+                return
+            for index, key in ((self._by_role, subscription.role), (self._by_user, subscription.user_id)):
+                members = index[key]
+                members.discard(subscription)
+                if not members:
+                    del index[key]
+            self._count -= 1
+
+    @staticmethod
+    def _matches(subscription, roles, user_ids):
+        if roles is None and user_ids is None:
+            return True
+        return (roles is not None and subscription.role in roles) or \
+            (user_ids is not None and subscription.user_id in user_ids)
+
+    def publish(self, event_type, data, roles=None, user_ids=None):
+        """
+        Send an event to subscribers with one of `roles` or one of `user_ids`
+        (everyone when both are None). Returns the event id, or None when
+        a relay assigns it.
+        """
+        roles = frozenset(roles) if roles is not None else None
+        user_ids = frozenset(user_ids) if user_ids is not None else None
+        payload = self._encode(data)
+        relay = self._relay
+        if relay is not None:
+            # Delivered here too once the relay reads it back, with the shared id
+            relay.send(event_type, payload, roles, user_ids)
+            return None
+        return self.deliver(None, event_type, payload, roles, user_ids)
+
+    def deliver(self, event_id, event_type, payload, roles, user_ids):
+        """
+        Queue an encoded event for matching subscribers
+        `event_id` None takes the next local id (no relay attached)
+        """
+        with self._lock:
+            if event_id is None:
+                event_id = self._last_id + 1
+            self._last_id = max(self._last_id, event_id)
+            frame = format_event(event_id, event_type, payload)
+            self._history.append((event_id, frame, roles, user_ids))
+            if roles is None and user_ids is None:
+                targets = set().union(*self._by_role.values())
+            else:
+                targets = set()
+                for role in roles or ():
+                    targets.update(self._by_role.get(role, ()))
+                for user_id in user_ids or ():
+                    targets.update(self._by_user.get(user_id, ()))
+            self._published += 1
+            self._delivered += len(targets)
+        for subscription in targets:
+            subscription._push(frame)
+        return event_id
+
+    def publish_coalesced(self, event_type, key, data, roles=None, user_ids=None):
+        """
+        Like publish(), but values published within `coalesce_window`
+        seconds are sent together as one `{"items": [...]}` event, keeping
+        only the latest `data` per `key`
+        """
+        audience = (event_type,
+                    frozenset(roles) if roles is not None else None,
+                    frozenset(user_ids) if user_ids is not None else None)
+        with self._pending_lock:
+            pending = self._pending.get(audience)
+            if pending is None:
+                pending = self._pending[audience] = {}
+                timer = threading.Timer(self.coalesce_window, self._flush, (audience,))
+                timer.daemon = True
+                timer.start()
+            pending[key] = data
+
+    def _flush(self, audience):
+        with self._pending_lock:
+            pending = self._pending.pop(audience, None)
+        if pending:
+            event_type, roles, user_ids = audience
+            self.publish(event_type, {"items": list(pending.values())}, roles=roles, user_ids=user_ids)
+
+    def close(self):
+        """End every open stream and refuse new ones (used on shutdown)"""
+        with self._lock:
+            self._closed = True
+            subscriptions = set().union(*self._by_role.values())
+        for subscription in subscriptions:
+            subscription.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": self._count,
+                "by_role": {role: len(members) for role, members in self._by_role.items()},
+                "published": self._published,
+                "delivered": self._delivered,
+                "last_event_id": self._last_id,
+            }
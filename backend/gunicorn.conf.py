@@ -0,0 +1,141 @@
+# ===================================================================
+# CAMPUSSPHERE - PRODUCTION SERVER (GUNICORN)
+# ===================================================================
+# Pre-forked worker processes, each serving requests on a thread pool.
+# From backend/:
+#
+#   gunicorn -c gunicorn.conf.py
+#
+# Settings (environment, or .env):
+#   WEB_BIND                 listen address (0.0.0.0:5000)
+#   WEB_WORKERS              worker processes (CPU count)
+#   WEB_THREADS              request threads per worker (8; keep <= DB_POOL_MAX)
+#   WEB_PRELOAD              import the app once in the master, before forking (true)
+#   WEB_MAX_REQUESTS         replace a worker after this many requests, bounding
+#                            memory growth (5000; 0 = never)
+#   WEB_MAX_REQUESTS_JITTER  random extra requests so workers don't recycle together (500)
+#   WEB_GRACEFUL_TIMEOUT     seconds in-flight requests get on shutdown or recycle (30)
+#   WEB_TIMEOUT              seconds before an unresponsive worker is killed and replaced (60)
+#   WEB_KEEPALIVE            seconds an idle keep-alive connection is held (5)
+#
+# With preload the app (and numpy, the JSON encoder, ...) is imported
+# once and shared copy-on-write; SIGHUP then reloads configuration but
+# not code, so deploy with a full restart. Nothing in create_app()
+# touches the database: each worker opens its own pool on first use
+# (app.py drops anything inherited across fork), so MySQL sees up to
+# WEB_WORKERS x DB_POOL_MAX connections. The bcrypt pool, replica set,
+# caches, /metrics and the /api/stream hub are per worker too; the hubs
+# share events through the database (stream_relay.py), so a stream gets
+# updates published on every worker.
+#
+# Live updates (/api/stream) are not served from here in production.
+# An open stream holds a gthread request thread for its whole life, so
+# a worker could only keep a handful open. Run the ASGI entry point next
+# to gunicorn, where an idle stream holds no thread, and route the
+# stream path to it in the reverse proxy, e.g. for nginx:
+#
+#   uvicorn asgi:application --port 5001 --workers 2 --timeout-graceful-shutdown 5
+#
+#   location /api/stream {
+#       proxy_pass http://127.0.0.1:5001;
+#       proxy_buffering off;
+#       proxy_read_timeout 1h;
+#   }
+#   location / {
+#       proxy_pass http://127.0.0.1:5000;
+#   }
+#
+# Both servers must use the same SECRET_KEY and database. Events that
+# gunicorn workers publish reach the uvicorn streams through the
+# stream_events relay (stream_relay.py).
+#
+# Defaults this file sets for the app (unless already in the environment):
+#   SSE_MAX_SUBSCRIBERS      WEB_THREADS / 2. Only a guard for streams
+#                            that reach gunicorn anyway (no proxy route,
+#                            local testing): the remaining threads keep
+#                            serving requests and further streams get
+#                            503. Must stay below WEB_THREADS.
+#   BCRYPT_WORKERS           CPU count / WEB_WORKERS, so the hashing
+#                            processes of all workers share the cores
+#
+# The master logs how long startup took and each worker's startup time
+# and memory (RSS, and PSS, which counts shared pages once); workers
+# log memory and requests served again when they exit or are recycled.
+
+import multiprocessing
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+_STARTED = time.monotonic()
+
+load_dotenv()
+
+wsgi_app = 'app:create_app()'
+bind = os.getenv("WEB_BIND", "0.0.0.0:5000")
+worker_class = 'gthread'
+workers = int(os.getenv("WEB_WORKERS", str(multiprocessing.cpu_count())))
+threads = int(os.getenv("WEB_THREADS", "8"))
+preload_app = os.getenv("WEB_PRELOAD", "true").lower() != "false"
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("WEB_MAX_REQUESTS_JITTER", "500"))
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.getenv("WEB_TIMEOUT", "60"))
+keepalive = int(os.getenv("WEB_KEEPALIVE", "5"))
+
+# Read by app.py at import, which happens after this file is loaded
+os.environ.setdefault("SSE_MAX_SUBSCRIBERS", str(max(1, threads // 2)))
+os.environ.setdefault("BCRYPT_WORKERS", str(max(1, multiprocessing.cpu_count() // workers)))
+
+if int(os.environ["SSE_MAX_SUBSCRIBERS"]) >= threads:
+    # Open streams would take every request thread and the worker would stop serving
+    raise SystemExit("SSE_MAX_SUBSCRIBERS must be below WEB_THREADS under gunicorn; "
+                     "serve /api/stream from asgi.py for more streams")
+
+if not preload_app and not os.getenv("SECRET_KEY"):
+    # Each worker would sign sessions with its own random key
+    raise SystemExit("SECRET_KEY must be set when WEB_PRELOAD=false")
+
+
+def _memory_text(pid):
+    from metrics import process_memory
+
+    memory = process_memory(pid)
+    if not memory:
+        return "memory n/a"
+    return ", ".join(f"{kind} {value / 2**20:.1f} MiB" for kind, value in sorted(memory.items(), reverse=True))
+
+
+def when_ready(server):
+    server.log.info("Master ready in %.2f s (%s, %s)", time.monotonic() - _STARTED,
+                    "app preloaded" if preload_app else "app loaded per worker", _memory_text(os.getpid()))
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.monotonic()
+
+
+def post_worker_init(worker):
+    from app import start_worker, drain_worker
+
+    start_worker()
+    worker.log.info("Worker %s ready in %.0f ms (%s)", worker.pid,
+                    (time.monotonic() - worker.forked_at) * 1000, _memory_text(worker.pid))
+
+    def drain_when_stopping():
+        # alive goes False on SIGTERM and when max_requests is reached;
+        # ending open streams lets the graceful shutdown finish early
+        while worker.alive:
+            time.sleep(0.5)
+        drain_worker()
+
+    threading.Thread(target=drain_when_stopping, name='worker-drain', daemon=True).start()
+
+
+def worker_exit(server, worker):
+    from app import stop_worker
+
+    server.log.info("Worker %s exiting after %d requests (%s)", worker.pid, worker.nr, _memory_text(worker.pid))
+    stop_worker()
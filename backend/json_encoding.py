@@ -0,0 +1,89 @@
+# ===================================================================
+# CAMPUSSPHERE - JSON RESPONSE ENCODING
+# ===================================================================
+# One serialization layer for every response. Datetimes, dates and
+# decimals coming straight out of MySQL are encoded natively, so
+# handlers no longer loop over rows calling .isoformat(). orjson is
+# used when installed, with the standard library as the fallback.
+
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
+
+
+def _default(obj):
+    """Encode the MySQL types the JSON backends don't know about"""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return int(obj) if obj == obj.to_integral_value() else float(obj)
+    if isinstance(obj, timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.decode('utf-8')
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj):
+        """Serialize `obj` to UTF-8 JSON bytes"""
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    def loads(data):
+        """Parse JSON from str or bytes"""
+        return orjson.loads(data)
+else:
+    _encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(',', ':'))
+
+    def dumps_bytes(obj):
+        """Serialize `obj` to UTF-8 JSON bytes"""
+        return _encoder.encode(obj).encode('utf-8')
+
+    def loads(data):
+        """Parse JSON from str or bytes"""
+        return json.loads(data)
+
+
+def decode_json_columns(rows, *columns):
+    """
+    Decode JSON text columns in place for a list of rows (or a single row)
+    Missing, empty or malformed values become []
+    """
+    if isinstance(rows, dict):
+        rows = [rows]
+    for row in rows:
+        for column in columns:
+            value = row.get(column)
+            if not value:
+                row[column] = []
+            elif isinstance(value, (str, bytes, bytearray)):
+                try:
+                    row[column] = loads(value)
+                except ValueError:
+                    row[column] = []
+    return rows
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by dumps_bytes() / loads()"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype='application/json')
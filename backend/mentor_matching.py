@@ -0,0 +1,426 @@
+# ===================================================================
+# CAMPUSSPHERE - BATCH MENTOR ASSIGNMENT
+# ===================================================================
+# Pairs unmentored students with faculty who are accepting requests.
+# The pairing is a min-cost max-flow: every student is one unit of
+# flow, every faculty member a sink edge with their remaining capacity,
+# and the cost of a pairing is how far it falls short of a perfect
+# department + skill match. Maximum flow means as many students as
+# capacity allows are placed; minimum cost picks the best-matched set.
+#
+# Each student keeps edges to their best `max_candidates` faculty;
+# every other faculty member is reachable at the no-affinity cost
+# through a shared hub node, so pruning never costs a placement and
+# the graph stays linear in the number of students.
+
+import heapq
+import json
+import time
+from operator import itemgetter
+
+DEPARTMENT_WEIGHT = 3
+SKILL_WEIGHT = 1
+MAX_SHARED_SKILLS = 5
+
+MATCHING_LOCK_NAME = 'campussphere_mentor_matching'
+
+
+def _skill_set(*values):
+    skills = set()
+    for raw in values:
+        if isinstance(raw, (bytes, bytearray)):
+            raw = raw.decode('utf-8')
+        if isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except ValueError:
+                raw = raw.split(',')
+        if isinstance(raw, list):
+            skills.update(str(s).strip().lower() for s in raw if str(s).strip())
+    return skills
+
+
+def affinity(student, mentor):
+    """Integer match score: same department plus (capped) shared skills"""
+    score = DEPARTMENT_WEIGHT if (student['department_id'] is not None and
+                                  student['department_id'] == mentor['department_id']) else 0
+    shared = len(student['skills'] & mentor['skills'])
+    return score + SKILL_WEIGHT * min(shared, MAX_SHARED_SKILLS)
+
+
+MAX_AFFINITY = DEPARTMENT_WEIGHT + SKILL_WEIGHT * MAX_SHARED_SKILLS
+
+
+# ===================================================================
+# SOLVER
+# ===================================================================
+def _candidates(student, by_department, by_skill, max_candidates):
+    """Best-affinity mentors for one student as {mentor_id: cost}"""
+    scores = {}
+    if student['department_id'] is not None:
+        scores = dict.fromkeys(by_department.get(student['department_id'], ()), DEPARTMENT_WEIGHT)
+    shared = {}
+    for skill in student['skills']:
+        for mentor_id in by_skill.get(skill, ()):
+            shared[mentor_id] = shared.get(mentor_id, 0) + 1
+    for mentor_id, count in shared.items():
+        scores[mentor_id] = scores.get(mentor_id, 0) + SKILL_WEIGHT * min(count, MAX_SHARED_SKILLS)
+    best = heapq.nlargest(max_candidates, scores.items(), key=itemgetter(1))
+    return {mentor_id: MAX_AFFINITY - score for mentor_id, score in best}
+
+
+class _FlowGraph:
+    """Residual graph in flat lists; edge e and e ^ 1 are a forward/reverse pair"""
+
+    def __init__(self, n_nodes):
+        self.adj = [[] for _ in range(n_nodes)]
+        self.to = []
+        self.cap = []
+        self.cost = []
+
+    def add_edge(self, u, v, cap, cost):
+        self.adj[u].append(len(self.to))
+        self.to.append(v)
+        self.cap.append(cap)
+        self.cost.append(cost)
+        self.adj[v].append(len(self.to))
+        self.to.append(u)
+        self.cap.append(0)
+        self.cost.append(-cost)
+
+    def min_cost_max_flow(self, source, sink):
+        """
+        Primal-dual: one Dijkstra per phase, then a blocking flow over the
+        zero-reduced-cost edges. Costs are small integers, so there are
+        only a handful of phases however many units are pushed.
+        """
+        adj, to, cap, cost = self.adj, self.to, self.cap, self.cost
+        n = len(adj)
+        h = [0] * n
+        flow = 0
+        while True:
+            # Dijkstra on reduced costs, stopping once the sink is settled
+            inf = float('inf')
+            dist = [inf] * n
+            dist[source] = 0
+            queue = [(0, source)]
+            sink_dist = inf
+            while queue:
+                d, u = heapq.heappop(queue)
+                if d > dist[u]:
+                    continue
+                if u == sink:
+                    sink_dist = d
+                    break
+                hu = h[u] + d
+                for e in adj[u]:
+                    if cap[e] > 0:
+                        v = to[e]
+                        nd = hu + cost[e] - h[v]
+                        if nd < dist[v]:
+                            dist[v] = nd
+                            heapq.heappush(queue, (nd, v))
+            if sink_dist == inf:
+                return flow
+            for v in range(n):
+                h[v] += dist[v] if dist[v] < sink_dist else sink_dist
+
+            flow += self._blocking_flows(source, sink, h)
+
+    def _blocking_flows(self, source, sink, h):
+        """Dinic on the admissible subgraph; every augmenting path carries one unit"""
+        adj, to, cap, cost = self.adj, self.to, self.cap, self.cost
+        n = len(adj)
+        pushed = 0
+        while True:
+            level = [-1] * n
+            level[source] = 0
+            frontier = [source]
+            while frontier and level[sink] < 0:
+                following = []
+                for u in frontier:
+                    hu = h[u]
+                    for e in adj[u]:
+                        v = to[e]
+                        if cap[e] > 0 and level[v] < 0 and cost[e] + hu == h[v]:
+                            level[v] = level[u] + 1
+                            following.append(v)
+                frontier = following
+            if level[sink] < 0:
+                return pushed
+
+            current = [0] * n
+            path = []
+            u = source
+            while True:
+                if u == sink:
+                    for e in path:
+                        cap[e] -= 1
+                        cap[e ^ 1] += 1
+                    pushed += 1
+                    path = []
+                    u = source
+                    continue
+                edges = adj[u]
+                i = current[u]
+                next_level = level[u] + 1
+                hu = h[u]
+                while i < len(edges):
+                    e = edges[i]
+                    v = to[e]
+                    if cap[e] > 0 and level[v] == next_level and cost[e] + hu == h[v]:
+                        break
+                    i += 1
+                current[u] = i
+                if i < len(edges):
+                    path.append(edges[i])
+                    u = to[edges[i]]
+                elif u == source:
+                    break
+                else:
+                    level[u] = -1  # dead end for the rest of this phase
+                    e = path.pop()
+                    u = to[e ^ 1]
+                    current[u] += 1
+
+
+def solve_assignment(students, mentors, max_candidates=10):
+    """
+    Optimal capacity-respecting assignment of students to mentors
+
+    Args:
+        students: list of {'id', 'department_id', 'skills': set}
+        mentors: list of {'id', 'department_id', 'skills': set, 'remaining': int}
+        max_candidates: direct edges kept per student
+    Returns (pairs, unassigned) where pairs is a list of
+    (student_id, mentor_id, affinity) and unassigned a list of student ids
+    """
+    mentors = [m for m in mentors if m['remaining'] > 0]
+    by_id = {m['id']: m for m in mentors}
+    by_department, by_skill = {}, {}
+    for mentor in mentors:
+        by_department.setdefault(mentor['department_id'], []).append(mentor['id'])
+        for skill in mentor['skills']:
+            by_skill.setdefault(skill, []).append(mentor['id'])
+
+    # Nodes: source, sink, hub, one per mentor, one per student
+    source, sink, hub = 0, 1, 2
+    mentor_node = {m['id']: 3 + i for i, m in enumerate(mentors)}
+    first_student = 3 + len(mentors)
+    graph = _FlowGraph(first_student + len(students))
+
+    hub_edges = {}
+    for mentor in mentors:
+        node = mentor_node[mentor['id']]
+        graph.add_edge(node, sink, mentor['remaining'], 0)
+        hub_edges[mentor['id']] = len(graph.to)
+        graph.add_edge(hub, node, len(students), 0)
+
+    student_edges = []
+    for s, student in enumerate(students):
+        node = first_student + s
+        graph.add_edge(source, node, 1, 0)
+        edges = []
+        for mentor_id, cost in _candidates(student, by_department, by_skill, max_candidates).items():
+            edges.append((len(graph.to), mentor_id))
+            graph.add_edge(node, mentor_node[mentor_id], 1, cost)
+        edges.append((len(graph.to), None))
+        graph.add_edge(node, hub, 1, MAX_AFFINITY)
+        student_edges.append(edges)
+
+    graph.min_cost_max_flow(source, sink)
+
+    # Students routed through the hub share out the hub's flow to each mentor
+    hub_slots = []
+    for mentor_id, e in hub_edges.items():
+        hub_slots.extend([mentor_id] * graph.cap[e ^ 1])
+
+    pairs, unassigned = [], []
+    for student, edges in zip(students, student_edges):
+        mentor_id = next((m for e, m in edges if graph.cap[e] == 0), False)
+        if mentor_id is False:
+            unassigned.append(student['id'])
+            continue
+        if mentor_id is None:
+            mentor_id = hub_slots.pop()
+        pairs.append((student['id'], mentor_id, affinity(student, by_id[mentor_id])))
+    return pairs, unassigned
+
+
+# ===================================================================
+# DATABASE
+# ===================================================================
+def load_matching_inputs(cursor, department_id=None):
+    """
+    Read unmentored active students and accepting faculty with spare capacity
+    `cursor` must be a dictionary cursor
+    """
+    dept_filter, params = "", []
+    if department_id is not None:
+        dept_filter, params = "AND u.department_id = %s", [department_id]
+
+    cursor.execute(f"""
+        SELECT u.id, u.department_id, u.skills, fp.areas_of_expertise,
+               fp.mentorship_capacity - COALESCE(mr.active, 0) as remaining
+        FROM faculty_profiles fp
+        JOIN users u ON u.id = fp.user_id
+        LEFT JOIN (
+            SELECT mentor_id, COUNT(*) as active
+            FROM mentorship_relationships
+            WHERE status = 'active'
+            GROUP BY mentor_id
+        ) mr ON mr.mentor_id = u.id
+        WHERE u.role = 'faculty' AND u.status = 'active'
+          AND fp.is_accepting_requests = TRUE
+          {dept_filter}
+    """, params)
+    mentors = [{
+        "id": row['id'],
+        "department_id": row['department_id'],
+        "skills": _skill_set(row['skills'], row['areas_of_expertise']),
+        "remaining": max(0, int(row['remaining'] or 0)),
+    } for row in cursor.fetchall()]
+
+    cursor.execute(f"""
+        SELECT u.id, u.department_id, u.skills
+        FROM users u
+        WHERE u.role = 'student' AND u.status = 'active'
+          {dept_filter}
+          AND NOT EXISTS (
+              SELECT 1 FROM mentorship_relationships mr
+              WHERE mr.mentee_id = u.id AND mr.status = 'active'
+          )
+        ORDER BY u.id
+    """, params)
+    students = [{
+        "id": row['id'],
+        "department_id": row['department_id'],
+        "skills": _skill_set(row['skills']),
+    } for row in cursor.fetchall()]
+    return students, mentors
+
+
+def apply_assignments(cursor, pairs):
+    """
+    Insert `pairs` as active mentorships inside the caller's transaction
+    Capacity and pairing are re-checked under row locks, so anything that
+    changed since the plan was computed is skipped rather than overbooked
+    Returns (applied_pairs, skipped_pairs)
+    """
+    if not pairs:
+        return [], []
+    mentor_ids = sorted({mentor_id for _, mentor_id, _ in pairs})
+    student_ids = [student_id for student_id, _, _ in pairs]
+
+    placeholders = ', '.join(['%s'] * len(mentor_ids))
+    cursor.execute(f"""
+        SELECT fp.user_id, fp.mentorship_capacity, fp.is_accepting_requests
+        FROM faculty_profiles fp
+        WHERE fp.user_id IN ({placeholders})
+        ORDER BY fp.user_id
+        FOR UPDATE
+    """, mentor_ids)
+    remaining = {row['user_id']: int(row['mentorship_capacity'] or 0) if row['is_accepting_requests'] else 0
+                 for row in cursor.fetchall()}
+    cursor.execute(f"""
+        SELECT mentor_id, COUNT(*) as active
+        FROM mentorship_relationships
+        WHERE status = 'active' AND mentor_id IN ({placeholders})
+        GROUP BY mentor_id
+    """, mentor_ids)
+    for row in cursor.fetchall():
+        remaining[row['mentor_id']] = remaining.get(row['mentor_id'], 0) - row['active']
+
+    already_paired = set()
+    for start in range(0, len(student_ids), 1000):
+        chunk = student_ids[start:start + 1000]
+        cursor.execute(f"""
+            SELECT DISTINCT mentee_id
+            FROM mentorship_relationships
+            WHERE status = 'active' AND mentee_id IN ({', '.join(['%s'] * len(chunk))})
+        """, chunk)
+        already_paired.update(row['mentee_id'] for row in cursor.fetchall())
+
+    applied, skipped = [], []
+    for pair in pairs:
+        student_id, mentor_id, _ = pair
+        if student_id in already_paired or remaining.get(mentor_id, 0) <= 0:
+            skipped.append(pair)
+            continue
+        remaining[mentor_id] -= 1
+        applied.append(pair)
+
+    if applied:
+        cursor.executemany("""
+            INSERT INTO mentorship_relationships (mentor_id, mentee_id, status)
+            VALUES (%s, %s, 'active')
+        """, [(mentor_id, student_id) for student_id, mentor_id, _ in applied])
+
+        added = {}
+        for _, mentor_id, _ in applied:
+            added[mentor_id] = added.get(mentor_id, 0) + 1
+        cursor.executemany("""
+            UPDATE faculty_profiles
+            SET current_mentees = current_mentees + %s
+            WHERE user_id = %s
+        """, [(n, mentor_id) for mentor_id, n in sorted(added.items())])
+    return applied, skipped
+
+
+def summarize(pairs, unassigned, mentors):
+    """Headline numbers for a computed or applied assignment"""
+    same_department = sum(1 for _, _, score in pairs if score >= DEPARTMENT_WEIGHT)
+    total_affinity = sum(score for _, _, score in pairs)
+    return {
+        "students_paired": len(pairs),
+        "students_unpaired": len(unassigned),
+        "mentors_available": sum(1 for m in mentors if m['remaining'] > 0),
+        "capacity_available": sum(m['remaining'] for m in mentors),
+        "same_department": same_department,
+        "total_affinity": total_affinity,
+        "avg_affinity": round(total_affinity / len(pairs), 3) if pairs else 0.0,
+    }
+
+
+def assign_mentors(conn, dry_run=True, department_id=None, max_candidates=10):
+    """
+    Plan (and unless dry_run, write) a batch of mentor pairings
+    The plan is computed outside any write transaction; the inserts then
+    happen in a single transaction that re-checks capacity under row locks
+    Returns a result dict, or None if another run holds the matching lock
+    """
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, 0) as acquired", (MATCHING_LOCK_NAME,))
+        if cursor.fetchone()['acquired'] != 1:
+            return None
+        try:
+            started = time.perf_counter()
+            students, mentors = load_matching_inputs(cursor, department_id)
+            conn.rollback()  # end the read snapshot before the write transaction
+            pairs, unassigned = solve_assignment(students, mentors, max_candidates)
+            solve_ms = round((time.perf_counter() - started) * 1000, 1)
+
+            skipped = []
+            if not dry_run:
+                try:
+                    pairs, skipped = apply_assignments(cursor, pairs)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
+            result = summarize(pairs, unassigned, mentors)
+            result.update({
+                "dry_run": dry_run,
+                "solve_ms": solve_ms,
+                "skipped": len(skipped),
+                "assignments": [{"student_id": student_id, "mentor_id": mentor_id, "affinity": score}
+                                for student_id, mentor_id, score in pairs],
+            })
+            return result
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MATCHING_LOCK_NAME,))
+            cursor.fetchone()
+    finally:
+        cursor.close()
@@ -0,0 +1,364 @@
+# ===================================================================
+# CAMPUSSPHERE - REQUEST AND QUERY METRICS
+# ===================================================================
+# In-process counters and histograms rendered in the Prometheus text
+# exposition format on /metrics.
+#
+# RequestMetrics is fed from two places: the Flask before/after request
+# hooks in app.py (latency and status per route) and the connection
+# pool, which reports checkout wait time and wraps every cursor so each
+# execute() is timed. Query counts and DB time are also accumulated per
+# request in a thread-local, so a route that suddenly issues 40 queries
+# shows up in campussphere_http_request_queries.
+#
+# Every metric is per process; with several workers, scrape each one or
+# aggregate in Prometheus.
+#
+# An optional diagnostics object (query_diagnostics.QueryDiagnostics)
+# receives the same request and query events, including parameters.
+
+import bisect
+import threading
+import time
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+ACQUIRE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+# Route label for work outside a request (CLI commands, background threads)
+NO_ROUTE = '(none)'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, labels, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by a tuple of label values"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=REQUEST_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}   # labels -> [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, value, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), values[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(round(values[-1], 6))}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class CallbackMetric:
+    """Gauge or counter whose values are read from `fn` at scrape time"""
+
+    def __init__(self, name, help_text, kind, fn, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self._fn = fn
+
+    def render(self):
+        try:
+            values = self._fn()
+        except Exception:
+            return
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            if any(m.name == metric.name for m in self._metrics):
+                raise ValueError(f"Duplicate metric {metric.name}")
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._add(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=REQUEST_BUCKETS):
+        return self._add(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge_callback(self, name, help_text, fn, labelnames=()):
+        return self._add(CallbackMetric(name, help_text, 'gauge', fn, labelnames))
+
+    def counter_callback(self, name, help_text, fn, labelnames=()):
+        return self._add(CallbackMetric(name, help_text, 'counter', fn, labelnames))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class InstrumentedCursor:
+    """
+    Cursor proxy that times execute/executemany/callproc.
+    Everything else is forwarded to the real cursor.
+    """
+
+    def __init__(self, cursor, metrics):
+        self._cursor = cursor
+        self._metrics = metrics
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the proxy itself
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def raw(self):
+        """The underlying database cursor"""
+        return self._cursor
+
+    def execute(self, operation, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(operation, *args, **kwargs)
+        finally:
+            self._metrics.observe_query(operation, time.perf_counter() - started,
+                                        args[0] if args else kwargs.get('params'))
+
+    def executemany(self, operation, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(operation, *args, **kwargs)
+        finally:
+            self._metrics.observe_query(operation, time.perf_counter() - started,
+                                        args[0] if args else kwargs.get('params'))
+
+    def callproc(self, procname, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cursor.callproc(procname, *args, **kwargs)
+        finally:
+            self._metrics.observe_query(f'CALL {procname}', time.perf_counter() - started,
+                                        args[0] if args else kwargs.get('args'))
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, *args, **kwargs):
+        return self._cursor.fetchmany(*args, **kwargs)
+
+    def close(self):
+        return self._cursor.close()
+
+
+def process_memory(pid='self'):
+    """
+    Resident (rss) and proportional (pss) set size in bytes, from /proc
+    PSS divides pages shared with other processes (e.g. an app preloaded
+    before forking workers) among them. Empty dict where /proc is missing.
+    """
+    fields = {'VmRSS:': 'rss', 'Pss:': 'pss'}
+    memory = {}
+    for name in ('status', 'smaps_rollup'):
+        try:
+            with open(f'/proc/{pid}/{name}') as source:
+                for line in source:
+                    parts = line.split()
+                    if parts and parts[0] in fields:
+                        memory[fields[parts[0]]] = int(parts[1]) * 1024
+        except OSError:
+            pass
+    return memory
+
+
+_OPERATION_CACHE_SIZE = 4096
+_operation_cache = {}
+
+
+def query_operation(statement):
+    """Leading SQL keyword (SELECT, INSERT, ...) used as the query label"""
+    # Handlers pass the same literal SQL strings over and over
+    operation = _operation_cache.get(statement)
+    if operation is not None:
+        return operation
+    text = statement
+    if isinstance(text, (bytes, bytearray)):
+        text = bytes(text[:32]).decode('utf-8', 'replace')
+    head = text.lstrip(' \t\r\n(')[:16].split(None, 1)
+    keyword = head[0].upper().split('(', 1)[0] if head else ''
+    operation = keyword if keyword.isalpha() else 'OTHER'
+    if isinstance(statement, str) and len(_operation_cache) < _OPERATION_CACHE_SIZE:
+        _operation_cache[statement] = operation
+    return operation
+
+
+class RequestMetrics:
+    """
+    The application's metric set plus the per-request accumulator.
+    Also serves as the connection pool observer (observe_acquire,
+    wrap_cursor).
+
+    Args:
+        registry: MetricsRegistry to register into (default: a new one)
+        diagnostics: optional QueryDiagnostics fed the same events
+    """
+
+    def __init__(self, registry=None, diagnostics=None):
+        self.registry = registry or MetricsRegistry()
+        self.diagnostics = diagnostics
+        self._local = threading.local()
+
+        r = self.registry
+        self.requests = r.counter(
+            'campussphere_http_requests_total',
+            'HTTP requests by route template and status code',
+            ('method', 'route', 'status'))
+        self.request_latency = r.histogram(
+            'campussphere_http_request_duration_seconds',
+            'Request latency by route template',
+            ('method', 'route'), REQUEST_BUCKETS)
+        self.request_queries = r.histogram(
+            'campussphere_http_request_queries',
+            'Database queries issued per request',
+            ('method', 'route'), QUERY_COUNT_BUCKETS)
+        self.request_db_time = r.histogram(
+            'campussphere_http_request_db_seconds',
+            'Time per request spent in query execution',
+            ('method', 'route'), REQUEST_BUCKETS)
+        self.acquire_latency = r.histogram(
+            'campussphere_db_connection_acquire_seconds',
+            'Time to check a connection out of the pool',
+            (), ACQUIRE_BUCKETS)
+        self.query_latency = r.histogram(
+            'campussphere_db_query_duration_seconds',
+            'Query execution time by route and SQL operation',
+            ('route', 'operation'), QUERY_BUCKETS)
+
+    # ---------------------------------------------------------------
+    # Request lifecycle (called from the Flask hooks)
+    # ---------------------------------------------------------------
+    def start_request(self, method, route):
+        self._local.request = [method, route, time.perf_counter(), 0, 0.0]
+        if self.diagnostics is not None:
+            self.diagnostics.start_request(method, route)
+
+    def finish_request(self, status):
+        state = getattr(self._local, 'request', None)
+        if state is None:
+            return
+        self._local.request = None
+        method, route, started, queries, db_time = state
+        self.observe_request(method, route, status, time.perf_counter() - started, queries, db_time)
+        if self.diagnostics is not None:
+            self.diagnostics.finish_request(status)
+
+    def observe_request(self, method, route, status, seconds, queries=0, db_time=0.0):
+        """Record a finished request directly (used by the async path, which has no thread-local state)"""
+        labels = (method, route)
+        self.request_latency.observe(seconds, labels)
+        self.request_queries.observe(queries, labels)
+        self.request_db_time.observe(db_time, labels)
+        self.requests.inc((method, route, str(status)))
+
+    def current_route(self):
+        state = getattr(self._local, 'request', None)
+        return state[1] if state else NO_ROUTE
+
+    # ---------------------------------------------------------------
+    # Pool observer
+    # ---------------------------------------------------------------
+    def observe_acquire(self, seconds):
+        self.acquire_latency.observe(seconds)
+
+    def wrap_cursor(self, cursor):
+        return InstrumentedCursor(cursor, self)
+
+    def observe_query(self, statement, seconds, params=None):
+        state = getattr(self._local, 'request', None)
+        if state is not None:
+            state[3] += 1
+            state[4] += seconds
+            route = state[1]
+        else:
+            route = NO_ROUTE
+        self.query_latency.observe(seconds, (route, query_operation(statement)))
+        if self.diagnostics is not None:
+            self.diagnostics.observe_query(statement, params, seconds, route)
+
+    def render(self):
+        return self.registry.render()
@@ -0,0 +1,30 @@
+-- ===================================================================
+-- Denormalized participant / interest counters
+-- ===================================================================
+-- events.participant_count and collaboration_posts.interest_count are
+-- maintained by register_for_event / express_collaboration_interest in
+-- the same transaction as the insert. Run `flask reconcile-counters`
+-- to repair any drift.
+
+ALTER TABLE events
+    ADD COLUMN participant_count INT UNSIGNED NOT NULL DEFAULT 0;
+
+ALTER TABLE collaboration_posts
+    ADD COLUMN interest_count INT UNSIGNED NOT NULL DEFAULT 0;
+
+-- Backfill from the source tables
+UPDATE events e
+LEFT JOIN (
+    SELECT event_id, COUNT(DISTINCT user_id) AS n
+    FROM event_registrations
+    GROUP BY event_id
+) r ON r.event_id = e.id
+SET e.participant_count = COALESCE(r.n, 0);
+
+UPDATE collaboration_posts cp
+LEFT JOIN (
+    SELECT post_id, COUNT(DISTINCT user_id) AS n
+    FROM collaboration_interests
+    GROUP BY post_id
+) i ON i.post_id = cp.id
+SET cp.interest_count = COALESCE(i.n, 0);
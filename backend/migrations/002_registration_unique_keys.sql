@@ -0,0 +1,10 @@
+-- ===================================================================
+-- Unique keys backing duplicate detection
+-- ===================================================================
+-- register_for_event no longer pre-SELECTs for an existing registration;
+-- it relies on this key to reject duplicates with ER_DUP_ENTRY.
+-- Remove any existing duplicate rows before applying, then run
+-- `flask reconcile-counters`.
+
+ALTER TABLE event_registrations
+    ADD UNIQUE KEY uq_event_registrations_event_user (event_id, user_id);
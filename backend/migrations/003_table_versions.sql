@@ -0,0 +1,19 @@
+-- ===================================================================
+-- Change versions for HTTP conditional GET
+-- ===================================================================
+-- Write paths bump the row for each table they modify via
+-- bump_table_version(); feed endpoints derive ETag / Last-Modified
+-- from these rows instead of scanning the tables themselves.
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(64) NOT NULL PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT IGNORE INTO table_versions (table_name) VALUES
+    ('announcements'),
+    ('collaboration_posts'),
+    ('departments'),
+    ('events'),
+    ('users');
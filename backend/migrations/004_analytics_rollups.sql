@@ -0,0 +1,47 @@
+-- ===================================================================
+-- Analytics rollup tables
+-- ===================================================================
+-- Maintained by analytics_rollups.refresh_rollups(), either from the
+-- background RollupRefresher or `flask refresh-analytics [--full]`.
+
+CREATE TABLE IF NOT EXISTS analytics_user_stats (
+    role VARCHAR(32) NOT NULL,
+    status VARCHAR(32) NOT NULL,
+    count INT UNSIGNED NOT NULL DEFAULT 0,
+    PRIMARY KEY (role, status)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_event_stats (
+    category VARCHAR(64) NOT NULL,
+    status VARCHAR(32) NOT NULL,
+    count INT UNSIGNED NOT NULL DEFAULT 0,
+    PRIMARY KEY (category, status)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_monthly_registrations (
+    month CHAR(7) NOT NULL PRIMARY KEY,
+    registrations INT UNSIGNED NOT NULL DEFAULT 0
+);
+
+-- Finest-grained registration buckets (department_id 0 = no department)
+CREATE TABLE IF NOT EXISTS analytics_registration_daily (
+    day DATE NOT NULL,
+    department_id INT NOT NULL,
+    category VARCHAR(64) NOT NULL,
+    role VARCHAR(32) NOT NULL,
+    registrations INT UNSIGNED NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, department_id, category, role)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_department_stats (
+    department_id INT NOT NULL PRIMARY KEY,
+    total_users INT UNSIGNED NOT NULL DEFAULT 0,
+    events_organized INT UNSIGNED NOT NULL DEFAULT 0,
+    total_registrations INT UNSIGNED NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS analytics_rollup_meta (
+    name VARCHAR(32) NOT NULL PRIMARY KEY,
+    registration_watermark BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    refreshed_at DATETIME NULL
+);
@@ -0,0 +1,15 @@
+-- ===================================================================
+-- Hourly registration buckets
+-- ===================================================================
+-- Backs bucket=hour on /api/admin/analytics/registrations. Only the
+-- last HOURLY_RETENTION_DAYS (31) days are kept; run
+-- `flask refresh-analytics --full` once after applying to backfill.
+
+CREATE TABLE IF NOT EXISTS analytics_registration_hourly (
+    hour DATETIME NOT NULL,
+    department_id INT NOT NULL,
+    category VARCHAR(64) NOT NULL,
+    role VARCHAR(32) NOT NULL,
+    registrations INT UNSIGNED NOT NULL DEFAULT 0,
+    PRIMARY KEY (hour, department_id, category, role)
+);
@@ -0,0 +1,20 @@
+-- ===================================================================
+-- Full-text search indexes
+-- ===================================================================
+-- Backs /api/search. InnoDB maintains FULLTEXT indexes on every
+-- INSERT / UPDATE, so search results stay current without a rebuild.
+-- skills_required is stored as JSON, so a stored generated text copy
+-- is indexed instead.
+
+ALTER TABLE events
+    ADD FULLTEXT INDEX ft_events_search (title, description);
+
+ALTER TABLE collaboration_posts
+    ADD COLUMN skills_search TEXT
+        GENERATED ALWAYS AS (CAST(skills_required AS CHAR)) STORED;
+
+ALTER TABLE collaboration_posts
+    ADD FULLTEXT INDEX ft_collaboration_posts_search (title, description, skills_search);
+
+ALTER TABLE announcements
+    ADD FULLTEXT INDEX ft_announcements_search (title, message);
@@ -0,0 +1,61 @@
+-- ===================================================================
+-- Indexes for the hot endpoint queries
+-- ===================================================================
+-- Every list endpoint filters on a status/owner column and pages with
+-- ORDER BY <timestamp>, id, so each index ends in (<timestamp>, id)
+-- and MySQL can read rows in order instead of sorting them.
+-- `flask check-query-plans` verifies the plans against these indexes.
+--
+-- `flask migrate` skips a CREATE INDEX when the table already has an
+-- index with the same leading columns (e.g. from the original schema).
+
+-- /api/student/events: status = 'approved' ORDER BY start_datetime, id
+CREATE INDEX idx_events_status_start ON events (status, start_datetime, id);
+
+-- /api/faculty/proposals: status = 'pending_approval' ORDER BY created_at
+CREATE INDEX idx_events_status_created ON events (status, created_at, id);
+
+-- /api/admin/events: ORDER BY created_at DESC, id DESC
+CREATE INDEX idx_events_created ON events (created_at, id);
+
+-- /api/student/organized-events and /api/faculty/events (organizer branch)
+CREATE INDEX idx_events_organizer_created ON events (organizer_id, created_at, id);
+
+-- /api/faculty/events (reviewer branch)
+CREATE INDEX idx_events_reviewer_created ON events (reviewed_by, created_at, id);
+
+-- (event_id, user_id) is covered by uq_event_registrations_event_user;
+-- this one serves per-student lookups and the users join in rollups
+CREATE INDEX idx_event_registrations_user ON event_registrations (user_id, event_id);
+
+-- /api/student/collaborate feed and the faculty collaboration feed
+CREATE INDEX idx_collaboration_posts_status_created ON collaboration_posts (status, created_at, id);
+
+-- Recommendation exclusions (own posts) and incremental index refresh
+CREATE INDEX idx_collaboration_posts_author ON collaboration_posts (author_id);
+CREATE INDEX idx_collaboration_posts_updated ON collaboration_posts (updated_at);
+
+-- user_interested join on the feed, duplicate-interest check
+CREATE INDEX idx_collaboration_interests_post_user ON collaboration_interests (post_id, user_id);
+
+-- Recommendation exclusions (posts already interested in)
+CREATE INDEX idx_collaboration_interests_user ON collaboration_interests (user_id, post_id);
+
+-- Login, registration and bulk import duplicate checks
+CREATE UNIQUE INDEX uq_users_email ON users (email);
+
+-- /api/admin/users: one index per filter combination, all ordered by created_at, id
+CREATE INDEX idx_users_role_status_created ON users (role, status, created_at, id);
+CREATE INDEX idx_users_role_created ON users (role, created_at, id);
+CREATE INDEX idx_users_status_created ON users (status, created_at, id);
+CREATE INDEX idx_users_created ON users (created_at, id);
+
+-- Faculty profile join
+CREATE UNIQUE INDEX uq_faculty_profiles_user ON faculty_profiles (user_id);
+
+-- /api/faculty/mentorship and the mentor assignment capacity checks
+CREATE INDEX idx_mentorship_mentor_status ON mentorship_relationships (mentor_id, status, created_at);
+CREATE INDEX idx_mentorship_mentee_status ON mentorship_relationships (mentee_id, status);
+
+-- /api/admin/announcements: ORDER BY created_at DESC, id DESC
+CREATE INDEX idx_announcements_created ON announcements (created_at, id);
@@ -0,0 +1,19 @@
+-- ===================================================================
+-- Live update relay between server processes
+-- ===================================================================
+-- stream_relay.StreamRelay appends every /api/stream event here and
+-- each worker process polls for rows above the last id it has seen, so
+-- a stream receives events published by any worker. The id is the SSE
+-- event id, which lets a client resume with Last-Event-ID on whichever
+-- worker it reconnects to. Rows are pruned after SSE_RELAY_RETENTION
+-- seconds.
+
+CREATE TABLE IF NOT EXISTS stream_events (
+    id BIGINT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
+    event_type VARCHAR(50) NOT NULL,
+    payload MEDIUMTEXT NOT NULL,
+    roles VARCHAR(255) NULL,
+    user_ids TEXT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_stream_events_created (created_at)
+);
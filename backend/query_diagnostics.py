@@ -0,0 +1,210 @@
+# ===================================================================
+# CAMPUSSPHERE - SLOW QUERY LOG AND N+1 DETECTOR
+# ===================================================================
+# Opt-in diagnostics (QUERY_DIAGNOSTICS=true) fed by the same cursor
+# instrumentation as /metrics:
+#
+#   - queries slower than QUERY_SLOW_MS are logged with their
+#     parameters and the route that issued them
+#   - a request that runs one statement shape more than
+#     QUERY_REPEAT_THRESHOLD times is logged as a likely N+1 pattern
+#   - every route accumulates a summary (queries per request, DB time,
+#     repeated shapes) served by GET /api/admin/query-diagnostics
+#
+# A statement's "shape" is its SQL with literals and IN (...) lists
+# collapsed, so `WHERE id = 1` and `WHERE id = 2` count as the same
+# statement. Parameters are logged as given except for email addresses,
+# and for statements that touch password_hash, where only each value's
+# type and length is logged. Other personal data still reaches the log,
+# so keep this off in production unless you are chasing a specific
+# problem.
+
+import re
+import threading
+from datetime import datetime
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:\?|%s)\s*,?)+\)', re.IGNORECASE)
+_SENSITIVE_RE = re.compile(r'\bpassword_hash\b', re.IGNORECASE)
+
+_SHAPE_CACHE_SIZE = 4096
+_shape_cache = {}
+
+MAX_PARAM_LENGTH = 200
+TOP_SHAPES = 5
+
+
+def statement_shape(statement):
+    """SQL with whitespace normalised and literals replaced by '?'"""
+    shape = _shape_cache.get(statement)
+    if shape is not None:
+        return shape
+    text = statement
+    if isinstance(text, (bytes, bytearray)):
+        text = bytes(text).decode('utf-8', 'replace')
+    shape = _WHITESPACE_RE.sub(' ', text).strip()
+    shape = _STRING_RE.sub('?', shape)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _IN_LIST_RE.sub('IN (...)', shape)
+    if isinstance(statement, str) and len(_shape_cache) < _SHAPE_CACHE_SIZE:
+        _shape_cache[statement] = shape
+    return shape
+
+
+def _format_value(value, redact):
+    if isinstance(value, (list, tuple)):
+        # executemany() passes one sequence per row
+        items = ', '.join(_format_value(item, redact) for item in value)
+        if isinstance(value, list):
+            return f"[{items}]"
+        return f"({items},)" if len(value) == 1 else f"({items})"
+    if isinstance(value, dict):
+        return '{' + ', '.join(f"{key!r}: {_format_value(item, redact)}" for key, item in value.items()) + '}'
+    if redact or (isinstance(value, str) and '@' in value):
+        # Type and length only, never the value itself
+        if isinstance(value, (str, bytes, bytearray)):
+            return f"<{type(value).__name__}[{len(value)}]>"
+        return f"<{type(value).__name__}>"
+    return repr(value)
+
+
+def _format_params(params, redact=False):
+    """Parameters for the log; email addresses and, with redact, every value are masked"""
+    if params is None:
+        return ''
+    text = _format_value(params, redact)
+    if len(text) > MAX_PARAM_LENGTH:
+        text = text[:MAX_PARAM_LENGTH] + '...'
+    return text
+
+
+class _RouteSummary:
+    """Running totals for one route"""
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.max_queries = 0
+        self.db_time = 0.0
+        self.slow_queries = 0
+        self.repeat_flags = 0
+        self.shapes = {}    # shape -> [executions, total seconds, max per request]
+
+    def add(self, request_shapes, db_time, slow, flagged):
+        queries = sum(count for count, _ in request_shapes.values())
+        self.requests += 1
+        self.queries += queries
+        self.max_queries = max(self.max_queries, queries)
+        self.db_time += db_time
+        self.slow_queries += slow
+        self.repeat_flags += flagged
+        for shape, (count, seconds) in request_shapes.items():
+            totals = self.shapes.get(shape)
+            if totals is None:
+                totals = self.shapes[shape] = [0, 0.0, 0]
+            totals[0] += count
+            totals[1] += seconds
+            totals[2] = max(totals[2], count)
+
+    def as_dict(self, top=TOP_SHAPES):
+        ranked = sorted(self.shapes.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "avg_queries": round(self.queries / self.requests, 2) if self.requests else 0.0,
+            "max_queries": self.max_queries,
+            "avg_db_ms": round(self.db_time / self.requests * 1000, 3) if self.requests else 0.0,
+            "slow_queries": self.slow_queries,
+            "repeat_flags": self.repeat_flags,
+            "top_statements": [{
+                "statement": shape,
+                "executions": count,
+                "per_request": round(count / self.requests, 2) if self.requests else 0.0,
+                "max_per_request": max_per_request,
+                "total_ms": round(seconds * 1000, 3),
+            } for shape, (count, seconds, max_per_request) in ranked],
+        }
+
+
+class QueryDiagnostics:
+    """
+    Slow-query log, N+1 detector and per-route summary.
+
+    Args:
+        slow_threshold: seconds after which a query is logged as slow
+        repeat_threshold: flag a request running one shape more than this many times
+        log: callable taking one line of text
+    """
+
+    def __init__(self, slow_threshold=0.1, repeat_threshold=5, log=print):
+        self.slow_threshold = slow_threshold
+        self.repeat_threshold = repeat_threshold
+        self.log = log
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._started_at = datetime.now()
+
+    # ---------------------------------------------------------------
+    # Hooks (called by metrics.RequestMetrics)
+    # ---------------------------------------------------------------
+    def start_request(self, method, route):
+        self._local.request = (f"{method} {route}", {}, [0.0, 0])
+
+    def observe_query(self, statement, params, seconds, route):
+        state = getattr(self._local, 'request', None)
+        shape = statement_shape(statement)
+        if state is not None:
+            shapes, totals = state[1], state[2]
+            entry = shapes.get(shape)
+            if entry is None:
+                shapes[shape] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+            totals[0] += seconds
+        if seconds >= self.slow_threshold:
+            if state is not None:
+                state[2][1] += 1
+            redact = _SENSITIVE_RE.search(shape) is not None
+            self.log(f"[slow-query] {seconds * 1000:.1f}ms route={state[0] if state else route} "
+                     f"sql={shape} params={_format_params(params, redact)}")
+
+    def finish_request(self, status):
+        state = getattr(self._local, 'request', None)
+        if state is None:
+            return
+        self._local.request = None
+        route, shapes, (db_time, slow) = state
+        flagged = 0
+        for shape, (count, seconds) in shapes.items():
+            if count > self.repeat_threshold:
+                flagged += 1
+                self.log(f"[n+1] route={route} ran {count}x ({seconds * 1000:.1f}ms total) sql={shape}")
+        with self._lock:
+            summary = self._routes.get(route)
+            if summary is None:
+                summary = self._routes[route] = _RouteSummary()
+            summary.add(shapes, db_time, slow, flagged)
+
+    # ---------------------------------------------------------------
+    # Reporting
+    # ---------------------------------------------------------------
+    def report(self, top=TOP_SHAPES):
+        """Per-route summary, routes with the most queries per request first"""
+        with self._lock:
+            routes = {route: summary.as_dict(top) for route, summary in self._routes.items()}
+        ordered = sorted(routes.items(), key=lambda item: item[1]["avg_queries"], reverse=True)
+        return {
+            "since": self._started_at.isoformat(timespec='seconds'),
+            "slow_threshold_ms": round(self.slow_threshold * 1000, 3),
+            "repeat_threshold": self.repeat_threshold,
+            "routes": [dict(route=route, **summary) for route, summary in ordered],
+        }
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+            self._started_at = datetime.now()
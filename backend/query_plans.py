@@ -0,0 +1,376 @@
+# ===================================================================
+# CAMPUSSPHERE - QUERY PLAN REGRESSION CHECKS
+# ===================================================================
+# EXPLAINs the queries behind the hot endpoints and background jobs and
+# flags any plan that falls back to a full table scan or a filesort.
+# Run it after schema changes or query edits (`flask check-query-plans`)
+# against a database with realistic data volume; on near-empty tables
+# the optimizer legitimately prefers scans, so tables below `min_rows`
+# are reported as skipped rather than failed.
+#
+# The catalog mirrors the SQL in app.py. When you change a hot query
+# there, update its entry here in the same commit.
+#
+# Deliberately absent: the CSV/JSON exports and maintenance commands,
+# which read whole tables by design.
+
+from datetime import datetime
+
+# Lookup tables small enough that scanning or sorting them is fine
+SMALL_TABLES = {
+    'departments', 'platform_settings', 'table_versions',
+    'analytics_user_stats', 'analytics_event_stats', 'analytics_monthly_registrations',
+    'analytics_department_stats', 'analytics_rollup_meta',
+}
+
+# Representative parameter values
+_USER_ID = 1
+_POST_ID = 1
+_EVENT_ID = 1
+_CURSOR_TIME = datetime(2026, 1, 1)
+_CURSOR_ID = 1000000
+_PAGE = 21
+
+
+def _keyset(sort_column, id_column, descending=True):
+    op = '<' if descending else '>'
+    return (f" AND ({sort_column} {op} %s OR ({sort_column} = %s AND {id_column} {op} %s))",
+            [_CURSOR_TIME, _CURSOR_TIME, _CURSOR_ID])
+
+
+def _catalog():
+    """(name, sql, params) for every checked query"""
+    queries = []
+
+    def add(name, sql, params=()):
+        queries.append((name, sql, list(params)))
+
+    add("auth.login", """
+        SELECT u.*, d.name as department_name, d.code as department_code
+        FROM users u
+        LEFT JOIN departments d ON u.department_id = d.id
+        WHERE u.email = %s
+    """, ["student@example.edu"])
+
+    add("auth.register.email_check",
+        "SELECT email FROM users WHERE email = %s", ["student@example.edu"])
+
+    add("users.by_id", """
+        SELECT u.*, d.name as department_name
+        FROM users u
+        LEFT JOIN departments d ON u.department_id = d.id
+        WHERE u.id = %s
+    """, [_USER_ID])
+
+    for page, (keyset_sql, keyset_params) in (("first", ("", [])),
+                                              ("next", _keyset('e.start_datetime', 'e.id', False))):
+        add(f"student.events.{page}_page", f"""
+            SELECT e.*, u.full_name as organizer_name, d.name as organizer_department,
+                   er.status as registration_status, er.registered_at
+            FROM events e
+            JOIN users u ON e.organizer_id = u.id
+            LEFT JOIN departments d ON u.department_id = d.id
+            LEFT JOIN event_registrations er ON e.id = er.event_id AND er.user_id = %s
+            WHERE e.status = 'approved'{keyset_sql}
+            ORDER BY e.start_datetime ASC, e.id ASC
+            LIMIT %s
+        """, [_USER_ID, *keyset_params, _PAGE])
+
+    add("student.events.claim_seat", """
+        UPDATE events
+        SET participant_count = participant_count + 1
+        WHERE id = %s AND status = 'approved'
+        AND (max_participants IS NULL OR max_participants = 0
+             OR participant_count < max_participants)
+    """, [_EVENT_ID])
+
+    add("student.events.register_diagnostics", """
+        SELECT e.id,
+               EXISTS(SELECT 1 FROM event_registrations er
+                      WHERE er.event_id = e.id AND er.user_id = %s) as already_registered
+        FROM events e
+        WHERE e.id = %s AND e.status = 'approved'
+    """, [_USER_ID, _EVENT_ID])
+
+    add("student.organized_events", """
+        SELECT e.*, u.full_name as reviewed_by_name, e.participant_count as registration_count
+        FROM events e
+        LEFT JOIN users u ON e.reviewed_by = u.id
+        WHERE e.organizer_id = %s
+        ORDER BY e.created_at DESC
+    """, [_USER_ID])
+
+    for page, (keyset_sql, keyset_params) in (("first", ("", [])),
+                                              ("next", _keyset('cp.created_at', 'cp.id'))):
+        add(f"student.collaborate.{page}_page", f"""
+            SELECT cp.*, u.full_name as author_name, (ci.user_id IS NOT NULL) as user_interested
+            FROM collaboration_posts cp
+            JOIN users u ON cp.author_id = u.id
+            LEFT JOIN collaboration_interests ci ON cp.id = ci.post_id AND ci.user_id = %s
+            WHERE cp.status = 'active'{keyset_sql}
+            ORDER BY cp.created_at DESC, cp.id DESC
+            LIMIT %s
+        """, [_USER_ID, *keyset_params, _PAGE])
+
+    add("student.collaborate.interest_check",
+        "SELECT * FROM collaboration_interests WHERE post_id = %s AND user_id = %s",
+        [_POST_ID, _USER_ID])
+
+    add("student.recommendations.exclusions", """
+        SELECT id as post_id FROM collaboration_posts WHERE author_id = %s
+        UNION
+        SELECT post_id FROM collaboration_interests WHERE user_id = %s
+    """, [_USER_ID, _USER_ID])
+
+    add("student.recommendations.posts", """
+        SELECT cp.*, u.full_name as author_name
+        FROM collaboration_posts cp
+        JOIN users u ON cp.author_id = u.id
+        WHERE cp.id IN (%s, %s, %s) AND cp.status = 'active'
+    """, [1, 2, 3])
+
+    keyset_sql, keyset_params = _keyset('created_at', 'id')
+    add("faculty.events", f"""
+        SELECT e.*, u.full_name as organizer_name
+        FROM (
+            (SELECT * FROM events WHERE organizer_id = %s{keyset_sql}
+             ORDER BY created_at DESC, id DESC LIMIT %s)
+            UNION
+            (SELECT * FROM events WHERE reviewed_by = %s{keyset_sql}
+             ORDER BY created_at DESC, id DESC LIMIT %s)
+        ) e
+        LEFT JOIN users u ON e.organizer_id = u.id
+        ORDER BY e.created_at DESC, e.id DESC
+        LIMIT %s
+    """, [_USER_ID, *keyset_params, _PAGE, _USER_ID, *keyset_params, _PAGE, _PAGE])
+
+    add("faculty.proposals", """
+        SELECT e.*, u.full_name as student_name, u.email as student_email,
+               d.name as department_name
+        FROM events e
+        JOIN users u ON e.organizer_id = u.id
+        LEFT JOIN departments d ON u.department_id = d.id
+        WHERE e.status = 'pending_approval'
+        AND u.role = 'student'
+        ORDER BY e.created_at ASC
+    """)
+
+    add("faculty.profile", """
+        SELECT u.*, d.name as department_name, fp.designation, fp.areas_of_expertise,
+               fp.mentorship_capacity, fp.current_mentees, fp.is_accepting_requests
+        FROM users u
+        LEFT JOIN departments d ON u.department_id = d.id
+        LEFT JOIN faculty_profiles fp ON u.id = fp.user_id
+        WHERE u.id = %s AND u.role = 'faculty'
+    """, [_USER_ID])
+
+    add("faculty.mentorship.mentees", """
+        SELECT mr.*, u.full_name as mentee_name, u.email as mentee_email,
+               d.name as department_name
+        FROM mentorship_relationships mr
+        JOIN users u ON mr.mentee_id = u.id
+        LEFT JOIN departments d ON u.department_id = d.id
+        WHERE mr.mentor_id = %s AND mr.status = 'active'
+        ORDER BY mr.created_at DESC
+    """, [_USER_ID])
+
+    add("faculty.mentorship.collaboration_feed", """
+        SELECT cp.*, u.full_name as author_name, u.email as author_email
+        FROM collaboration_posts cp
+        JOIN users u ON cp.author_id = u.id
+        WHERE cp.status = 'active'
+        ORDER BY cp.created_at DESC
+        LIMIT 10
+    """)
+
+    keyset_sql, keyset_params = _keyset('u.created_at', 'u.id')
+    for label, filters, filter_params in (("unfiltered", "", []),
+                                          ("by_role", " AND u.role = %s", ['student']),
+                                          ("by_status", " AND u.status = %s", ['pending']),
+                                          ("by_role_status", " AND u.role = %s AND u.status = %s",
+                                           ['faculty', 'pending'])):
+        add(f"admin.users.{label}", f"""
+            SELECT u.*, d.name as department_name
+            FROM users u
+            LEFT JOIN departments d ON u.department_id = d.id
+            WHERE 1=1{filters}{keyset_sql}
+            ORDER BY u.created_at DESC, u.id DESC LIMIT %s
+        """, [*filter_params, *keyset_params, _PAGE])
+
+    keyset_sql, keyset_params = _keyset('e.created_at', 'e.id')
+    add("admin.events", f"""
+        SELECT e.*, u.full_name as organizer_name, u.role as organizer_role,
+               d.name as organizer_department
+        FROM events e
+        JOIN users u ON e.organizer_id = u.id
+        LEFT JOIN departments d ON u.department_id = d.id
+        WHERE 1=1{keyset_sql}
+        ORDER BY e.created_at DESC, e.id DESC
+        LIMIT %s
+    """, [*keyset_params, _PAGE])
+
+    keyset_sql, keyset_params = _keyset('a.created_at', 'a.id')
+    add("admin.announcements", f"""
+        SELECT a.*, u.full_name as created_by_name
+        FROM announcements a
+        JOIN users u ON a.created_by = u.id
+        WHERE 1=1{keyset_sql}
+        ORDER BY a.created_at DESC, a.id DESC
+        LIMIT %s
+    """, [*keyset_params, _PAGE])
+
+    add("admin.users.import_email_check",
+        "SELECT id, email FROM users WHERE email IN (%s, %s, %s)",
+        ["a@example.edu", "b@example.edu", "c@example.edu"])
+
+    add("admin.analytics.departments", """
+        SELECT d.name as department, ds.total_users, ds.events_organized, ds.total_registrations
+        FROM analytics_department_stats ds
+        JOIN departments d ON ds.department_id = d.id
+        ORDER BY ds.total_registrations DESC
+    """)
+
+    add("admin.analytics.registration_buckets", """
+        SELECT r.day as moment, COALESCE(d.name, 'Unassigned') as dim_key,
+               SUM(r.registrations) as registrations
+        FROM analytics_registration_daily r
+        LEFT JOIN departments d ON d.id = r.department_id
+        WHERE r.day BETWEEN %s AND %s
+        GROUP BY moment, dim_key
+    """, [datetime(2026, 1, 1).date(), datetime(2026, 1, 31).date()])
+
+    add("search", """
+        (SELECT 'event' as type, e.id, e.title, e.start_datetime as date,
+                MATCH(e.title, e.description) AGAINST (%s IN NATURAL LANGUAGE MODE) as score
+         FROM events e
+         WHERE e.status = 'approved'
+           AND MATCH(e.title, e.description) AGAINST (%s IN NATURAL LANGUAGE MODE))
+        UNION ALL
+        (SELECT 'collaboration' as type, cp.id, cp.title, cp.created_at as date,
+                MATCH(cp.title, cp.description, cp.skills_search) AGAINST (%s IN NATURAL LANGUAGE MODE) as score
+         FROM collaboration_posts cp
+         WHERE cp.status = 'active'
+           AND MATCH(cp.title, cp.description, cp.skills_search) AGAINST (%s IN NATURAL LANGUAGE MODE))
+        UNION ALL
+        (SELECT 'announcement' as type, a.id, a.title, a.created_at as date,
+                MATCH(a.title, a.message) AGAINST (%s IN NATURAL LANGUAGE MODE) as score
+         FROM announcements a
+         WHERE MATCH(a.title, a.message) AGAINST (%s IN NATURAL LANGUAGE MODE)
+           AND (a.expires_at IS NULL OR a.expires_at > NOW()))
+        ORDER BY score DESC, date DESC LIMIT %s OFFSET %s
+    """, ["python"] * 6 + [_PAGE, 0])
+
+    add("jobs.rollups.high_watermark", """
+        SELECT id
+        FROM event_registrations
+        WHERE registered_at < NOW() - INTERVAL 10 SECOND
+        ORDER BY id DESC
+        LIMIT 1
+    """)
+
+    add("jobs.rollups.fold_daily", """
+        SELECT DATE(er.registered_at), COALESCE(u.department_id, 0),
+               COALESCE(e.category, ''), u.role, COUNT(*)
+        FROM event_registrations er
+        JOIN users u ON er.user_id = u.id
+        JOIN events e ON er.event_id = e.id
+        WHERE er.id > %s AND er.id <= %s
+        GROUP BY DATE(er.registered_at), COALESCE(u.department_id, 0), COALESCE(e.category, ''), u.role
+    """, [0, 1000])
+
+    add("jobs.recommender.incremental", """
+        SELECT id, skills_required, status, updated_at
+        FROM collaboration_posts
+        WHERE updated_at >= %s
+    """, [_CURSOR_TIME])
+
+    add("jobs.recommender.active_count",
+        "SELECT COUNT(*) as n FROM collaboration_posts WHERE status = 'active'")
+
+    return queries
+
+
+HOT_QUERIES = _catalog()
+
+
+def _plan_problems(rows, row_counts, min_rows):
+    """
+    Inspect traditional EXPLAIN rows
+    Returns (problems, skipped_tables)
+    """
+    problems, skipped = [], set()
+    for row in rows:
+        table = row.get('table') or ''
+        access = row.get('type')
+        extra = row.get('Extra') or ''
+        if table in SMALL_TABLES or table.startswith('<'):
+            # Lookup tables, and derived / union results bounded by an inner LIMIT
+            continue
+        base_table = row.get('_base_table', table)
+        if row_counts.get(base_table, min_rows) < min_rows:
+            skipped.add(base_table)
+            continue
+        if access == 'ALL':
+            problems.append(f"full table scan on {table}")
+        if 'Using filesort' in extra:
+            problems.append(f"filesort on {table}")
+    return problems, skipped
+
+
+def _table_row_counts(cursor):
+    cursor.execute("""
+        SELECT table_name as name, table_rows as n
+        FROM information_schema.tables
+        WHERE table_schema = DATABASE()
+    """)
+    return {row['name']: int(row['n'] or 0) for row in cursor.fetchall()}
+
+
+def _alias_map(sql):
+    """Map the table aliases in `sql` (as EXPLAIN reports them) to base table names"""
+    aliases = {}
+    tokens = sql.replace('\n', ' ').replace('(', ' ( ').replace(')', ' ) ').replace(',', ' , ').split()
+    for i, token in enumerate(tokens[:-1]):
+        if token.upper() in ('FROM', 'JOIN', 'UPDATE') and tokens[i + 1] != '(':
+            table = tokens[i + 1]
+            alias = table
+            if i + 2 < len(tokens) and tokens[i + 2].upper() not in (
+                    'WHERE', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'ON', 'SET', 'ORDER', 'GROUP',
+                    'LIMIT', 'UNION', ')', ',', 'AS'):
+                alias = tokens[i + 2]
+            aliases[alias] = table
+    return aliases
+
+
+def check_query_plans(conn, min_rows=1000, names=None):
+    """
+    EXPLAIN every catalogued query
+    Args:
+        min_rows: tables with fewer (estimated) rows are not judged
+        names: optional name prefixes to restrict the run
+    Returns a list of {name, ok, problems, skipped, plan}
+    """
+    results = []
+    cursor = conn.cursor(dictionary=True)
+    try:
+        row_counts = _table_row_counts(cursor)
+        for name, sql, params in HOT_QUERIES:
+            if names and not any(name.startswith(prefix) for prefix in names):
+                continue
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = cursor.fetchall()
+            aliases = _alias_map(sql)
+            for row in plan:
+                row['_base_table'] = aliases.get(row.get('table'), row.get('table'))
+            problems, skipped = _plan_problems(plan, row_counts, min_rows)
+            results.append({
+                "name": name,
+                "ok": not problems,
+                "problems": problems,
+                "skipped": sorted(skipped),
+                "plan": [{k: v for k, v in row.items() if not k.startswith('_')} for row in plan],
+            })
+        conn.rollback()  # EXPLAIN UPDATE takes no locks, but end the snapshot anyway
+        return results
+    finally:
+        cursor.close()
@@ -0,0 +1,290 @@
+# ===================================================================
+# CAMPUSSPHERE - SKILL-MATCHING RECOMMENDATIONS
+# ===================================================================
+# Ranks active collaboration posts for a student by TF-IDF cosine
+# similarity between users.skills and collaboration_posts.skills_required.
+#
+# Post skills are kept as a sparse matrix (CSC arrays: for every skill,
+# the posts that need it and their weight), so scoring one student is a
+# single np.bincount over the postings of that student's skills. Scoring
+# a whole campus densifies students in chunks and multiplies against the
+# (skills x posts) matrix, which is small because the skill vocabulary is.
+#
+# The post index is refreshed incrementally from collaboration_posts
+# rows whose updated_at moved past the last watermark.
+
+import json
+import threading
+import time
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+
+def normalize_skills(raw):
+    """Parse a JSON skills value into a de-duplicated list of lowercase names"""
+    if not raw:
+        return []
+    if isinstance(raw, (bytes, bytearray)):
+        raw = raw.decode('utf-8')
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            raw = raw.split(',')
+    if not isinstance(raw, list):
+        return []
+    seen = []
+    for skill in raw:
+        name = str(skill).strip().lower()
+        if name and name not in seen:
+            seen.append(name)
+    return seen
+
+
+class _SkillIndex:
+    """Immutable snapshot of the post skill matrix"""
+
+    def __init__(self, post_skills):
+        self.post_skills = dict(post_skills)
+        post_ids = list(self.post_skills)
+        self.vocabulary = {}
+        for skills in self.post_skills.values():
+            for skill in skills:
+                if skill not in self.vocabulary:
+                    self.vocabulary[skill] = len(self.vocabulary)
+
+        n_posts = len(post_ids)
+        n_skills = len(self.vocabulary)
+
+        # Postings as COO, then sorted into CSC order
+        rows, cols = [], []
+        for row, post_id in enumerate(post_ids):
+            for skill in self.post_skills[post_id]:
+                rows.append(row)
+                cols.append(self.vocabulary[skill])
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+
+        doc_freq = np.bincount(cols, minlength=n_skills).astype(np.float32)
+        idf = np.log((1.0 + n_posts) / (1.0 + doc_freq)) + 1.0
+
+        # Post vectors are L2-normalized so a dot product is a cosine
+        weights = idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n_posts))
+        norms[norms == 0] = 1.0
+        weights = (weights / norms[rows]).astype(np.float32)
+
+        order = np.argsort(cols, kind='stable')
+        self.post_ids = np.asarray(post_ids, dtype=np.int64)
+        self.idf = idf.astype(np.float32)
+        self.csc_rows = rows[order]
+        self.csc_weights = weights[order]
+        self.csc_indptr = np.concatenate(([0], np.cumsum(np.bincount(cols, minlength=n_skills))))
+        self.dense = None  # (skills x posts), built on first batch scoring
+        self.built_at = time.time()
+
+    def student_vector(self, skills):
+        """(column indices, weights) of a student's L2-normalized TF-IDF vector"""
+        cols = [self.vocabulary[s] for s in normalize_skills(skills) if s in self.vocabulary]
+        if not cols:
+            return None, None
+        cols = np.asarray(cols, dtype=np.int32)
+        weights = self.idf[cols]
+        return cols, weights / np.sqrt((weights ** 2).sum())
+
+    def dense_matrix(self):
+        if self.dense is None:
+            dense = np.zeros((len(self.vocabulary), len(self.post_ids)), dtype=np.float32)
+            for col in range(len(self.vocabulary)):
+                a, b = self.csc_indptr[col], self.csc_indptr[col + 1]
+                dense[col, self.csc_rows[a:b]] = self.csc_weights[a:b]
+            self.dense = dense
+        return self.dense
+
+
+class SkillRecommender:
+    """
+    In-memory skill index over active collaboration posts.
+
+    Args:
+        connection_factory: callable returning a DB connection (or None)
+        min_refresh_interval: seconds between incremental refreshes
+    """
+
+    def __init__(self, connection_factory, min_refresh_interval=30.0):
+        self._connection_factory = connection_factory
+        self.min_refresh_interval = min_refresh_interval
+        self._lock = threading.Lock()
+
+        self._post_skills = {}      # post_id -> [skill, ...] for active posts
+        self._watermark = None      # max collaboration_posts.updated_at seen
+        self._next_refresh = 0.0
+        self._dirty = True
+
+        # Replaced wholesale by _rebuild() so readers never see a mix
+        self._index = None
+
+    @property
+    def available(self):
+        return np is not None
+
+    # ---------------------------------------------------------------
+    # Loading
+    # ---------------------------------------------------------------
+    def refresh(self, force=False):
+        """Apply post changes since the last refresh, then rebuild the matrix if needed"""
+        now = time.monotonic()
+        if not force and now < self._next_refresh:
+            return
+        if not self._lock.acquire(blocking=False):
+            return  # Another thread is refreshing; serve the current index
+        try:
+            conn = self._connection_factory()
+            if not conn:
+                return
+            cursor = conn.cursor(dictionary=True)
+            try:
+                if self._watermark is None or force:
+                    self._full_load(cursor)
+                else:
+                    self._incremental_load(cursor)
+            finally:
+                cursor.close()
+                conn.close()
+            if self._dirty:
+                self._rebuild()
+            self._next_refresh = time.monotonic() + self.min_refresh_interval
+        finally:
+            self._lock.release()
+
+    def _full_load(self, cursor):
+        cursor.execute("""
+            SELECT id, skills_required, updated_at
+            FROM collaboration_posts
+            WHERE status = 'active'
+        """)
+        self._post_skills = {}
+        watermark = None
+        for row in cursor.fetchall():
+            self._post_skills[row['id']] = normalize_skills(row['skills_required'])
+            if row['updated_at'] and (watermark is None or row['updated_at'] > watermark):
+                watermark = row['updated_at']
+        self._watermark = watermark or datetime(1970, 1, 1)
+        self._dirty = True
+
+    def _incremental_load(self, cursor):
+        # >= so rows sharing the watermark second are re-read (idempotent)
+        cursor.execute("""
+            SELECT id, skills_required, status, updated_at
+            FROM collaboration_posts
+            WHERE updated_at >= %s
+        """, (self._watermark,))
+        for row in cursor.fetchall():
+            skills = normalize_skills(row['skills_required'])
+            if row['status'] == 'active':
+                if self._post_skills.get(row['id']) != skills:
+                    self._post_skills[row['id']] = skills
+                    self._dirty = True
+            elif self._post_skills.pop(row['id'], None) is not None:
+                self._dirty = True
+            if row['updated_at'] and row['updated_at'] > self._watermark:
+                self._watermark = row['updated_at']
+
+        # New posts always change updated_at; deletions don't, so compare counts
+        cursor.execute("SELECT COUNT(*) as n FROM collaboration_posts WHERE status = 'active'")
+        if cursor.fetchone()['n'] != len(self._post_skills):
+            self._full_load(cursor)
+
+    def _rebuild(self):
+        """Rebuild vocabulary, IDF weights and the sparse post matrix"""
+        self._index = _SkillIndex(self._post_skills)
+        self._dirty = False
+
+    # ---------------------------------------------------------------
+    # Scoring
+    # ---------------------------------------------------------------
+    def recommend(self, skills, exclude_ids=(), top_k=10):
+        """
+        Top posts for one student
+        Returns a list of (post_id, score, matched_skills)
+        """
+        index = self._index
+        if index is None or not len(index.post_ids):
+            return []
+        cols, student_weights = index.student_vector(skills)
+        if cols is None:
+            return []
+
+        # Gather the postings of the student's skills and sum per post
+        starts = index.csc_indptr[cols]
+        ends = index.csc_indptr[cols + 1]
+        post_rows = np.concatenate([index.csc_rows[a:b] for a, b in zip(starts, ends)])
+        contrib = np.concatenate([index.csc_weights[a:b] * w
+                                  for a, b, w in zip(starts, ends, student_weights)])
+        scores = np.bincount(post_rows, weights=contrib, minlength=len(index.post_ids))
+
+        if exclude_ids:
+            scores[np.isin(index.post_ids, np.fromiter(exclude_ids, dtype=np.int64))] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        student_skills = set(normalize_skills(skills))
+        results = []
+        for row in candidates:
+            post_id = int(index.post_ids[row])
+            matched = [s for s in index.post_skills.get(post_id, []) if s in student_skills]
+            results.append((post_id, round(float(scores[row]), 4), matched))
+        return results
+
+    def score_all(self, students, top_k=10, chunk_size=2048):
+        """
+        Score every student x post pair and keep each student's top_k
+        Args:
+            students: list of (student_id, skills) pairs
+        Returns {student_id: [(post_id, score), ...]}
+        """
+        index = self._index
+        n_posts = 0 if index is None else len(index.post_ids)
+        if not n_posts or not students:
+            return {}
+
+        dense = index.dense_matrix()
+        k = min(top_k, n_posts)
+        results = {}
+        for start in range(0, len(students), chunk_size):
+            chunk = students[start:start + chunk_size]
+            matrix = np.zeros((len(chunk), len(index.vocabulary)), dtype=np.float32)
+            for i, (_, skills) in enumerate(chunk):
+                cols, weights = index.student_vector(skills)
+                if cols is not None:
+                    matrix[i, cols] = weights
+
+            scores = matrix @ dense
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            for i, (student_id, _) in enumerate(chunk):
+                results[student_id] = [
+                    (int(index.post_ids[p]), round(float(s), 4))
+                    for p, s in zip(top[i], top_scores[i]) if s > 0
+                ]
+        return results
+
+    def stats(self):
+        index = self._index
+        return {
+            "available": self.available,
+            "posts": 0 if index is None else int(len(index.post_ids)),
+            "skills": 0 if index is None else len(index.vocabulary),
+            "built_at": None if index is None else index.built_at,
+        }
@@ -0,0 +1,207 @@
+# ===================================================================
+# CAMPUSSPHERE - SCHEMA MIGRATIONS
+# ===================================================================
+# Applies backend/migrations/NNN_name.sql in version order and records
+# each one in schema_migrations, so every environment can tell which
+# schema and index changes it already has.
+#
+# MySQL commits DDL implicitly, so a migration is not atomic: if a
+# statement fails, the earlier statements in that file stay applied and
+# the migration is left unrecorded. Fix the cause, make the file safe to
+# re-run (or finish it by hand) and run `flask migrate` again.
+#
+# CREATE INDEX statements are skipped when the table already has an
+# equivalent index, so index migrations are safe on databases built
+# from the original, unversioned schema. A plain index is equivalent to
+# any BTREE index with the same leading columns; a UNIQUE index only to
+# a unique one on exactly its columns (a plain index on users.email does
+# not stop duplicate emails); a FULLTEXT index only to a FULLTEXT one
+# on the same columns.
+
+import hashlib
+import os
+import re
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+_FILENAME_RE = re.compile(r'^(\d+)_([\w-]+)\.sql$')
+_CREATE_INDEX_RE = re.compile(
+    r'^CREATE\s+(?:(UNIQUE|FULLTEXT)\s+)?INDEX\s+(\w+)\s+ON\s+(\w+)\s*\(([^)]*)\)',
+    re.IGNORECASE
+)
+
+
+class Migration:
+    """One versioned .sql file"""
+
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+        with open(path, 'rb') as f:
+            self.source = f.read().decode('utf-8')
+        self.checksum = hashlib.sha256(self.source.encode('utf-8')).hexdigest()
+
+    def statements(self):
+        return split_statements(self.source)
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """All migrations in `directory`, ordered by version"""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _FILENAME_RE.match(filename)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2),
+                                        os.path.join(directory, filename)))
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError("Duplicate migration version in " + directory)
+    return migrations
+
+
+def split_statements(sql):
+    """Split a migration into statements, dropping -- comment lines"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [stmt.strip() for stmt in '\n'.join(lines).split(';') if stmt.strip()]
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_migrations(cursor):
+    """{version: checksum} of migrations already recorded"""
+    cursor.execute("SELECT version, checksum FROM schema_migrations")
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def _index_covered(cursor, table, columns, kind=None):
+    """
+    True if `table` already has an index equivalent to the one a
+    CREATE [UNIQUE|FULLTEXT] INDEX on `columns` would add
+    `kind` is None, 'UNIQUE' or 'FULLTEXT'
+    """
+    cursor.execute("""
+        SELECT index_name, MAX(non_unique), MAX(index_type),
+               GROUP_CONCAT(column_name ORDER BY seq_in_index) as cols
+        FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s
+        GROUP BY index_name
+    """, (table,))
+    kind = kind.upper() if kind else None
+    wanted = [c.strip().lower() for c in columns.split(',')]
+    for _, non_unique, index_type, cols in cursor.fetchall():
+        existing = [c.lower() for c in cols.split(',')]
+        if kind == 'FULLTEXT':
+            if index_type == 'FULLTEXT' and sorted(existing) == sorted(wanted):
+                return True
+        elif index_type != 'BTREE':
+            continue
+        elif kind == 'UNIQUE':
+            if not int(non_unique) and existing == wanted:
+                return True
+        elif existing[:len(wanted)] == wanted:
+            return True
+    return False
+
+
+def _record(cursor, migration):
+    cursor.execute("""
+        INSERT INTO schema_migrations (version, name, checksum)
+        VALUES (%s, %s, %s)
+    """, (migration.version, migration.name, migration.checksum))
+
+
+def migration_status(conn, directory=MIGRATIONS_DIR):
+    """
+    Compare migration files with the database
+    Returns a list of (migration, state) with state 'applied', 'pending' or 'modified'
+    """
+    cursor = conn.cursor()
+    try:
+        ensure_migrations_table(cursor)
+        applied = applied_migrations(cursor)
+    finally:
+        cursor.close()
+    status = []
+    for migration in discover(directory):
+        if migration.version not in applied:
+            state = 'pending'
+        elif applied[migration.version] != migration.checksum:
+            state = 'modified'
+        else:
+            state = 'applied'
+        status.append((migration, state))
+    return status
+
+
+def migrate(conn, target=None, dry_run=False, log=print, directory=MIGRATIONS_DIR):
+    """
+    Apply pending migrations up to `target` (default: all)
+    With dry_run=True only report what would run
+    Returns the list of applied migrations
+    """
+    done = []
+    cursor = conn.cursor()
+    try:
+        ensure_migrations_table(cursor)
+        applied = applied_migrations(cursor)
+        for migration in discover(directory):
+            if target is not None and migration.version > target:
+                break
+            if migration.version in applied:
+                if applied[migration.version] != migration.checksum:
+                    log(f"warning: {migration.version:03d}_{migration.name} changed after it was applied")
+                continue
+
+            log(f"{'would apply' if dry_run else 'applying'} {migration.version:03d}_{migration.name}")
+            if dry_run:
+                done.append(migration)
+                continue
+
+            for statement in migration.statements():
+                index = _CREATE_INDEX_RE.match(statement)
+                if index and _index_covered(cursor, index.group(3), index.group(4), index.group(1)):
+                    log(f"  skip {index.group(2)}: {index.group(3)}({index.group(4)}) is already indexed")
+                    continue
+                cursor.execute(statement)
+                if cursor.with_rows:
+                    cursor.fetchall()
+            _record(cursor, migration)
+            conn.commit()
+            done.append(migration)
+        return done
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def baseline(conn, version, directory=MIGRATIONS_DIR):
+    """
+    Mark every migration up to `version` as applied without running it,
+    for databases where those files were applied by hand
+    """
+    cursor = conn.cursor()
+    try:
+        ensure_migrations_table(cursor)
+        applied = applied_migrations(cursor)
+        marked = []
+        for migration in discover(directory):
+            if migration.version <= version and migration.version not in applied:
+                _record(cursor, migration)
+                marked.append(migration)
+        conn.commit()
+        return marked
+    finally:
+        cursor.close()
@@ -0,0 +1,138 @@
+# ===================================================================
+# CAMPUSSPHERE - PLATFORM SETTINGS SNAPSHOT
+# ===================================================================
+# Keeps a typed, in-memory copy of the platform_settings table so
+# request handlers can read settings at dictionary-lookup cost.
+#
+# Each process re-checks a cheap version fingerprint of the table at
+# most every `check_interval` seconds, so every worker converges on a
+# change within that bound. The process that handled the PUT
+# invalidates its own copy immediately.
+
+import json
+import threading
+import time
+
+from storage import DB_ERRORS
+
+
+def parse_setting_value(raw):
+    """Convert the stored string into bool / int / float / JSON where possible"""
+    if raw is None:
+        return None
+    value = raw.strip()
+    lowered = value.lower()
+    if lowered in ('true', 'yes', 'on'):
+        return True
+    if lowered in ('false', 'no', 'off'):
+        return False
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    if value[:1] in ('{', '['):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return raw
+
+
+class SettingsSnapshot:
+    """
+    Process-local settings cache.
+
+    Args:
+        connection_factory: callable returning a DB connection (or None)
+        check_interval: max seconds between version checks
+    """
+
+    VERSION_QUERY = """
+        SELECT COUNT(*) as n,
+               MAX(updated_at) as last_updated,
+               COALESCE(SUM(CRC32(CONCAT(setting_key, '=', COALESCE(setting_value, '')))), 0) as checksum
+        FROM platform_settings
+    """
+
+    def __init__(self, connection_factory, check_interval=5.0):
+        self._connection_factory = connection_factory
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._values = {}
+        self._raw = {}
+        self._version = None
+        self._next_check = 0.0
+        self.loaded_at = None
+
+    def _fetch_version(self, cursor):
+        cursor.execute(self.VERSION_QUERY)
+        row = cursor.fetchone()
+        return (row['n'], row['last_updated'], int(row['checksum']))
+
+    def refresh(self, force=False):
+        """
+        Reload the snapshot if the table version changed (or if forced)
+        Keeps the previous snapshot when the database is unreachable
+        """
+        conn = self._connection_factory()
+        if not conn:
+            return False
+        cursor = conn.cursor(dictionary=True)
+        try:
+            version = self._fetch_version(cursor)
+            if not force and version == self._version:
+                return False
+
+            cursor.execute("SELECT setting_key, setting_value FROM platform_settings")
+            raw = {row['setting_key']: row['setting_value'] for row in cursor.fetchall()}
+            values = {key: parse_setting_value(value) for key, value in raw.items()}
+
+            # Swap whole dicts so readers never see a half-built snapshot
+            self._raw = raw
+            self._values = values
+            self._version = version
+            self.loaded_at = time.time()
+            return True
+        except DB_ERRORS as err:
+            print(f"Settings refresh error: {err}")
+            return False
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _maybe_refresh(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        # Only one thread per process pays for the version check
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            if now >= self._next_check:
+                self.refresh(force=self._version is None)
+                self._next_check = time.monotonic() + self.check_interval
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        """Force a full reload on the next access"""
+        self._version = None
+        self._next_check = 0.0
+
+    def get(self, key, default=None):
+        """Typed setting value, or `default` if it is not set"""
+        self._maybe_refresh()
+        return self._values.get(key, default)
+
+    def as_dict(self):
+        """Raw string values, as stored"""
+        self._maybe_refresh()
+        return dict(self._raw)
+
+    @property
+    def version(self):
+        return self._version
@@ -0,0 +1,290 @@
+-- ===================================================================
+-- CampusSphere schema for the embedded SQLite backend
+-- ===================================================================
+-- Applied by sqlite_storage.SQLiteStorage on startup; every statement
+-- is idempotent. This is the MySQL schema with migrations 001-008
+-- folded in. FULLTEXT indexes become FTS5 tables kept in sync by
+-- triggers, and timestamp defaults use local time like MySQL NOW().
+--
+-- There are no versioned migrations for SQLite: add new columns and
+-- indexes here as well as in migrations/.
+--
+-- Foreign keys are enforced (PRAGMA foreign_keys). Removing a user
+-- deletes their profile, registrations, interests, mentorships and the
+-- events and posts they authored, and clears reviewed_by, created_by
+-- and updated_by. SQLite cannot change constraints on an existing
+-- table, so files created before these ON DELETE actions must be
+-- recreated (e.g. re-seeded) to pick them up.
+
+CREATE TABLE IF NOT EXISTS departments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL COLLATE NOCASE,
+    code TEXT NOT NULL COLLATE NOCASE UNIQUE,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    full_name TEXT NOT NULL,
+    email TEXT NOT NULL COLLATE NOCASE,
+    password_hash TEXT NOT NULL,
+    role TEXT NOT NULL CHECK (role IN ('student', 'faculty', 'admin')),
+    status TEXT NOT NULL DEFAULT 'pending',
+    department_id INTEGER REFERENCES departments(id),
+    enrollment_no TEXT,
+    branch TEXT,
+    semester INTEGER,
+    class TEXT,
+    bio TEXT,
+    avatar_url TEXT,
+    skills TEXT,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS faculty_profiles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    designation TEXT,
+    areas_of_expertise TEXT,
+    mentorship_capacity INTEGER NOT NULL DEFAULT 5,
+    current_mentees INTEGER NOT NULL DEFAULT 0,
+    is_accepting_requests INTEGER NOT NULL DEFAULT 1,
+    office_location TEXT,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    description TEXT,
+    start_datetime DATETIME NOT NULL,
+    end_datetime DATETIME,
+    location TEXT,
+    category TEXT,
+    eligibility_criteria TEXT,
+    registration_form_url TEXT,
+    organizer_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    status TEXT NOT NULL DEFAULT 'pending_approval',
+    max_participants INTEGER,
+    participant_count INTEGER NOT NULL DEFAULT 0,
+    is_featured INTEGER NOT NULL DEFAULT 0,
+    reviewed_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    reviewed_at DATETIME,
+    admin_notes TEXT,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS event_registrations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    event_id INTEGER NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+    status TEXT NOT NULL DEFAULT 'registered',
+    registered_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS collaboration_posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    author_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    description TEXT,
+    skills_required TEXT,
+    team_size_needed INTEGER,
+    registration_form_url TEXT,
+    project_category TEXT,
+    status TEXT NOT NULL DEFAULT 'active',
+    interest_count INTEGER NOT NULL DEFAULT 0,
+    skills_search TEXT GENERATED ALWAYS AS (skills_required) VIRTUAL,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS collaboration_interests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    post_id INTEGER NOT NULL REFERENCES collaboration_posts(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    message TEXT,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS mentorship_relationships (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mentor_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    mentee_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    status TEXT NOT NULL DEFAULT 'active',
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime')),
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS announcements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    message TEXT NOT NULL,
+    target_audience TEXT NOT NULL DEFAULT 'all',
+    priority TEXT NOT NULL DEFAULT 'normal',
+    is_banner INTEGER NOT NULL DEFAULT 0,
+    created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    expires_at DATETIME,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS platform_settings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    setting_key TEXT NOT NULL UNIQUE,
+    setting_value TEXT,
+    updated_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+-- 003_table_versions
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name TEXT NOT NULL PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 1,
+    updated_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+
+INSERT OR IGNORE INTO table_versions (table_name) VALUES
+    ('announcements'),
+    ('collaboration_posts'),
+    ('departments'),
+    ('events'),
+    ('users');
+
+-- 004_analytics_rollups / 005_analytics_hourly_buckets
+CREATE TABLE IF NOT EXISTS analytics_user_stats (
+    role TEXT NOT NULL,
+    status TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (role, status)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_event_stats (
+    category TEXT NOT NULL,
+    status TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (category, status)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_monthly_registrations (
+    month TEXT NOT NULL PRIMARY KEY,
+    registrations INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS analytics_registration_daily (
+    day DATE NOT NULL,
+    department_id INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    role TEXT NOT NULL,
+    registrations INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, department_id, category, role)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_registration_hourly (
+    hour DATETIME NOT NULL,
+    department_id INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    role TEXT NOT NULL,
+    registrations INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (hour, department_id, category, role)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_department_stats (
+    department_id INTEGER NOT NULL PRIMARY KEY,
+    total_users INTEGER NOT NULL DEFAULT 0,
+    events_organized INTEGER NOT NULL DEFAULT 0,
+    total_registrations INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS analytics_rollup_meta (
+    name TEXT NOT NULL PRIMARY KEY,
+    registration_watermark INTEGER NOT NULL DEFAULT 0,
+    refreshed_at DATETIME
+);
+
+-- 002_registration_unique_keys / 007_query_indexes
+CREATE UNIQUE INDEX IF NOT EXISTS uq_event_registrations_event_user ON event_registrations (event_id, user_id);
+CREATE INDEX IF NOT EXISTS idx_event_registrations_user ON event_registrations (user_id, event_id);
+CREATE INDEX IF NOT EXISTS idx_events_status_start ON events (status, start_datetime, id);
+CREATE INDEX IF NOT EXISTS idx_events_status_created ON events (status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_events_created ON events (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_events_organizer_created ON events (organizer_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_events_reviewer_created ON events (reviewed_by, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_collaboration_posts_status_created ON collaboration_posts (status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_collaboration_posts_author ON collaboration_posts (author_id);
+CREATE INDEX IF NOT EXISTS idx_collaboration_posts_updated ON collaboration_posts (updated_at);
+CREATE INDEX IF NOT EXISTS idx_collaboration_interests_post_user ON collaboration_interests (post_id, user_id);
+CREATE INDEX IF NOT EXISTS idx_collaboration_interests_user ON collaboration_interests (user_id, post_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_users_email ON users (email);
+CREATE INDEX IF NOT EXISTS idx_users_role_status_created ON users (role, status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_users_role_created ON users (role, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_users_status_created ON users (status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_users_created ON users (created_at, id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_faculty_profiles_user ON faculty_profiles (user_id);
+CREATE INDEX IF NOT EXISTS idx_mentorship_mentor_status ON mentorship_relationships (mentor_id, status, created_at);
+CREATE INDEX IF NOT EXISTS idx_mentorship_mentee_status ON mentorship_relationships (mentee_id, status);
+CREATE INDEX IF NOT EXISTS idx_announcements_created ON announcements (created_at, id);
+
+-- 006_fulltext_search: external-content FTS5 tables, ranked with bm25()
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+    title, description, content='events', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN
+    INSERT INTO events_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN
+    INSERT INTO events_fts (events_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS events_fts_update AFTER UPDATE OF title, description ON events BEGIN
+    INSERT INTO events_fts (events_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO events_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS collaboration_posts_fts USING fts5(
+    title, description, skills_search, content='collaboration_posts', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS collaboration_posts_fts_insert AFTER INSERT ON collaboration_posts BEGIN
+    INSERT INTO collaboration_posts_fts (rowid, title, description, skills_search)
+    VALUES (new.id, new.title, new.description, new.skills_required);
+END;
+CREATE TRIGGER IF NOT EXISTS collaboration_posts_fts_delete AFTER DELETE ON collaboration_posts BEGIN
+    INSERT INTO collaboration_posts_fts (collaboration_posts_fts, rowid, title, description, skills_search)
+    VALUES ('delete', old.id, old.title, old.description, old.skills_required);
+END;
+CREATE TRIGGER IF NOT EXISTS collaboration_posts_fts_update
+AFTER UPDATE OF title, description, skills_required ON collaboration_posts BEGIN
+    INSERT INTO collaboration_posts_fts (collaboration_posts_fts, rowid, title, description, skills_search)
+    VALUES ('delete', old.id, old.title, old.description, old.skills_required);
+    INSERT INTO collaboration_posts_fts (rowid, title, description, skills_search)
+    VALUES (new.id, new.title, new.description, new.skills_required);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS announcements_fts USING fts5(
+    title, message, content='announcements', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS announcements_fts_insert AFTER INSERT ON announcements BEGIN
+    INSERT INTO announcements_fts (rowid, title, message) VALUES (new.id, new.title, new.message);
+END;
+CREATE TRIGGER IF NOT EXISTS announcements_fts_delete AFTER DELETE ON announcements BEGIN
+    INSERT INTO announcements_fts (announcements_fts, rowid, title, message)
+    VALUES ('delete', old.id, old.title, old.message);
+END;
+CREATE TRIGGER IF NOT EXISTS announcements_fts_update AFTER UPDATE OF title, message ON announcements BEGIN
+    INSERT INTO announcements_fts (announcements_fts, rowid, title, message)
+    VALUES ('delete', old.id, old.title, old.message);
+    INSERT INTO announcements_fts (rowid, title, message) VALUES (new.id, new.title, new.message);
+END;
+
+-- 008_stream_events
+CREATE TABLE IF NOT EXISTS stream_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    roles TEXT,
+    user_ids TEXT,
+    created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_stream_events_created ON stream_events (created_at);
@@ -0,0 +1,458 @@
+# ===================================================================
+# CAMPUSSPHERE - EMBEDDED SQLITE STORAGE
+# ===================================================================
+# DB_BACKEND=sqlite serves the app from a single SQLite file instead of
+# a MySQL server: no network round trip per query, nothing to run in CI
+# or on a small campus deployment.
+#
+# Connections look like the pooled MySQL ones to the handlers:
+# cursor(dictionary=True), %s placeholders, commit/rollback, and close()
+# hands the connection back for reuse. MySQL-specific SQL is rewritten
+# once per statement string (translate_sql) and the MySQL functions the
+# app relies on (DATE_FORMAT, CRC32, CONCAT, GET_LOCK, ...) are
+# registered as SQLite functions. Statements with no direct equivalent
+# (FULLTEXT search, multi-table UPDATE) branch on conn.dialect.
+#
+# WAL mode lets readers run alongside the single writer. SELECT ... FOR
+# UPDATE opens a BEGIN IMMEDIATE transaction so read-then-write paths
+# still serialise. GET_LOCK locks are per process, so run one
+# process per database file.
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sqlite_schema.sql')
+
+# ---------------------------------------------------------------
+# Type adapters: store datetimes as local 'YYYY-MM-DD HH:MM:SS' text
+# (what datetime('now', 'localtime') produces) and parse declared
+# DATETIME / TIMESTAMP / DATE columns back into Python objects
+# ---------------------------------------------------------------
+sqlite3.register_adapter(datetime, lambda value: value.replace(tzinfo=None).isoformat(' ', timespec='seconds'))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(Decimal, str)
+
+
+def _convert_datetime(raw):
+    try:
+        return datetime.fromisoformat(raw.decode())
+    except ValueError:
+        return raw.decode()
+
+
+def _convert_date(raw):
+    try:
+        return date.fromisoformat(raw.decode()[:10])
+    except ValueError:
+        return raw.decode()
+
+
+sqlite3.register_converter('DATETIME', _convert_datetime)
+sqlite3.register_converter('TIMESTAMP', _convert_datetime)
+sqlite3.register_converter('DATE', _convert_date)
+
+
+# ===================================================================
+# SQL TRANSLATION
+# ===================================================================
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_INTERVAL_UNITS = {'SECOND': 'seconds', 'MINUTE': 'minutes', 'HOUR': 'hours',
+                   'DAY': 'days', 'MONTH': 'months', 'YEAR': 'years'}
+_UNIT_RE = '(' + '|'.join(_INTERVAL_UNITS) + ')'
+_NOW_MINUS_RE = re.compile(r'NOW\(\)\s*-\s*INTERVAL\s+(\?|\d+)\s+' + _UNIT_RE, re.IGNORECASE)
+_DATE_SUB_RE = re.compile(r'DATE_SUB\(\s*NOW\(\)\s*,\s*INTERVAL\s+(\?|\d+)\s+' + _UNIT_RE + r'\s*\)', re.IGNORECASE)
+_NOW_RE = re.compile(r'\bNOW\(\)', re.IGNORECASE)
+_FOR_UPDATE_RE = re.compile(r'\s+FOR\s+UPDATE\b', re.IGNORECASE)
+_ON_DUPLICATE_RE = re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.IGNORECASE)
+_VALUES_FN_RE = re.compile(r'\bVALUES\((\w+)\)', re.IGNORECASE)
+_INSERT_IGNORE_RE = re.compile(r'\bINSERT\s+IGNORE\b', re.IGNORECASE)
+_LEFT_FN_RE = re.compile(r'\bLEFT\(', re.IGNORECASE)
+
+_TRANSLATION_CACHE_SIZE = 4096
+_translation_cache = {}
+
+
+def _relative_now(match):
+    amount, unit = match.group(1), _INTERVAL_UNITS[match.group(2).upper()]
+    return f"datetime('now', 'localtime', '-' || {amount} || ' {unit}')"
+
+
+def _translate_code(code):
+    """Rewrite one stretch of SQL that contains no string literals"""
+    code = code.replace('%s', '?')
+    code = _DATE_SUB_RE.sub(_relative_now, code)
+    code = _NOW_MINUS_RE.sub(_relative_now, code)
+    code = _NOW_RE.sub("datetime('now', 'localtime')", code)
+    code = _INSERT_IGNORE_RE.sub('INSERT OR IGNORE', code)
+    code = _LEFT_FN_RE.sub('LEFT_CHARS(', code)
+    return code
+
+
+def translate_sql(statement):
+    """
+    MySQL dialect SQL -> SQLite
+    Returns (sql, locking) where locking is True for SELECT ... FOR UPDATE
+    """
+    cached = _translation_cache.get(statement)
+    if cached is not None:
+        return cached
+
+    # Only rewrite outside string literals so '%Y-%m' and friends survive
+    parts = []
+    last = 0
+    for match in _STRING_LITERAL_RE.finditer(statement):
+        parts.append(_translate_code(statement[last:match.start()]))
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(_translate_code(statement[last:]))
+    sql = ''.join(parts)
+
+    locking = bool(_FOR_UPDATE_RE.search(sql))
+    if locking:
+        sql = _FOR_UPDATE_RE.sub('', sql)
+
+    upsert = _ON_DUPLICATE_RE.search(sql)
+    if upsert:
+        # Without a conflict target SQLite applies the update to any
+        # unique violation, like MySQL does
+        head, tail = sql[:upsert.start()], sql[upsert.end():]
+        sql = head + 'ON CONFLICT DO UPDATE SET' + _VALUES_FN_RE.sub(r'excluded.\1', tail)
+
+    result = (sql, locking)
+    if len(_translation_cache) < _TRANSLATION_CACHE_SIZE:
+        _translation_cache[statement] = result
+    return result
+
+
+# ===================================================================
+# MYSQL FUNCTION SHIMS
+# ===================================================================
+_DATE_FORMAT_CODES = {'%Y': '%Y', '%y': '%y', '%m': '%m', '%d': '%d', '%H': '%H',
+                      '%i': '%M', '%s': '%S', '%S': '%S', '%j': '%j', '%%': '%%'}
+_DATE_FORMAT_RE = re.compile(r'%.')
+
+
+def _date_format(value, fmt):
+    if value is None or fmt is None:
+        return None
+    if not isinstance(value, (date, datetime)):
+        try:
+            value = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    return value.strftime(_DATE_FORMAT_RE.sub(lambda m: _DATE_FORMAT_CODES.get(m.group(0), m.group(0)), fmt))
+
+
+def _concat(*args):
+    if any(arg is None for arg in args):
+        return None
+    return ''.join(str(arg) for arg in args)
+
+
+def _crc32(value):
+    if value is None:
+        return None
+    return zlib.crc32(str(value).encode('utf-8'))
+
+
+def _left_chars(value, length):
+    return None if value is None else str(value)[:length]
+
+
+class _NamedLocks:
+    """Process-wide stand-in for MySQL GET_LOCK / RELEASE_LOCK"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._owners = {}
+
+    def acquire(self, owner, name, timeout):
+        deadline = time.monotonic() + max(float(timeout or 0), 0)
+        with self._cond:
+            while self._owners.get(name, owner) != owner:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return 0
+                self._cond.wait(remaining)
+            self._owners[name] = owner
+            return 1
+
+    def release(self, owner, name):
+        with self._cond:
+            if name not in self._owners:
+                return None
+            if self._owners[name] != owner:
+                return 0
+            del self._owners[name]
+            self._cond.notify_all()
+            return 1
+
+
+_named_locks = _NamedLocks()
+
+
+# ===================================================================
+# CONNECTIONS
+# ===================================================================
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteCursor:
+    """mysql.connector-style cursor over a sqlite3 cursor"""
+
+    def __init__(self, raw_conn, dictionary=False):
+        self._conn = raw_conn
+        self._cursor = raw_conn.cursor()
+        if dictionary:
+            self._cursor.row_factory = _dict_row
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the proxy itself
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, operation, params=None, multi=False):
+        sql, locking = translate_sql(operation)
+        if locking and not self._conn.in_transaction:
+            self._cursor.execute("BEGIN IMMEDIATE")
+        self._cursor.execute(sql, tuple(params) if params is not None else ())
+
+    def executemany(self, operation, seq_params):
+        sql, _ = translate_sql(operation)
+        self._cursor.executemany(sql, [tuple(params) for params in seq_params])
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    @property
+    def with_rows(self):
+        return self._cursor.description is not None
+
+    @property
+    def column_names(self):
+        return tuple(column[0] for column in self._cursor.description or ())
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """
+    Checked-out connection. close() returns it to the storage for
+    reuse, rolling back anything left uncommitted.
+    """
+
+    dialect = 'sqlite'
+
+    def __init__(self, storage, raw):
+        self._storage = storage
+        self._conn = raw
+        self._closed = False
+        # Frees the slot if a handler never calls close(); must not reference self
+        self._finalizer = weakref.finalize(self, storage._reclaim, raw)
+        self._finalizer.atexit = False
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the proxy itself
+        return getattr(self._conn, name)
+
+    @property
+    def raw(self):
+        """The underlying sqlite3 connection"""
+        return self._conn
+
+    def cursor(self, dictionary=False, buffered=None, **kwargs):
+        cursor = SQLiteCursor(self._conn, dictionary=dictionary)
+        observer = self._storage.observer
+        return observer.wrap_cursor(cursor) if observer is not None else cursor
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        """Return the connection for reuse (safe to call twice)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._finalizer.detach()
+        self._storage._release(self._conn)
+
+    def discard(self):
+        """Close the connection instead of returning it (safe to call twice)"""
+        if self._closed:
+            return
+        self._closed = True
+        self._finalizer.detach()
+        self._storage._discard(self._conn)
+
+
+class SQLiteStorage:
+    """
+    Embedded SQLite backend with reusable connections.
+
+    Args:
+        path: database file (created with the schema if missing)
+        max_idle: connections kept open for reuse
+        busy_timeout: seconds a writer waits for the database lock
+        cache_mb: page cache per connection
+        mmap_mb: memory-mapped I/O size per connection (0 = off)
+        observer: optional pool observer (metrics.RequestMetrics)
+    """
+
+    dialect = 'sqlite'
+
+    def __init__(self, path, max_idle=8, busy_timeout=5.0, cache_mb=64, mmap_mb=256, observer=None):
+        self.path = path
+        self.max_idle = max_idle
+        self.busy_timeout = busy_timeout
+        self.cache_mb = cache_mb
+        self.mmap_mb = mmap_mb
+        self.observer = observer
+
+        self._lock = threading.Lock()
+        self._idle = []
+        self._open = 0
+        self._in_use = 0
+        self._checkouts = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        raw = self._connect()
+        try:
+            with open(SCHEMA_PATH, 'r', encoding='utf-8') as f:
+                raw.executescript(f.read())
+            raw.commit()
+        finally:
+            raw.close()
+            with self._lock:
+                self._open -= 1
+
+    def _connect(self):
+        raw = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                              detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        raw.execute("PRAGMA journal_mode = WAL")
+        raw.execute("PRAGMA synchronous = NORMAL")   # durable at checkpoints; safe with WAL
+        raw.execute("PRAGMA foreign_keys = ON")
+        raw.execute("PRAGMA temp_store = MEMORY")
+        raw.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+        raw.execute(f"PRAGMA cache_size = {-int(self.cache_mb * 1024)}")
+        raw.execute(f"PRAGMA mmap_size = {int(self.mmap_mb * 1024 * 1024)}")
+
+        owner = object()
+        raw.create_function('DATE_FORMAT', 2, _date_format, deterministic=True)
+        raw.create_function('CONCAT', -1, _concat, deterministic=True)
+        raw.create_function('CRC32', 1, _crc32, deterministic=True)
+        raw.create_function('LEFT_CHARS', 2, _left_chars, deterministic=True)
+        raw.create_function('GET_LOCK', 2, lambda name, timeout: _named_locks.acquire(owner, name, timeout))
+        raw.create_function('RELEASE_LOCK', 1, lambda name: _named_locks.release(owner, name))
+        with self._lock:
+            self._open += 1
+        return raw
+
+    def get_connection(self, read_only=False):
+        # One database file: read_only has nothing to route to
+        started = time.monotonic()
+        with self._lock:
+            raw = self._idle.pop() if self._idle else None
+        if raw is None:
+            raw = self._connect()
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+        if self.observer is not None:
+            self.observer.observe_acquire(time.monotonic() - started)
+        return SQLiteConnection(self, raw)
+
+    def _release(self, raw):
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+        except sqlite3.Error:
+            self._discard(raw)
+            return
+        with self._lock:
+            self._in_use -= 1
+            if len(self._idle) < self.max_idle:
+                self._idle.append(raw)
+                return
+        self._discard(raw, in_use=False)
+
+    def _reclaim(self, raw):
+        """Called when a SQLiteConnection is garbage collected without close()"""
+        print("Database connection was never closed; discarding it")
+        self._discard(raw)
+
+    def _discard(self, raw, in_use=True):
+        try:
+            raw.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._open -= 1
+            if in_use:
+                self._in_use -= 1
+
+    def start_background(self):
+        """Nothing runs in the background for SQLite"""
+
+    def stats(self):
+        """Same keys as ConnectionPool.stats() plus the backend details"""
+        with self._lock:
+            return {
+                "backend": "sqlite",
+                "path": self.path,
+                "max_size": None,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiters": 0,
+                "checkouts": self._checkouts,
+                "timeouts": 0,
+                "recycled": 0,
+                "validation_failures": 0,
+            }
+
+    def close_all(self):
+        """Close every idle connection (in-use ones close on release)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for raw in idle:
+            self._discard(raw, in_use=False)
+
+
+def sqlite_storage_from_env(observer=None):
+    """Build a SQLiteStorage using the SQLITE_* environment variables"""
+    return SQLiteStorage(
+        os.getenv("SQLITE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), 'campussphere.db')),
+        max_idle=int(os.getenv("SQLITE_MAX_IDLE", "8")),
+        busy_timeout=float(os.getenv("SQLITE_BUSY_TIMEOUT", "5")),
+        cache_mb=int(os.getenv("SQLITE_CACHE_MB", "64")),
+        mmap_mb=int(os.getenv("SQLITE_MMAP_MB", "256")),
+        observer=observer,
+    )
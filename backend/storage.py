@@ -0,0 +1,118 @@
+# ===================================================================
+# CAMPUSSPHERE - STORAGE BACKENDS
+# ===================================================================
+# get_db_connection() in app.py checks connections out of one storage
+# backend, picked with DB_BACKEND:
+#
+#   mysql   (default) pooled mysql.connector connections, db_pool.py
+#   sqlite  embedded database file, sqlite_storage.py
+#
+# Both hand out connections with the same surface (cursor(dictionary=True),
+# %s placeholders, commit/rollback, close() to give it back) and expose
+# `dialect` on the backend and on every connection, so the few queries
+# that cannot be written portably can branch on conn.dialect.
+#
+# start_background() starts any per-process background work a backend
+# needs (the MySQL replica lag checks); close_all() stops it again.
+#
+# get_connection(read_only=True) may return a read replica connection
+# (MySQL with DB_REPLICA_HOSTS set, see db_replicas.py); SQLite ignores it.
+#
+# Handlers catch DB_ERRORS rather than mysql.connector.Error so either
+# backend's exceptions are handled; mysql-connector-python is only
+# needed when DB_BACKEND=mysql.
+
+import os
+import sqlite3
+
+try:
+    import mysql.connector
+    from mysql.connector import errorcode
+except ImportError:  # SQLite-only deployment
+    mysql = None
+
+DB_ERRORS = (sqlite3.Error,) + ((mysql.connector.Error,) if mysql else ())
+DB_INTEGRITY_ERRORS = (sqlite3.IntegrityError,) + ((mysql.connector.IntegrityError,) if mysql else ())
+
+BACKENDS = ('mysql', 'sqlite')
+
+
+class StorageUnavailableError(Exception):
+    """Raised when no connection could be handed out (e.g. pool timeout)"""
+
+
+def is_duplicate_key(err):
+    """True if `err` is a unique-key violation on either backend"""
+    if isinstance(err, sqlite3.IntegrityError):
+        return str(err).startswith('UNIQUE constraint failed')
+    return mysql is not None and getattr(err, 'errno', None) == errorcode.ER_DUP_ENTRY
+
+
+class MySQLStorage:
+    """
+    MySQL backend: a db_pool.ConnectionPool sized from DB_POOL_* variables,
+    plus one pool per read replica listed in DB_REPLICA_HOSTS
+    """
+
+    dialect = 'mysql'
+
+    def __init__(self, connect_args, observer=None):
+        if mysql is None:
+            raise RuntimeError("DB_BACKEND=mysql needs mysql-connector-python installed")
+        from db_pool import pool_from_env, PoolTimeoutError
+        self._timeout_error = PoolTimeoutError
+        self.pool = pool_from_env(connect_args, observer=observer)
+        self.replicas = None
+
+        hosts = [h.strip() for h in os.getenv("DB_REPLICA_HOSTS", "").split(',') if h.strip()]
+        if hosts:
+            from db_replicas import ReplicaSet
+            pools = []
+            for host in hosts:
+                name, _, port = host.partition(':')
+                args = dict(connect_args, host=name)
+                if port:
+                    args["port"] = int(port)
+                pools.append((host, pool_from_env(args, observer=observer)))
+            self.replicas = ReplicaSet(
+                pools,
+                max_lag=float(os.getenv("DB_REPLICA_MAX_LAG", "5")),
+                check_interval=float(os.getenv("DB_REPLICA_CHECK_INTERVAL", "5"))
+            )
+
+    def get_connection(self, read_only=False):
+        try:
+            if read_only and self.replicas is not None:
+                conn = self.replicas.get_connection()
+                if conn is not None:
+                    return conn
+            return self.pool.get_connection()
+        except self._timeout_error as err:
+            raise StorageUnavailableError(str(err)) from err
+
+    def start_background(self):
+        """Start the replica lag checks, if there are replicas"""
+        if self.replicas is not None:
+            self.replicas.start()
+
+    def stats(self):
+        stats = dict(self.pool.stats(), backend='mysql')
+        if self.replicas is not None:
+            stats["read_replicas"] = self.replicas.stats()
+        return stats
+
+    def close_all(self):
+        self.pool.close_all()
+        if self.replicas is not None:
+            self.replicas.close_all()
+
+
+def storage_from_env(mysql_connect_args, observer=None):
+    """Build the backend selected by DB_BACKEND"""
+    backend = os.getenv("DB_BACKEND", "mysql").lower()
+    if backend == 'sqlite':
+        from sqlite_storage import sqlite_storage_from_env
+        return sqlite_storage_from_env(observer=observer)
+    if backend != 'mysql':
+        raise ValueError(f"DB_BACKEND must be one of {', '.join(BACKENDS)}")
+    return MySQLStorage(mysql_connect_args, observer=observer)
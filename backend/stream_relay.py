@@ -0,0 +1,159 @@
+# ===================================================================
+# CAMPUSSPHERE - LIVE UPDATE RELAY BETWEEN PROCESSES
+# ===================================================================
+# event_stream.BroadcastHub lives in one process, but gunicorn and
+# uvicorn run several workers and a dashboard's /api/stream is held by
+# whichever one accepted it. While a StreamRelay is attached, the hub
+# hands every published event to the relay instead of delivering it;
+# the relay's thread appends the events to the stream_events table and
+# polls it for rows above the last id it has seen, delivering each one
+# to its own hub. Every worker does the same, so a stream receives
+# events published by any of them, SSE_RELAY_INTERVAL seconds late at
+# most.
+#
+# The table id is the SSE event id, so Last-Event-ID replay works on
+# whichever worker a client reconnects to. MySQL can commit a lower
+# auto-increment id after a higher one, so ids skipped by a poll are
+# looked for again for GAP_WAIT_SECONDS before being given up on.
+#
+# Publishing never touches the database on the request thread: events
+# are queued (up to max_queue) and written by the relay thread.
+
+import json
+import threading
+import time
+from collections import deque
+
+from storage import DB_ERRORS
+
+# How long a skipped id may still be committed by a slower transaction
+GAP_WAIT_SECONDS = 5.0
+POLL_BATCH = 500
+
+
+class StreamRelay:
+    """
+    Shares a BroadcastHub's events with the hubs of other processes
+    through the stream_events table.
+
+    Args:
+        connection_factory: callable returning a DB connection (or None)
+        hub: the BroadcastHub to deliver to
+        interval: seconds between polls
+        retention: seconds rows are kept (bounds Last-Event-ID replay too)
+        max_queue: events waiting to be written before the oldest are dropped
+    """
+
+    def __init__(self, connection_factory, hub, interval=0.5, retention=3600, max_queue=1000):
+        self._connection_factory = connection_factory
+        self.hub = hub
+        self.interval = interval
+        self.retention = retention
+        self._outbox = deque(maxlen=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_seen = None
+        self._gaps = {}         # id -> monotonic time it was first skipped
+        self._next_prune = 0.0
+
+    def send(self, event_type, payload, roles, user_ids):
+        """Queue an encoded event for every process (called by the hub)"""
+        self._outbox.append((
+            event_type,
+            payload.decode('utf-8'),
+            json.dumps(sorted(roles)) if roles is not None else None,
+            json.dumps(sorted(user_ids)) if user_ids is not None else None,
+        ))
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='stream-relay', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detach from the hub; events published afterwards are delivered locally"""
+        self._stop.set()
+        self.hub.detach_relay(self)
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            conn = self._connection_factory()
+            if conn:
+                try:
+                    self._pass(conn)
+                except DB_ERRORS as err:
+                    conn.rollback()
+                    print(f"Stream relay error: {err}")
+                finally:
+                    conn.close()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        # Events published just before shutdown still reach the other workers
+        if self._outbox:
+            conn = self._connection_factory()
+            if conn:
+                cursor = conn.cursor()
+                try:
+                    self._write(conn, cursor)
+                except DB_ERRORS as err:
+                    print(f"Stream relay error: {err}")
+                finally:
+                    cursor.close()
+                    conn.close()
+
+    def _pass(self, conn):
+        cursor = conn.cursor()
+        try:
+            if self._last_seen is None:
+                # Start after what is already there; older events were
+                # delivered (or not) by the processes running back then
+                cursor.execute("SELECT COALESCE(MAX(id), 0) FROM stream_events")
+                self._last_seen = cursor.fetchone()[0]
+                self.hub.attach_relay(self, self._last_seen)
+            self._write(conn, cursor)
+            self._poll(cursor)
+            conn.commit()
+            now = time.monotonic()
+            if now >= self._next_prune:
+                cursor.execute("DELETE FROM stream_events WHERE created_at < NOW() - INTERVAL %s SECOND",
+                               (int(self.retention),))
+                conn.commit()
+                self._next_prune = now + 60
+        finally:
+            cursor.close()
+
+    def _write(self, conn, cursor):
+        events = []
+        while self._outbox:
+            events.append(self._outbox.popleft())
+        if not events:
+            return
+        cursor.executemany("""
+            INSERT INTO stream_events (event_type, payload, roles, user_ids)
+            VALUES (%s, %s, %s, %s)
+        """, events)
+        conn.commit()
+
+    def _poll(self, cursor):
+        now = time.monotonic()
+        self._gaps = {event_id: seen for event_id, seen in self._gaps.items()
+                      if now - seen < GAP_WAIT_SECONDS}
+        query = "SELECT id, event_type, payload, roles, user_ids FROM stream_events WHERE id > %s"
+        params = [self._last_seen]
+        if self._gaps:
+            query += f" OR id IN ({', '.join(['%s'] * len(self._gaps))})"
+            params.extend(self._gaps)
+        cursor.execute(query + f" ORDER BY id LIMIT {POLL_BATCH}", params)
+        for event_id, event_type, payload, roles, user_ids in cursor.fetchall():
+            if event_id in self._gaps:
+                del self._gaps[event_id]
+            elif event_id > self._last_seen:
+                if event_id - self._last_seen <= POLL_BATCH:
+                    for missing in range(self._last_seen + 1, event_id):
+                        self._gaps[missing] = now
+                self._last_seen = event_id
+            self.hub.deliver(event_id, event_type, payload.encode('utf-8'),
+                             frozenset(json.loads(roles)) if roles is not None else None,
+                             frozenset(json.loads(user_ids)) if user_ids is not None else None)